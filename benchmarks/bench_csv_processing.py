@@ -0,0 +1,80 @@
+"""
+Compare the vectorized, parallel CSVDataProcessor against the original row-by-row
+implementation on synthetic recording folders.
+
+Run from the repository root:
+    python -m benchmarks.bench_csv_processing --files 10 50 200
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data preprocessing'))
+from dataProcessing import CSVDataProcessor, ROWS_PER_CLASS
+
+CLASS_NAMES = ['Left Click', 'Right Click', 'Scroll Up', 'Scroll Down']
+
+
+def write_synthetic_folder(folder, n_files, channels=6, seed=0):
+    """Write `n_files` session CSVs: each class name followed by ROWS_PER_CLASS reading rows."""
+    rng = np.random.default_rng(seed)
+    os.makedirs(folder, exist_ok=True)
+    for i in range(n_files):
+        lines = []
+        for name in CLASS_NAMES:
+            lines.append(name)
+            readings = rng.normal(0, 30, size=(ROWS_PER_CLASS, channels)).round(4)
+            lines.extend('"[' + ', '.join(map(str, row)) + ']"' for row in readings)
+        with open(os.path.join(folder, f'session_{i:05d}.csv'), 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+
+
+def time_call(fn):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()
+    return time.perf_counter() - start
+
+
+def run(file_counts, workers=None, include_legacy=True):
+    results = []
+    for n_files in file_counts:
+        with tempfile.TemporaryDirectory() as tmp:
+            folder = os.path.join(tmp, 'data')
+            write_synthetic_folder(folder, n_files)
+
+            fast = CSVDataProcessor(folder, os.path.join(tmp, 'fast.csv'), workers=workers)
+            result = {'files': n_files, 'rows': n_files * len(CLASS_NAMES) * ROWS_PER_CLASS,
+                      'vectorized_s': time_call(fast.process_csv_files)}
+            if include_legacy:
+                legacy = CSVDataProcessor(folder, os.path.join(tmp, 'legacy.csv'))
+                result['iterrows_s'] = time_call(legacy.process_csv_files_iterrows)
+                result['speedup'] = result['iterrows_s'] / result['vectorized_s']
+                # Both paths must produce the same merged data (legacy order follows os.listdir)
+                a = pd.read_csv(fast.output_file).sort_values(['Class', '0', '1']).reset_index(drop=True)
+                b = pd.read_csv(legacy.output_file).sort_values(['Class', '0', '1']).reset_index(drop=True)
+                result['outputs_match'] = bool(np.allclose(a.to_numpy(), b.to_numpy(), equal_nan=True))
+            results.append(result)
+            print(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--files', type=int, nargs='+', default=[10, 50, 200])
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--skip-legacy', action='store_true', help='only time the vectorized path')
+    args = parser.parse_args()
+    run(args.files, args.workers, not args.skip_legacy)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Registration and login throughput of the pooled database layer versus the
+original connection-per-call implementation.
+
+Run from the repository root:
+    python -m benchmarks.bench_database --users 2000
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+from database import database
+
+
+def make_users(n, prefix='user'):
+    return [{
+        'Username': f'{prefix}{i}', 'Password': f'pw{i}', 'Accessibility Challenge': 'none',
+        'Height (cm)': 170.0, 'Weight (kg)': 70.0, 'Eye Color': 'brown', 'IPD (mm)': 63.0,
+        'Astigmatism (Yes/No)': 'no', 'Disabilities': 'none', 'Gender': 'n/a',
+        'Birthdate (YYYY-MM-DD)': '1990-01-01',
+    } for i in range(n)]
+
+
+# The original implementation: a new connection, a commit and a SELECT * per call
+def legacy_register_user(path, data):
+    conn = sqlite3.connect(path)
+    c = conn.cursor()
+    try:
+        c.execute('''
+            INSERT INTO users (username, password, accessibility_challenge, height, weight, eye_color, ipd, astigmatism, disabilities, gender, birthdate)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            data['Username'], database.hash_password(data['Password']), data['Accessibility Challenge'],
+            data['Height (cm)'], data['Weight (kg)'], data['Eye Color'], data['IPD (mm)'],
+            data['Astigmatism (Yes/No)'], data['Disabilities'], data['Gender'], data['Birthdate (YYYY-MM-DD)']
+        ))
+        conn.commit()
+        return True
+    except sqlite3.IntegrityError:
+        return False
+    finally:
+        conn.close()
+
+
+def legacy_login_user(path, username, password):
+    conn = sqlite3.connect(path)
+    c = conn.cursor()
+    c.execute('SELECT * FROM users WHERE username = ? AND password = ?', (username, database.hash_password(password)))
+    user = c.fetchone()
+    conn.close()
+    return user
+
+
+def rate(count, fn):
+    start = time.perf_counter()
+    fn()
+    return count / (time.perf_counter() - start)
+
+
+def run(n_users):
+    users = make_users(n_users)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = os.path.join(tmp, 'legacy.db')
+        sqlite3.connect(legacy_path).execute(database._CREATE_USERS).connection.close()
+        results['legacy_register_per_s'] = rate(n_users, lambda: [legacy_register_user(legacy_path, u) for u in users])
+        results['legacy_login_per_s'] = rate(n_users, lambda: [legacy_login_user(legacy_path, u['Username'], u['Password'])
+                                                               for u in users])
+
+        database.configure(os.path.join(tmp, 'pooled.db'))
+        database.setup_db()
+        half = n_users // 2
+        results['register_user_per_s'] = rate(half, lambda: [database.register_user(u) for u in users[:half]])
+        results['register_users_bulk_per_s'] = rate(n_users - half, lambda: database.register_users(users[half:]))
+        results['login_per_s'] = rate(n_users, lambda: [database.login_user(u['Username'], u['Password']) for u in users])
+        database.configure(database.DB_PATH)
+
+    for name, value in results.items():
+        print(f'{name:<28} {value:12.0f}')
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=2000)
+    args = parser.parse_args()
+    run(args.users)
+
+
+if __name__ == '__main__':
+    main()
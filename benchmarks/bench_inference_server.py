@@ -0,0 +1,145 @@
+"""
+Load generator for the inference server: throughput and round-trip latency as
+the number of clients grows.
+
+Every client runs on its own thread with its own connection and streams raw
+(channels, samples) windows, keeping up to `--inflight` requests outstanding
+(or pacing them at `--rate` windows/s per client, like a headset in control
+mode). Without --address a server is started in-process on a temporary Unix
+socket (or TCP on platforms without one), using random production-shaped LSTM
+weights unless --model is given.
+
+Run from the repository root:
+    python -m benchmarks.bench_inference_server --clients 1 2 4 8 16
+    python -m benchmarks.bench_inference_server --address tcp:127.0.0.1:8765 --rate 10 --clients 4 8
+"""
+
+import argparse
+import os
+import socket
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from eeg.metrics import LatencyTracker
+from server.client import InferenceClient
+
+
+def client_worker(address, duration, inflight, rate, latency, counts, index, seed):
+    rng = np.random.default_rng(seed)
+    windows = rng.normal(0, 30, size=(16, 6, 100)).astype(np.float32)
+    client = InferenceClient(address)
+    slots = threading.BoundedSemaphore(inflight)
+    done = 0
+    lock = threading.Lock()
+
+    def finished(future, submitted):
+        nonlocal done
+        if future.exception() is None:
+            latency.record(time.perf_counter() - submitted)
+            with lock:
+                done += 1
+        slots.release()
+
+    try:
+        interval = 1.0 / rate if rate else 0.0
+        start = time.perf_counter()
+        next_send = start
+        i = 0
+        while time.perf_counter() - start < duration:
+            if interval:
+                delay = next_send - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                next_send += interval
+            slots.acquire()
+            submitted = time.perf_counter()
+            future = client.submit_raw(windows[i % len(windows)])
+            future.add_done_callback(lambda f, t=submitted: finished(f, t))
+            i += 1
+        for _ in range(inflight):  # Wait for the outstanding requests
+            slots.acquire()
+    finally:
+        client.close()
+    counts[index] = done
+
+
+def run_level(address, n_clients, duration, inflight, rate):
+    latency = LatencyTracker('round trip', history=200000)
+    counts = [0] * n_clients
+    threads = [threading.Thread(target=client_worker, args=(address, duration, inflight, rate, latency, counts, i, i))
+               for i in range(n_clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    summary = latency.summary()
+    return {'clients': n_clients, 'windows': sum(counts), 'windows_per_s': sum(counts) / elapsed,
+            'p50_ms': summary.get('p50_ms', float('nan')), 'p99_ms': summary.get('p99_ms', float('nan'))}
+
+
+def local_server(model_path, max_batch, max_wait, max_inflight):
+    from eeg.inference import InferenceEngine
+    from server.inference_server import BackgroundServer, InferenceServer
+
+    if model_path:
+        engine = InferenceEngine.load(model_path, backend='numpy')
+    else:
+        from benchmarks.suite import random_lstm_model
+
+        model = random_lstm_model()
+        engine = InferenceEngine(model.predict, model.window_shape)
+    if hasattr(socket, 'AF_UNIX'):
+        address = 'unix:' + os.path.join(tempfile.mkdtemp(), 'inference.sock')
+    else:
+        address = 'tcp:127.0.0.1:8765'
+    server = InferenceServer(engine, max_batch=max_batch, max_wait=max_wait, max_inflight=max_inflight)
+    return BackgroundServer(server, address).start()
+
+
+def run(client_counts, address=None, duration=5.0, inflight=4, rate=None, model_path=None, max_batch=64,
+        max_wait=0.002, max_inflight=8):
+    background = None
+    if address is None:
+        background = local_server(model_path, max_batch, max_wait, max_inflight)
+        address = background.address
+    results = []
+    try:
+        print(f"{'clients':>8}{'windows/s':>12}{'p50 ms':>10}{'p99 ms':>10}{'batch':>8}")
+        for n_clients in client_counts:
+            server = background.server if background else None
+            batches_before = (server.batches, server.windows) if server else None
+            result = run_level(address, n_clients, duration, inflight, rate)
+            if server:
+                batches = server.batches - batches_before[0]
+                result['mean_batch'] = (server.windows - batches_before[1]) / batches if batches else 0.0
+            results.append(result)
+            print(f"{n_clients:>8}{result['windows_per_s']:>12.0f}{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+                  f"{result.get('mean_batch', float('nan')):>8.1f}")
+    finally:
+        if background:
+            background.stop()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    parser.add_argument('--address', help='benchmark a running server instead of an in-process one')
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds per client count')
+    parser.add_argument('--inflight', type=int, default=4, help='outstanding requests per client')
+    parser.add_argument('--rate', type=float, default=None, help='windows/s per client (default: as fast as possible)')
+    parser.add_argument('--model', help='.h5 model for the in-process server')
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    args = parser.parse_args()
+    run(args.clients, args.address, args.duration, args.inflight, args.rate, args.model, args.max_batch,
+        args.max_wait_ms / 1000)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+"""
+Train and evaluate candidate classifiers on the same windows and compare
+accuracy against single-window latency, batch throughput, parameter count and
+memory.
+
+Each candidate is trained in its own worker process (a fresh process per
+candidate, so peak RSS is per model). TensorFlow is limited to `--threads`
+threads per worker to match a CPU-only kiosk and to keep parallel runs from
+fighting over cores.
+
+Without --data, synthetic sessions with a different dominant frequency per
+class are generated.
+
+Run from the repository root:
+    python -m benchmarks.bench_models
+    python -m benchmarks.bench_models --data data --models lstm100 lstm32 cnn1d --epochs 20 --workers 2
+"""
+
+import argparse
+import json
+import os
+import resource
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from eeg.metrics import LatencyTracker
+from eeg.session import CLASS_DICT, write_session
+from eeg.training_data import WindowDataset
+
+WINDOW_SIZE = 100
+CHANNELS = 6
+SAMPLE_RATE = 250
+
+# Candidate architectures; 'lstm100' is the model eeg_classification.py trains
+CANDIDATES = {
+    'lstm100': {'kind': 'lstm', 'units': 100, 'dense': 25},
+    'lstm32': {'kind': 'lstm', 'units': 32, 'dense': 16},
+    'lstm16': {'kind': 'lstm', 'units': 16, 'dense': None},
+    'cnn1d': {'kind': 'cnn', 'filters': (16, 32), 'kernel_sizes': (7, 5)},
+    'bandpower_linear': {'kind': 'bandpower'},
+}
+
+COLUMNS = ['model', 'runtime', 'accuracy', 'p50_ms', 'p99_ms', 'batch_windows_per_s', 'params', 'weights_kb',
+           'peak_rss_mb', 'train_s']
+
+
+def write_synthetic_sessions(folder, n_files=8, segments_per_class=40, seed=0):
+    """Sessions whose classes differ in dominant frequency, at amplitudes above the artifact threshold."""
+    rng = np.random.default_rng(seed)
+    frequencies = {'Left Click': 8.0, 'Right Click': 12.0, 'Scroll Up': 20.0, 'Scroll Down': 28.0}
+    os.makedirs(folder, exist_ok=True)
+    t = np.arange(WINDOW_SIZE) / SAMPLE_RATE
+    for i in range(n_files):
+        segments = []
+        for k in range(segments_per_class):
+            for action, frequency in frequencies.items():
+                phase = rng.uniform(0, 2 * np.pi, size=(CHANNELS, 1))
+                data = 40 * np.sin(2 * np.pi * frequency * t + phase) + rng.normal(0, 25, size=(CHANNELS, WINDOW_SIZE))
+                segments.append((action, data, float(k)))
+        write_session(os.path.join(folder, f'synthetic_{i:03d}.eegs'), segments, SAMPLE_RATE)
+
+
+def load_arrays(paths, out_path, seed=42):
+    """Materialize the normalized train/test windows once, so every candidate sees the same data."""
+    dataset = WindowDataset(paths, window_size=WINDOW_SIZE, test_fraction=0.2, seed=seed)
+    normalizer = dataset.scan()
+    arrays = {}
+    for split in ('train', 'test'):
+        batches = list(dataset.batches(1024, split, shuffle=split == 'train', normalizer=normalizer))
+        if not batches:
+            raise ValueError(f"No {split} windows in {paths}")
+        arrays[f'x_{split}'] = np.concatenate([x for x, _ in batches])
+        arrays[f'y_{split}'] = np.concatenate([y for _, y in batches]).argmax(axis=1)
+    np.savez(out_path, **arrays)
+    return {split: len(arrays[f'y_{split}']) for split in ('train', 'test')}
+
+
+def build_keras_model(config, n_classes):
+    from tensorflow import keras
+    from tensorflow.keras import layers
+
+    model = keras.Sequential([keras.Input((WINDOW_SIZE, CHANNELS))])
+    if config['kind'] == 'lstm':
+        model.add(layers.LSTM(config['units']))
+        if config['dense']:
+            model.add(layers.Dense(config['dense'], activation='relu'))
+    else:
+        for filters, kernel_size in zip(config['filters'], config['kernel_sizes']):
+            model.add(layers.Conv1D(filters, kernel_size, activation='relu'))
+            model.add(layers.MaxPooling1D(2))
+        model.add(layers.GlobalAveragePooling1D())
+    model.add(layers.Dense(n_classes, activation='softmax'))
+    model.compile(optimizer='adam', loss='sparse_categorical_crossentropy', metrics=['accuracy'])
+    return model
+
+
+def measure(forward, x_test, repeats, batch_size=256):
+    """p50/p99 latency of single windows and throughput of full batches, in the stats' units."""
+    forward(x_test[:1])  # Warm-up/tracing stays out of the numbers
+    tracker = LatencyTracker('single', history=repeats)
+    for i in range(repeats):
+        window = x_test[i % len(x_test)][np.newaxis]
+        with tracker.time():
+            forward(window)
+    summary = tracker.summary()
+    batch = x_test[np.arange(batch_size) % len(x_test)]
+    start = time.perf_counter()
+    rounds = max(3, repeats // 50)
+    for _ in range(rounds):
+        forward(batch)
+    throughput = rounds * batch_size / (time.perf_counter() - start)
+    return {'p50_ms': summary['p50_ms'], 'p99_ms': summary['p99_ms'], 'batch_windows_per_s': throughput}
+
+
+def evaluate_candidate(name, config, data_path, epochs, repeats, threads):
+    """Train one candidate in this (worker) process and return one result row per runtime."""
+    data = np.load(data_path)
+    x_train, y_train, x_test, y_test = data['x_train'], data['y_train'], data['x_test'], data['y_test']
+    n_classes = len(CLASS_DICT)
+    rows = []
+
+    if config['kind'] == 'bandpower':
+        from eeg.fast_model import BandPowerClassifier
+
+        start = time.perf_counter()
+        classifier = BandPowerClassifier.fit(x_train, y_train, n_classes, SAMPLE_RATE)
+        train_s = time.perf_counter() - start
+        forward = classifier.predict
+
+        accuracy = classifier.score(x_test, y_test)
+        params = classifier.coef.size + classifier.intercept.size
+        rows.append(dict(model=name, runtime='numpy', accuracy=accuracy, params=params, train_s=train_s,
+                         **measure(forward, x_test, repeats)))
+    else:
+        import tensorflow as tf
+        from eeg.inference import InferenceEngine
+
+        tf.config.threading.set_intra_op_parallelism_threads(threads)
+        tf.config.threading.set_inter_op_parallelism_threads(threads)
+        tf.keras.utils.set_random_seed(0)
+        model = build_keras_model(config, n_classes)
+        start = time.perf_counter()
+        model.fit(x_train, y_train, epochs=epochs, batch_size=32, verbose=0)
+        train_s = time.perf_counter() - start
+        accuracy = float(model.evaluate(x_test, y_test, verbose=0)[1])
+        params = model.count_params()
+        engine = InferenceEngine.from_keras(model)
+        rows.append(dict(model=name, runtime='tf.function', accuracy=accuracy, params=params, train_s=train_s,
+                         **measure(engine.predict_batch, x_test, repeats)))
+        if config['kind'] == 'lstm':
+            # The app's default backend runs LSTM models without TensorFlow
+            from eeg.lstm_runtime import NumpyLSTMModel
+
+            with tempfile.TemporaryDirectory() as tmp:
+                h5_path = os.path.join(tmp, f'{name}.h5')
+                model.save(h5_path)
+                numpy_model = NumpyLSTMModel.load(h5_path, use_cache=False)
+            numpy_accuracy = float((numpy_model.predict(x_test).argmax(axis=1) == y_test).mean())
+            rows.append(dict(model=name, runtime='numpy', accuracy=numpy_accuracy, params=params, train_s=train_s,
+                             **measure(numpy_model.predict, x_test, repeats)))
+
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # ru_maxrss is KiB on Linux
+    for row in rows:
+        row['weights_kb'] = row['params'] * 4 / 1024
+        row['peak_rss_mb'] = peak_rss_mb
+    return rows
+
+
+def format_table(rows):
+    formatted = [[f'{row[c]:.3f}' if isinstance(row[c], float) else str(row[c]) for c in COLUMNS] for row in rows]
+    widths = [max(len(c), *(len(r[i]) for r in formatted)) for i, c in enumerate(COLUMNS)]
+    lines = ['  '.join(c.ljust(w) for c, w in zip(COLUMNS, widths))]
+    lines += ['  '.join(v.ljust(w) for v, w in zip(r, widths)) for r in formatted]
+    return '\n'.join(lines)
+
+
+def run(models, data_paths=None, epochs=15, repeats=300, workers=None, threads=1):
+    with tempfile.TemporaryDirectory() as tmp:
+        if not data_paths:
+            data_paths = [os.path.join(tmp, 'sessions')]
+            write_synthetic_sessions(data_paths[0])
+        data_path = os.path.join(tmp, 'windows.npz')
+        counts = load_arrays(data_paths, data_path)
+        print(f'Windows: {counts}')
+
+        # One fresh process per candidate keeps peak RSS per model and isolates TensorFlow state
+        with ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=1) as pool:
+            futures = [pool.submit(evaluate_candidate, name, CANDIDATES[name], data_path, epochs, repeats, threads)
+                       for name in models]
+            rows = [row for future in futures for row in future.result()]
+
+    rows.sort(key=lambda row: row['p50_ms'])
+    print(format_table(rows))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', nargs='+', help='.eegs/.csv files or folders of .eegs (default: synthetic)')
+    parser.add_argument('--models', nargs='+', choices=sorted(CANDIDATES), default=list(CANDIDATES))
+    parser.add_argument('--epochs', type=int, default=15)
+    parser.add_argument('--repeats', type=int, default=300, help='single-window predictions per candidate')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--threads', type=int, default=1, help='TensorFlow threads per worker')
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+    rows = run(args.models, args.data, args.epochs, args.repeats, args.workers, args.threads)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
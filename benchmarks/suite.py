@@ -0,0 +1,267 @@
+"""
+Headless end-to-end benchmark suite.
+
+Runs without a display, camera or network: EEG data comes from the simulated
+EEGHardware, plots are drawn on the Agg backend and the database lives in a
+temporary directory. Results are written as JSON so a later run can be
+compared against them.
+
+Run from the repository root:
+    python -m benchmarks.suite                                  # writes benchmarks/results/latest.json
+    python -m benchmarks.suite --quick --output before.json
+    python -m benchmarks.suite --baseline before.json --tolerance 0.2 --fail-on-regression
+"""
+
+import os
+
+os.environ.setdefault('MPLBACKEND', 'Agg')  # Before anything imports pyplot
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from eeg.metrics import LatencyTracker
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results', 'latest.json')
+
+
+def timed(fn, repeats):
+    """Call `fn` `repeats` times (after one warm-up call) and return its latency summary."""
+    fn()
+    tracker = LatencyTracker('bench', history=repeats)
+    for _ in range(repeats):
+        with tracker.time():
+            fn()
+    summary = tracker.summary()
+    del summary['name']
+    summary['per_s'] = 1000.0 / summary['mean_ms'] if summary['mean_ms'] else float('inf')
+    return summary
+
+
+def random_lstm_model(units=100, dense=25, n_classes=4, window_shape=(100, 6), seed=0):
+    """A NumPy LSTM with the production architecture and random weights, for when no trained model exists."""
+    from eeg.lstm_runtime import NumpyLSTMModel
+
+    rng = np.random.default_rng(seed)
+    features = window_shape[1]
+    layers = [{'type': 'lstm', 'name': 'lstm', 'units': units, 'activation': 'tanh', 'return_sequences': False,
+               'input_shape': list(window_shape)},
+              {'type': 'dense', 'name': 'dense', 'units': dense, 'activation': 'relu'},
+              {'type': 'dense', 'name': 'dense_1', 'units': n_classes, 'activation': 'softmax'}]
+    shapes = {'0/kernel': (features, 4 * units), '0/recurrent_kernel': (units, 4 * units), '0/bias': (4 * units,),
+              '1/kernel': (units, dense), '1/bias': (dense,), '2/kernel': (dense, n_classes), '2/bias': (n_classes,)}
+    weights = {name: (rng.standard_normal(shape) * 0.1).astype(np.float32) for name, shape in shapes.items()}
+    return NumpyLSTMModel(layers, weights)
+
+
+def bench_preprocessing(repeats):
+    from eeg.preprocessing import preprocess_eeg_data
+    from eeg.sources import WINDOW_SIZE, open_source
+
+    source = open_source()
+    window = source.read_chunk(WINDOW_SIZE)
+    batch = np.stack([source.read_chunk(WINDOW_SIZE) for _ in range(32)])
+    with contextlib.redirect_stdout(io.StringIO()):
+        preprocess_eeg_data(window)  # Loads (or reports the absence of) the normalizer once
+    return {
+        'preprocess_single': timed(lambda: preprocess_eeg_data(window), repeats),
+        'preprocess_batch32': timed(lambda: preprocess_eeg_data(batch), max(1, repeats // 4)),
+    }
+
+
+def bench_prediction(repeats, model_path=None):
+    from eeg.inference import InferenceEngine
+    from eeg.preprocessing import make_prediction, preprocess_eeg_data
+    from eeg.sources import WINDOW_SIZE, open_source
+
+    if model_path:
+        engine = InferenceEngine.load(model_path, backend='numpy')
+    else:
+        model = random_lstm_model()
+        engine = InferenceEngine(model.predict, model.window_shape)
+    source = open_source()
+    window = source.read_chunk(WINDOW_SIZE)
+    batch = np.stack([source.read_chunk(WINDOW_SIZE) for _ in range(32)])
+    return {
+        'make_prediction_single': timed(lambda: make_prediction(engine, window), repeats),
+        # make_prediction takes one window; batches go through predict_batch as in control mode
+        'predict_batch32': timed(lambda: engine.predict_batch(preprocess_eeg_data(batch)), max(1, repeats // 4)),
+    }
+
+
+def bench_filter(repeats):
+    """One acquisition chunk through the streaming band-pass/notch filter, and a minute of data offline."""
+    from eeg.filters import StreamingFilter
+    from eeg.sources import NUM_CHANNELS, SAMPLE_RATE, open_source
+
+    stream_filter = StreamingFilter(SAMPLE_RATE, NUM_CHANNELS, budget_ms=None)
+    source = open_source()
+    chunk = source.read_chunk(max(1, SAMPLE_RATE // 50))
+    minute = source.read_chunk(SAMPLE_RATE * 60)
+    return {
+        'filter_chunk': timed(lambda: stream_filter.process(chunk), repeats),
+        'filter_session_60s': timed(lambda: stream_filter.apply(minute), max(1, repeats // 10)),
+    }
+
+
+def bench_plots(repeats):
+    """The live trace and accuracy plot updates capture_eeg_data triggers, plus a full-redraw reference."""
+    from matplotlib import pyplot as plt
+    from eeg.sources import NUM_CHANNELS, SAMPLE_RATE, open_source
+    from gui.live_plot import PLOT_SECONDS, HistoryPlot, LivePlot
+
+    n_samples = PLOT_SECONDS * SAMPLE_RATE
+    fig, axs = plt.subplots(NUM_CHANNELS, 1, figsize=(5, 12), dpi=100)
+    plot = LivePlot(fig, axs, fig.canvas, n_samples)
+    fig.canvas.draw()
+    data = open_source().read_chunk(n_samples)
+    results = {'live_plot_update': timed(lambda: plot.update(data, force=True), repeats)}
+
+    def fill_and_scroll():
+        # The buffer filling up after start: partial windows, then full ones
+        plot.update(data[:, -SAMPLE_RATE // 2:], force=True)
+        plot.update(data, force=True)
+
+    results['live_plot_fill'] = timed(fill_and_scroll, max(1, repeats // 2))
+
+    def full_redraw():
+        # What every capture used to do: clear each axis, replot and redraw the whole figure
+        for ax, row in zip(axs, data):
+            ax.clear()
+            ax.plot(row)
+        fig.canvas.draw()
+
+    results['plot_full_redraw'] = timed(full_redraw, max(1, repeats // 10))
+    plt.close(fig)
+
+    fig, ax = plt.subplots(figsize=(5, 3), dpi=100)
+    history = HistoryPlot(ax, fig.canvas, label='Accuracy')
+    fig.canvas.draw()
+    values = iter(np.random.default_rng(0).uniform(0, 1, size=repeats + 1))
+    results['history_plot_append'] = timed(lambda: history.append(next(values)), repeats)
+    plt.close(fig)
+    return results
+
+
+def bench_csv(file_counts, workers=None):
+    from benchmarks.bench_csv_processing import CLASS_NAMES, ROWS_PER_CLASS, CSVDataProcessor, write_synthetic_folder
+
+    results = {}
+    for n_files in file_counts:
+        with tempfile.TemporaryDirectory() as tmp:
+            folder = os.path.join(tmp, 'data')
+            write_synthetic_folder(folder, n_files)
+            processor = CSVDataProcessor(folder, os.path.join(tmp, 'merged.csv'), workers=workers)
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                processor.process_csv_files()
+            elapsed = time.perf_counter() - start
+        rows = n_files * len(CLASS_NAMES) * ROWS_PER_CLASS
+        results[f'csv_processing_{n_files}_files'] = {'files': n_files, 'rows': rows, 'total_s': elapsed,
+                                                      'rows_per_s': rows / elapsed}
+    return results
+
+
+def bench_database(n_users):
+    from benchmarks import bench_database
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        rates = bench_database.run(n_users)
+    return {'database': {'users': n_users, 'register_user_per_s': rates['register_user_per_s'],
+                         'register_users_bulk_per_s': rates['register_users_bulk_per_s'],
+                         'login_per_s': rates['login_per_s']}}
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'commit': commit, 'python': platform.python_version(),
+            'numpy': np.__version__, 'platform': platform.platform(), 'cpus': os.cpu_count()}
+
+
+def run(quick=False, model_path=None, workers=None):
+    repeats = 50 if quick else 300
+    file_counts = [5, 20] if quick else [10, 50, 200]
+    n_users = 500 if quick else 2000
+    results = {}
+    for name, bench in [('preprocessing', lambda: bench_preprocessing(repeats)),
+                        ('filter', lambda: bench_filter(repeats)),
+                        ('prediction', lambda: bench_prediction(repeats, model_path)),
+                        ('plots', lambda: bench_plots(repeats)),
+                        ('csv', lambda: bench_csv(file_counts, workers)),
+                        ('database', lambda: bench_database(n_users))]:
+        start = time.perf_counter()
+        results.update(bench())
+        print(f'{name:<14} done in {time.perf_counter() - start:.1f}s', file=sys.stderr)
+    return {'environment': environment(), 'results': results}
+
+
+def lower_is_better(metric):
+    return metric.endswith('_ms') or metric.endswith('_s') and not metric.endswith('per_s')
+
+
+def compare(current, baseline, tolerance=0.1):
+    """Return [(benchmark, metric, baseline, current, relative change)] for metrics worse by more than `tolerance`."""
+    regressions = []
+    for bench, metrics in current['results'].items():
+        previous = baseline['results'].get(bench, {})
+        for metric, value in metrics.items():
+            old = previous.get(metric)
+            if not isinstance(value, (int, float)) or not isinstance(old, (int, float)) or old == 0 or metric in ('count', 'files', 'rows', 'users') or metric.startswith('max'):
+                continue
+            change = (value - old) / old
+            if (change if lower_is_better(metric) else -change) > tolerance:
+                regressions.append((bench, metric, old, value, change))
+    return regressions
+
+
+def print_results(report):
+    for bench, metrics in report['results'].items():
+        shown = ', '.join(f'{k}={v:.4g}' for k, v in metrics.items() if k in (
+            'mean_ms', 'p99_ms', 'per_s', 'rows_per_s', 'total_s', 'register_user_per_s',
+            'register_users_bulk_per_s', 'login_per_s'))
+        print(f'{bench:<32} {shown}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--quick', action='store_true', help='fewer repeats and smaller datasets')
+    parser.add_argument('--model', help='benchmark this .h5 model instead of random LSTM weights')
+    parser.add_argument('--workers', type=int, default=None, help='CSVDataProcessor worker processes')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--baseline', help='JSON from an earlier run to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='allowed relative slowdown')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args()
+
+    report = run(args.quick, args.model, args.workers)
+    print_results(report)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'Results written to {args.output}')
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for bench, metric, old, new, change in regressions:
+            print(f'REGRESSION {bench}.{metric}: {old:.4g} -> {new:.4g} ({change:+.0%})')
+        if not regressions:
+            print(f'No regressions beyond {args.tolerance:.0%} against {args.baseline}')
+        elif args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
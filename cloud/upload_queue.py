@@ -0,0 +1,215 @@
+"""
+Background S3 upload queue.
+
+Uploads run on a worker thread with one reused boto3 client. Large files go
+through boto3's managed transfer (multipart, several parts in parallel).
+Failed uploads are retried with exponential backoff. Pending jobs are
+persisted to a JSON file, so uploads interrupted by a crash or restart resume
+the next time the queue is started. Jobs that run out of retries are moved to
+a failed list, persisted in the same file and retried on the next start.
+
+Set `endpoint_url` (or OMEGAVR_S3_ENDPOINT) to point the queue at a local S3
+stand-in such as a moto server for offline testing.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+
+DEFAULT_BUCKET = os.environ.get('OMEGAVR_S3_BUCKET', 'your-bucket-name')
+DEFAULT_STATE_FILE = 'pending_uploads.json'
+
+
+class UploadQueue:
+    """Persistent, retrying S3 upload worker.
+
+    Callbacks run on worker threads: `on_progress(job, bytes_sent, total_bytes)`
+    and `on_complete(job, success, error)`. GUI code must hand them over to its
+    own thread before touching widgets.
+    """
+
+    def __init__(self, bucket=DEFAULT_BUCKET, state_file=DEFAULT_STATE_FILE, endpoint_url=None,
+                 region_name='us-east-1', max_retries=5, backoff=1.0, max_backoff=60.0,
+                 multipart_threshold=8 * 1024 * 1024, max_concurrency=4,
+                 on_progress=None, on_complete=None, client=None):
+        self.bucket = bucket
+        self.state_file = state_file
+        self.endpoint_url = endpoint_url or os.environ.get('OMEGAVR_S3_ENDPOINT')
+        self.region_name = region_name
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.multipart_threshold = multipart_threshold
+        self.max_concurrency = max_concurrency
+        self.on_progress = on_progress
+        self.on_complete = on_complete
+        self._client = client
+        self._transfer_config = None
+        self._pending = {}  # job id -> job dict the worker will still process in this run
+        self._failed = {}  # job id -> job dict that ran out of retries; both are mirrored to state_file
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def pending(self):
+        with self._lock:
+            return list(self._pending.values())
+
+    @property
+    def failed(self):
+        with self._lock:
+            return list(self._failed.values())
+
+    def start(self):
+        if self._thread is not None:
+            return self
+        # Resume whatever was still pending when the app last stopped, and give failed jobs another go
+        for job in self._load_state():
+            job['attempts'] = 0
+            job.pop('failed', None)
+            self._pending[job['id']] = job
+            self._queue.put(job['id'])
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="s3-upload", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        """Stop after the current upload; unfinished jobs stay persisted."""
+        self._stop_event.set()
+        self._queue.put(None)
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def enqueue(self, local_file, key=None):
+        job = {
+            'id': uuid.uuid4().hex,
+            'local_file': os.path.abspath(local_file),
+            'bucket': self.bucket,
+            'key': key or os.path.basename(local_file),
+            'attempts': 0,
+            'created': time.time(),
+        }
+        with self._lock:
+            self._pending[job['id']] = job
+            self._save_state()
+        self._queue.put(job['id'])
+        return job
+
+    def wait_idle(self, timeout=None):
+        """Block until no jobs are pending (mainly for scripts and tests)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.pending:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def _get_client(self):
+        if self._client is None:
+            import boto3
+
+            # Credentials come from the standard AWS chain (environment, config files, instance role)
+            self._client = boto3.client('s3', region_name=self.region_name, endpoint_url=self.endpoint_url)
+        return self._client
+
+    def _get_transfer_config(self):
+        if self._transfer_config is None:
+            from boto3.s3.transfer import TransferConfig
+
+            self._transfer_config = TransferConfig(multipart_threshold=self.multipart_threshold,
+                                                   multipart_chunksize=self.multipart_threshold,
+                                                   max_concurrency=self.max_concurrency)
+        return self._transfer_config
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            job_id = self._queue.get()
+            if job_id is None:
+                break
+            with self._lock:
+                job = self._pending.get(job_id)
+            if job is not None:
+                self._process(job)
+
+    def _process(self, job):
+        while not self._stop_event.is_set():
+            try:
+                self._upload(job)
+            except FileNotFoundError as e:
+                # Retrying cannot help; drop the job
+                self._finish(job, False, e)
+                return
+            except Exception as e:
+                job['attempts'] += 1
+                with self._lock:
+                    self._save_state()
+                if job['attempts'] >= self.max_retries:
+                    # Out of this run's queue, but kept persisted so the next start tries again
+                    print(f"Upload of {job['key']} failed after {job['attempts']} attempts: {e}")
+                    with self._lock:
+                        self._pending.pop(job['id'], None)
+                        self._failed[job['id']] = job
+                        self._save_state()
+                    self._notify_complete(job, False, e)
+                    return
+                delay = min(self.max_backoff, self.backoff * 2 ** (job['attempts'] - 1))
+                print(f"Upload of {job['key']} failed ({e}), retrying in {delay:.1f}s")
+                self._stop_event.wait(delay)
+            else:
+                self._finish(job, True, None)
+                return
+
+    def _upload(self, job):
+        total = os.path.getsize(job['local_file'])
+        sent = 0
+        progress_lock = threading.Lock()
+
+        def progress(bytes_amount):
+            # Called from boto3's transfer threads, possibly concurrently
+            nonlocal sent
+            with progress_lock:
+                sent += bytes_amount
+                current = sent
+            if self.on_progress is not None:
+                self.on_progress(job, current, total)
+
+        self._get_client().upload_file(job['local_file'], job['bucket'], job['key'],
+                                       Config=self._get_transfer_config(), Callback=progress)
+
+    def _finish(self, job, success, error):
+        with self._lock:
+            self._pending.pop(job['id'], None)
+            self._save_state()
+        if success:
+            print(f"Upload of {job['key']} successful")
+        self._notify_complete(job, success, error)
+
+    def _notify_complete(self, job, success, error):
+        if self.on_complete is not None:
+            self.on_complete(job, success, error)
+
+    def _load_state(self):
+        if not os.path.exists(self.state_file):
+            return []
+        try:
+            with open(self.state_file) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Could not read pending uploads from {self.state_file}: {e}")
+            return []
+
+    def _save_state(self):
+        # Caller holds self._lock. Write to a temporary file and rename, so a crash
+        # never leaves a truncated state file behind.
+        tmp = self.state_file + '.tmp'
+        with open(tmp, 'w') as f:
+            jobs = list(self._pending.values()) + [dict(job, failed=True) for job in self._failed.values()]
+            json.dump(sorted(jobs, key=lambda job: job['created']), f, indent=2)
+        os.replace(tmp, self.state_file)
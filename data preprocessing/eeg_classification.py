@@ -4,97 +4,152 @@
 # Import Libraries
 """
 
-import pandas as pd
+import argparse
+import glob
+import os
+import sys
+import time
 import numpy as np
 from tensorflow import keras
-from tensorflow.keras import layers
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import LSTM, Dense
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import MinMaxScaler, LabelEncoder
-from tensorflow.keras.utils import to_categorical
 from sklearn.metrics import confusion_matrix
 
+# Shared preprocessing lives in the app's eeg package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from eeg.fast_model import BandPowerClassifier
+from eeg.filters import StreamingFilter
+from eeg.preprocessing import mark_trained_with_normalizer
+from eeg.quantization import export_all
+from eeg.training_data import WindowDataset
 
-"""# Load data
 
-"""
+# Everything the app needs is written where it loads it from: the repository's models/ folder
+parser = argparse.ArgumentParser(description="Train the LSTM and the band-power model")
+parser.add_argument('--output-dir', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'models'),
+                    help="where to write the models, normalizer.json and filter.json (default: the app's models/)")
+args, _ = parser.parse_known_args()  # Tolerates the extra arguments notebook kernels pass
+output_dir = os.path.normpath(args.output_dir)
+os.makedirs(output_dir, exist_ok=True)
 
-# Load the data for Machine Learning task
-data = pd.read_csv('merged_data.csv')
-print(data.head())
 
-# Split the data into features and target
-X = data.iloc[:, :-1].values  # Features
-y = data.iloc[:, -1].values  # Target
-feature_names = data.columns[:-1].to_list()  # Feature names
+def output_path(name):
+    return os.path.join(output_dir, name)
 
-# Print the shape of features and target
-print(f'Features shape: {X.shape}')
-print(f'Target shape: {y.shape}')
-print(f'Feature names: {feature_names}')
 
-"""# Preprocessing"""
+"""# Load data
+
+"""
 
-# Replace feature value which its absolute value is less than 10
-X = np.where(np.abs(X) < 10, np.nan, X)  # Replace values less than 10 with NaN
-X = np.where(np.isnan(X), np.nanmean(X, axis=0), X) # Replace NaN values with mean of the column
-# Normalize the data
-scaler = MinMaxScaler()
-X = scaler.fit_transform(X)
-print(X[:10])
+# Windows are streamed from disk instead of loading everything into memory.
+# Binary sessions saved by the app (data/*.eegs) are memory-mapped; otherwise the merged CSV is read in chunks.
+session_files = sorted(glob.glob(os.path.join('data', '*.eegs')))
+paths = session_files or ['merged_data.csv']
 
-# Reshape data
-num_intervals = 12
 timestamps = 100
 features = 6
-X = X.reshape(num_intervals, timestamps, features)
-print(X.shape)
-y = y.reshape(num_intervals, timestamps)
-y = y.mean(axis=1)
-print(y.shape)
+batch_size = 32
+epochs = 30
+
+# Each calibration snapshot (continuous recordings: the whole recording) is band-pass (1-40 Hz) and
+# 50 Hz notch filtered from a settled state before it is windowed. The design is saved with the model and the app filters its live stream with it;
+# set this to None to train on the unfiltered readings
+stream_filter = StreamingFilter(sample_rate=250, channels=features)
+
+# 20% of the windows are held out for testing and 20% of the rest for validation
+dataset = WindowDataset(paths, window_size=timestamps, test_fraction=0.2, validation_fraction=0.16, seed=42,
+                        stream_filter=stream_filter)
+
+"""# Preprocessing"""
 
-# One-hot Encode labels
-label_encoder = LabelEncoder()
-y = label_encoder.fit_transform(y)
-y = to_categorical(y)
-print(y)
+# Replace feature value which its absolute value is less than 10 with the mean of the column,
+# then normalize the data. The statistics are fitted in one streaming pass over the training
+# windows and saved with the model, so the app applies exactly the same transform at runtime.
+normalizer = dataset.scan(threshold=10)
+print(f'Windows per split: {dataset.counts}')
+print(f'Normalization: {normalizer.to_dict()}')
 
-# Split the data
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=4, random_state=42)
+# Shuffled, normalized, one-hot encoded batches, prefetched while the model trains
+train_data = dataset.tf_dataset(batch_size, 'train', normalizer=normalizer)
+validation_data = dataset.tf_dataset(batch_size, 'validation', shuffle=False, normalizer=normalizer)
+test_data = dataset.tf_dataset(batch_size, 'test', shuffle=False, normalizer=normalizer)
 
 """# Build and Train LSTM model"""
 
+
+class ThroughputCallback(keras.callbacks.Callback):
+    """Reports training throughput in windows per second for every epoch."""
+
+    def __init__(self, n_windows):
+        super().__init__()
+        self.n_windows = n_windows
+        self.rates = []
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self.start = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        rate = self.n_windows / (time.perf_counter() - self.start)
+        self.rates.append(rate)
+        print(f'Epoch {epoch + 1}: {rate:.0f} windows/sec')
+
+
 # Build the LSTM model
 model = Sequential()
 model.add(LSTM(100, input_shape=(timestamps, features), return_sequences=False))
 model.add(Dense(25, activation='relu'))
-model.add(Dense(y.shape[1], activation='softmax'))
+model.add(Dense(dataset.n_classes, activation='softmax'))
 
 model.compile(optimizer='adam', loss='categorical_crossentropy', metrics=['accuracy'])
 
-# Train the model
-model.fit(X, y, epochs=30, batch_size=4)
-
-# Train the model
-model.fit(X_train, y_train, epochs=30, batch_size=4, validation_split=0.2)
+# Train the model once, on the training split only
+throughput = ThroughputCallback(dataset.counts['train'])
+model.fit(train_data, epochs=epochs, validation_data=validation_data if dataset.counts['validation'] else None,
+          callbacks=[throughput])
+print(f'Mean training throughput: {np.mean(throughput.rates):.0f} windows/sec')
 
 """# Evaluate Model and Save Model"""
 
 # Evaluate the model
-loss, accuracy = model.evaluate(X_test, y_test)
+loss, accuracy = model.evaluate(test_data)
 print(f'Accuracy: {accuracy:.2f}')
 
-# Make predictions
-predictions = model.predict(X_test)
-
-# Convert softmax output to class indices
-predicted_classes = np.argmax(predictions, axis=-1)
-
-# Convert class indices to one-hot encoded vectors
-predicted_one_hot = np.array([to_categorical(pred, num_classes=4) for pred in predicted_classes])
-print(predicted_one_hot)
-print(y_test)
-
-# Save the model
-model.save('lstm_model.h5')
\ No newline at end of file
+# Make predictions batch by batch and compare them with the true classes
+predicted_classes, true_classes = [], []
+for windows, targets in test_data:
+    predicted_classes.append(np.argmax(model.predict_on_batch(windows), axis=-1))
+    true_classes.append(np.argmax(targets.numpy(), axis=-1))
+print(confusion_matrix(np.concatenate(true_classes), np.concatenate(predicted_classes),
+                       labels=range(dataset.n_classes)))
+
+"""# Band-power fast model"""
+
+# A linear classifier on per-channel band powers of the same normalized windows. The app falls back
+# to it when the LSTM cannot keep up; both test accuracies are saved with it so the cost is known
+def labeled_batches(split):
+    for windows, targets in dataset.batches(1024, split, shuffle=False, normalizer=normalizer):
+        yield windows, np.argmax(targets, axis=-1)
+
+
+fast_model = BandPowerClassifier.fit_batches(labeled_batches('train'), n_classes=dataset.n_classes)
+fast_model.accuracy = fast_model.score_batches(labeled_batches('test'))
+fast_model.reference_accuracy = float(accuracy)
+print(f'Band-power model accuracy: {fast_model.accuracy:.2f} (LSTM: {accuracy:.2f})')
+
+# Save the models, the normalization statistics and the stream filter they were trained with. The model
+# goes first: the app warns when the normalizer next to it is older, i.e. was not replaced with it
+model.save(output_path('lstm_model.h5'))
+mark_trained_with_normalizer(output_path('lstm_model.h5'))  # The app then insists on the normalizer below
+fast_model.save(output_path('bandpower_model.json'))
+normalizer.save(output_path('normalizer.json'))
+filter_file = output_path('filter.json')
+if stream_filter is not None:
+    stream_filter.save(filter_file)
+elif os.path.exists(filter_file):
+    os.remove(filter_file)  # A filter from an earlier run would condition data this model never saw
+print(f'Saved the models, normalizer and filter to {output_dir}')
+
+# float16 and int8 exports for the app's NumPy runtime, with a report (lstm_model.precision.json) comparing
+# their accuracy, single-window latency and size with the float32 model on held-out test windows
+held_out = [(windows, labels) for _, (windows, labels) in zip(range(2), labeled_batches('test'))]
+export_all(output_path('lstm_model.h5'), np.concatenate([w for w, _ in held_out]), np.concatenate([l for _, l in held_out]))
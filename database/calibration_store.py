@@ -0,0 +1,162 @@
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+
+from database.database import get_connection, setup_db
+from eeg.metrics import LatencyTracker
+
+logger = logging.getLogger(__name__)
+
+# Each window's samples are stored as a float32 (channels, n_samples) BLOB.
+# user_id is repeated on the window rows so per-user/action lookups need one index only.
+_CREATE_TABLES = '''
+    CREATE TABLE IF NOT EXISTS calibration_sessions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER REFERENCES users(id),
+        started_at REAL NOT NULL,
+        sample_rate REAL,
+        channels INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS calibration_windows (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        session_id INTEGER NOT NULL REFERENCES calibration_sessions(id) ON DELETE CASCADE,
+        user_id INTEGER,
+        action TEXT NOT NULL,
+        captured_at REAL NOT NULL,
+        n_samples INTEGER NOT NULL,
+        samples BLOB NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_sessions_user_time ON calibration_sessions (user_id, started_at);
+    CREATE INDEX IF NOT EXISTS idx_windows_user_action_time ON calibration_windows (user_id, action, captured_at);
+    CREATE INDEX IF NOT EXISTS idx_windows_session ON calibration_windows (session_id);
+'''
+_INSERT_SESSION = 'INSERT INTO calibration_sessions (user_id, started_at, sample_rate, channels) VALUES (?, ?, ?, ?)'
+_INSERT_WINDOW = '''
+    INSERT INTO calibration_windows (session_id, user_id, action, captured_at, n_samples, samples)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+_LAST_WINDOWS = '''
+    SELECT captured_at, n_samples, samples FROM calibration_windows
+    WHERE user_id IS ? AND action = ? ORDER BY captured_at DESC LIMIT ?
+'''
+_SESSION_WINDOWS = '''
+    SELECT action, captured_at, n_samples, samples FROM calibration_windows
+    WHERE session_id = ? ORDER BY id
+'''
+_USER_SESSIONS = '''
+    SELECT id, started_at, sample_rate, channels FROM calibration_sessions
+    WHERE user_id IS ? ORDER BY started_at DESC LIMIT ?
+'''
+
+
+def setup_calibration_tables():
+    # Sessions reference users(id) and foreign keys are enforced, so the users table must exist too
+    setup_db()
+    conn = get_connection()
+    with conn:
+        conn.executescript(_CREATE_TABLES)
+
+
+def _decode(n_samples, blob):
+    # Zero-copy view of the BLOB; read-only, like the bytes it wraps
+    return np.frombuffer(blob, dtype=np.float32).reshape(-1, n_samples)
+
+
+def save_session(user_id, segments, sample_rate=None):
+    """Store a calibration session in one transaction and return its id.
+
+    `segments` is an iterable of (action, window, timestamp) with each window
+    shaped (channels, n_samples), as collected by MainWindow.
+    """
+    segments = [(action, np.ascontiguousarray(window, dtype=np.float32), timestamp)
+                for action, window, timestamp in segments]
+    if not segments:
+        raise ValueError("No calibration windows to save")
+    started_at = min(timestamp for _, _, timestamp in segments)
+    conn = get_connection()
+    with conn:
+        session_id = conn.execute(_INSERT_SESSION, (user_id, started_at, sample_rate, segments[0][1].shape[0])).lastrowid
+        conn.executemany(_INSERT_WINDOW, (
+            (session_id, user_id, action, timestamp, window.shape[1], window.tobytes())
+            for action, window, timestamp in segments
+        ))
+    logger.info("Saved calibration session %d with %d windows", session_id, len(segments))
+    return session_id
+
+
+def last_windows(user_id, action, n):
+    """Return (timestamps, windows) for the user's newest `n` windows of `action`, newest first.
+
+    `windows` has shape (count, channels, n_samples).
+    """
+    rows = get_connection().execute(_LAST_WINDOWS, (user_id, action, n)).fetchall()
+    if not rows:
+        return np.empty(0), np.empty((0, 0, 0), dtype=np.float32)
+    timestamps = np.array([row[0] for row in rows])
+    return timestamps, np.stack([_decode(n_samples, blob) for _, n_samples, blob in rows])
+
+
+def session_windows(session_id):
+    """Return [(action, timestamp, window)] for a session in capture order."""
+    rows = get_connection().execute(_SESSION_WINDOWS, (session_id,)).fetchall()
+    return [(action, captured_at, _decode(n_samples, blob)) for action, captured_at, n_samples, blob in rows]
+
+
+def user_sessions(user_id, limit=20):
+    return get_connection().execute(_USER_SESSIONS, (user_id, limit)).fetchall()
+
+
+class CalibrationStore:
+    """Saves calibration sessions on a background thread.
+
+    `save_async` returns a Future resolving to the new session id, so the Tk
+    thread never waits on disk I/O. The tables are created on the worker
+    thread before the first save, however the app was started.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self.latency = LatencyTracker('calibration save', history=100)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="calibration-store", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        """Finish queued saves, then stop."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def save_async(self, user_id, segments, sample_rate=None):
+        future = Future()
+        # Copy the list so later calibration runs cannot change what gets saved
+        self._queue.put((future, user_id, list(segments), sample_rate))
+        self.start()
+        return future
+
+    def _run(self):
+        try:
+            setup_calibration_tables()
+        except Exception as e:
+            # Each save below fails with the underlying error and reports it through its future
+            logger.error("Could not create the calibration tables: %s", e)
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            future, user_id, segments, sample_rate = item
+            try:
+                with self.latency.time():
+                    session_id = save_session(user_id, segments, sample_rate)
+                future.set_result(session_id)
+            except Exception as e:
+                logger.error("Failed to save calibration session: %s", e)
+                future.set_exception(e)
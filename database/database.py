@@ -1,65 +1,136 @@
+import logging
 import sqlite3
+import threading
 from hashlib import sha256
 
+DB_PATH = 'users.db'
+
+logger = logging.getLogger(__name__)
+
+# Statements are kept as module constants so sqlite3's statement cache reuses
+# the prepared statements on every call
+_CREATE_USERS = '''
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT NOT NULL UNIQUE,
+        password TEXT NOT NULL,
+        accessibility_challenge TEXT,
+        height REAL,
+        weight REAL,
+        eye_color TEXT,
+        ipd REAL,
+        astigmatism TEXT,
+        disabilities TEXT,
+        gender TEXT,
+        birthdate TEXT
+    )
+'''
+_INSERT_USER = '''
+    INSERT INTO users (username, password, accessibility_challenge, height, weight, eye_color, ipd, astigmatism, disabilities, gender, birthdate)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+_INSERT_USER_IF_NEW = _INSERT_USER.replace('INSERT INTO', 'INSERT OR IGNORE INTO')
+_LOGIN_USER = 'SELECT id, username FROM users WHERE username = ? AND password = ?'
+
+
+class ConnectionPool:
+    """Keeps one persistent connection per thread to a WAL-mode database.
+
+    WAL lets readers (logins) run while a writer commits, and synchronous=NORMAL
+    avoids an fsync per transaction, which is still durable across app crashes.
+    """
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # check_same_thread=False only so close_all() can run from any thread;
+            # each connection is still used by the thread that opened it
+            conn = sqlite3.connect(self.path, cached_statements=256, check_same_thread=False, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA foreign_keys=ON')
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def close_all(self):
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+        self._local = threading.local()
+
+
+_pool = ConnectionPool()
+
+
+def configure(path):
+    """Point the module at another database file (closes existing connections)."""
+    global _pool
+    _pool.close_all()
+    _pool = ConnectionPool(path)
+
+
+def get_connection():
+    return _pool.connection()
+
+
 def setup_db():
-    conn = sqlite3.connect('users.db')
-    c = conn.cursor()
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT NOT NULL UNIQUE,
-            password TEXT NOT NULL,
-            accessibility_challenge TEXT,
-            height REAL,
-            weight REAL,
-            eye_color TEXT,
-            ipd REAL,
-            astigmatism TEXT,
-            disabilities TEXT,
-            gender TEXT,
-            birthdate TEXT
-        )
-    ''')
-    conn.commit()
-    conn.close()
+    conn = get_connection()
+    with conn:
+        conn.execute(_CREATE_USERS)
 
 def hash_password(password):
     return sha256(password.encode()).hexdigest()
 
+def _user_row(data):
+    return (
+        data['Username'], hash_password(data['Password']), data['Accessibility Challenge'], data['Height (cm)'],
+        data['Weight (kg)'], data['Eye Color'], data['IPD (mm)'], data['Astigmatism (Yes/No)'],
+        data['Disabilities'], data['Gender'], data['Birthdate (YYYY-MM-DD)']
+    )
+
 def register_user(data):
-    print(f"Attempting to register user: {data['Username']}")
-    conn = sqlite3.connect('users.db')
-    c = conn.cursor()
+    logger.info("Attempting to register user: %s", data['Username'])
+    conn = get_connection()
     try:
-        c.execute('''
-            INSERT INTO users (username, password, accessibility_challenge, height, weight, eye_color, ipd, astigmatism, disabilities, gender, birthdate)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            data['Username'], hash_password(data['Password']), data['Accessibility Challenge'], data['Height (cm)'],
-            data['Weight (kg)'], data['Eye Color'], data['IPD (mm)'], data['Astigmatism (Yes/No)'],
-            data['Disabilities'], data['Gender'], data['Birthdate (YYYY-MM-DD)']
-        ))
-        conn.commit()
-        print("User registered successfully")
+        with conn:
+            conn.execute(_INSERT_USER, _user_row(data))
+        logger.info("User registered successfully")
         return True
     except sqlite3.IntegrityError as e:
-        print(f"IntegrityError: {e}")
+        logger.warning("IntegrityError: %s", e)
         return False
-    finally:
-        conn.close()
+
+def register_users(users):
+    """Register many users (dicts in the register_user format) in one transaction.
+
+    Usernames that already exist are skipped. Returns the number of users added.
+    """
+    conn = get_connection()
+    before = conn.total_changes
+    with conn:
+        conn.executemany(_INSERT_USER_IF_NEW, (_user_row(data) for data in users))
+    added = conn.total_changes - before
+    logger.info("Registered %d users in one batch", added)
+    return added
 
 def login_user(username, password):
-    print(f"Attempting to login user: {username}")
-    conn = sqlite3.connect('users.db')
-    c = conn.cursor()
-    c.execute('SELECT * FROM users WHERE username = ? AND password = ?', (username, hash_password(password)))
-    user = c.fetchone()
-    conn.close()
+    """Return (id, username) for valid credentials, otherwise None."""
+    logger.info("Attempting to login user: %s", username)
+    user = get_connection().execute(_LOGIN_USER, (username, hash_password(password))).fetchone()
     if user:
-        print("Login successful")
+        logger.info("Login successful")
         return user
     else:
-        print("Login failed")
+        logger.info("Login failed for user: %s", username)
         return None
 
 if __name__ == "__main__":
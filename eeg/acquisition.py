@@ -0,0 +1,190 @@
+"""
+Continuous EEG acquisition.
+
+A background reader pulls chunks from a hardware source and writes them into a
+preallocated, fixed-size ring buffer (channels x samples). Consumers read the
+latest N samples, or everything written since a cursor, as NumPy views into
+that buffer, so no per-read allocation or copying takes place.
+"""
+
+import threading
+import time
+
+import numpy as np
+
+
+class RingBuffer:
+    """Fixed-size (channels x capacity) sample store.
+
+    Every sample is written twice, at position i and i + capacity, so any run of
+    up to `capacity` consecutive samples is a contiguous slice of the backing
+    array and can be handed out as a view.
+    """
+
+    def __init__(self, channels, capacity, dtype=np.float32):
+        self.channels = channels
+        self.capacity = capacity
+        self._data = np.zeros((channels, 2 * capacity), dtype=dtype)
+        self._arrival = np.zeros(capacity)  # perf_counter time at which each sample was written
+        self._total = 0  # Number of samples ever written
+        self._last_write_time = None
+        self._cond = threading.Condition()
+
+    @property
+    def total_written(self):
+        return self._total
+
+    @property
+    def last_write_time(self):
+        return self._last_write_time
+
+    def write(self, chunk):
+        chunk = np.asarray(chunk)
+        if chunk.ndim != 2 or chunk.shape[0] != self.channels:
+            raise ValueError(f"Expected a ({self.channels}, n) chunk, got {chunk.shape}")
+        n = chunk.shape[1]
+        skipped = 0
+        if n > self.capacity:
+            # Only the newest `capacity` samples can be kept
+            skipped = n - self.capacity
+            chunk = chunk[:, skipped:]
+            n = self.capacity
+
+        cap = self.capacity
+        start = (self._total + skipped) % cap
+        first = min(n, cap - start)
+        rest = n - first
+        data = self._data
+        data[:, start:start + first] = chunk[:, :first]
+        data[:, start + cap:start + cap + first] = chunk[:, :first]
+        if rest:
+            data[:, :rest] = chunk[:, first:]
+            data[:, cap:cap + rest] = chunk[:, first:]
+        now = time.perf_counter()
+        self._arrival[start:start + first] = now
+        self._arrival[:rest] = now
+
+        with self._cond:
+            self._total += skipped + n
+            self._last_write_time = now
+            self._cond.notify_all()
+
+    def _view(self, start_sample, end_sample):
+        start = start_sample % self.capacity
+        return self._data[:, start:start + (end_sample - start_sample)]
+
+    def arrival_time(self, sample_index):
+        """perf_counter time at which sample `sample_index` (0-based, still buffered) was written."""
+        return self._arrival[sample_index % self.capacity]
+
+    def latest(self, n):
+        """Return a view of the newest `n` samples (fewer if not yet available)."""
+        total = self._total
+        n = min(n, total, self.capacity)
+        return self._view(total - n, total)
+
+    def read_since(self, cursor):
+        """Return (view, new_cursor, dropped) for samples written after `cursor`.
+
+        `dropped` counts samples that were overwritten before they could be read.
+        """
+        total = self._total
+        dropped = 0
+        if total - cursor > self.capacity:
+            dropped = total - cursor - self.capacity
+            cursor = total - self.capacity
+        return self._view(cursor, total), total, dropped
+
+    def wait_for(self, total, timeout=None):
+        """Block until at least `total` samples have been written."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._total >= total, timeout)
+
+    def clear(self):
+        with self._cond:
+            self._total = 0
+            self._last_write_time = None
+
+
+class AcquisitionEngine:
+    """Background reader that keeps a RingBuffer filled from an EEG source.
+
+    `source` needs a `read_chunk(n)` method returning a (channels, n) array.
+    Sources that block until data is ready are read as fast as they deliver;
+    non-blocking (simulated or replayed) sources are paced at `sample_rate`,
+    multiplied by the source's `speed` attribute if it has one (an infinite
+    speed disables pacing).
+
+    With a `stream_filter` (see eeg.filters), every chunk is filtered on the
+    reader thread as it arrives, so the filter state follows the stream.
+    `buffer`, `latest` and `read_since` then hold the filtered signal and
+    `raw_buffer` / `latest(n, raw=True)` the readings as delivered, which the
+    signal-quality checks need. Without a filter both are the same buffer.
+
+    Views returned by `latest` and `read_since` alias the ring buffer and are
+    overwritten once the buffer wraps; copy them if they must outlive that.
+    """
+
+    def __init__(self, source, sample_rate=250, channels=6, buffer_seconds=10.0, chunk_size=None,
+                 stream_filter=None):
+        self.source = source
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size or max(1, sample_rate // 50)  # ~20 ms per chunk
+        self.stream_filter = stream_filter
+        self.raw_buffer = RingBuffer(channels, int(sample_rate * buffer_seconds))
+        self.buffer = RingBuffer(channels, self.raw_buffer.capacity) if stream_filter else self.raw_buffer
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def cursor(self):
+        return self.buffer.total_written
+
+    def start(self):
+        if self.running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="eeg-acquisition", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def latest(self, n, raw=False):
+        return (self.raw_buffer if raw else self.buffer).latest(n)
+
+    def read_since(self, cursor):
+        return self.buffer.read_since(cursor)
+
+    def wait_for(self, total, timeout=None):
+        return self.buffer.wait_for(total, timeout)
+
+    def _run(self):
+        period = self.chunk_size / (self.sample_rate * getattr(self.source, 'speed', 1.0))
+        next_time = time.perf_counter()
+        while not self._stop_event.is_set():
+            try:
+                chunk = self.source.read_chunk(self.chunk_size)
+            except Exception as e:
+                print(f"EEG acquisition error: {e}")
+                self._stop_event.wait(period)
+                continue
+            if self.stream_filter is not None:
+                self.raw_buffer.write(chunk)
+                chunk = self.stream_filter.process(chunk)
+            self.buffer.write(chunk)
+
+            next_time += period
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                self._stop_event.wait(delay)
+            elif -delay > self.buffer.capacity / self.sample_rate:
+                # Fell more than a whole buffer behind; resynchronise instead of bursting
+                next_time = time.perf_counter()
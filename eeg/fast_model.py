@@ -0,0 +1,106 @@
+"""
+Band-power fast classifier.
+
+A linear (multinomial logistic) model on log band powers of every channel,
+fitted by the training script on the same normalized windows as the LSTM
+and saved as JSON next to it (models/bandpower_model.json). Inference is a
+batched FFT, a matrix product into bands and one more into class scores,
+so a window costs a fraction of a millisecond without TensorFlow.
+
+The test-set accuracy of both models is stored with the weights, so the
+accuracy given up by switching to this model is known up front.
+"""
+
+import json
+
+import numpy as np
+
+from eeg.features import BANDS, BandPowerExtractor
+
+
+class BandPowerClassifier:
+    def __init__(self, coef, intercept, sample_rate=250, window_size=100, channels=6, bands=None,
+                 accuracy=None, reference_accuracy=None):
+        self.coef = np.asarray(coef, dtype=np.float32)  # (channels * bands, n_classes)
+        self.intercept = np.asarray(intercept, dtype=np.float32)
+        self.sample_rate = sample_rate
+        self.window_shape = (window_size, channels)
+        self.bands = dict(bands or BANDS)
+        self.accuracy = accuracy
+        self.reference_accuracy = reference_accuracy  # The LSTM's accuracy on the same test windows
+        self.extractor = BandPowerExtractor(sample_rate, window_size, self.bands)
+
+    @classmethod
+    def fit(cls, windows, labels, n_classes=None, sample_rate=250, bands=None, C=1.0):
+        """Fit on (n, window_size, channels) normalized windows and 0-based class labels (needs scikit-learn)."""
+        return cls.fit_batches([(windows, labels)], n_classes, sample_rate, bands, C)
+
+    @classmethod
+    def fit_batches(cls, batches, n_classes=None, sample_rate=250, bands=None, C=1.0):
+        """Fit on an iterable of (windows, labels) batches; only the band powers are kept in memory."""
+        from sklearn.linear_model import LogisticRegression
+
+        extractor = shape = None
+        all_features, all_labels = [], []
+        for windows, labels in batches:
+            windows = np.asarray(windows, dtype=np.float32)
+            if extractor is None:
+                extractor = BandPowerExtractor(sample_rate, windows.shape[1], bands)
+                shape = windows.shape[1:]
+            all_features.append(extractor(windows))
+            all_labels.append(np.asarray(labels))
+        if extractor is None:
+            raise ValueError("No windows to fit the band-power model on")
+        features, labels = np.concatenate(all_features), np.concatenate(all_labels)
+        mean, std = features.mean(axis=0), features.std(axis=0) + 1e-6
+        model = LogisticRegression(C=C, max_iter=1000).fit((features - mean) / std, labels)
+        # Standardization is folded into the weights, so inference is a single matrix product.
+        # Labels absent from the training data get a very low score rather than a missing column
+        n_classes = n_classes or int(labels.max()) + 1
+        coef = np.zeros((features.shape[1], n_classes), dtype=np.float32)
+        intercept = np.full(n_classes, -1e4, dtype=np.float32)
+        weights = model.coef_ if len(model.classes_) > 2 else np.vstack([-model.coef_, model.coef_]) / 2
+        biases = model.intercept_ if len(model.classes_) > 2 else np.concatenate([-model.intercept_,
+                                                                                  model.intercept_]) / 2
+        coef[:, model.classes_] = (weights / std).T
+        intercept[model.classes_] = biases - (mean / std) @ weights.T
+        return cls(coef, intercept, sample_rate, shape[0], shape[1], extractor.bands)
+
+    def predict(self, batch):
+        """(n, window_size, channels) windows -> (n, n_classes) probabilities."""
+        scores = self.extractor(batch) @ self.coef + self.intercept
+        scores -= scores.max(axis=1, keepdims=True)
+        np.exp(scores, out=scores)
+        scores /= scores.sum(axis=1, keepdims=True)
+        return scores
+
+    def score(self, windows, labels):
+        return float((self.predict(windows).argmax(axis=1) == np.asarray(labels)).mean())
+
+    def score_batches(self, batches):
+        correct = total = 0
+        for windows, labels in batches:
+            correct += int((self.predict(windows).argmax(axis=1) == np.asarray(labels)).sum())
+            total += len(labels)
+        return correct / total if total else None
+
+    def to_dict(self):
+        return {
+            'sample_rate': self.sample_rate,
+            'window_size': self.window_shape[0],
+            'channels': self.window_shape[1],
+            'bands': self.bands,
+            'coef': self.coef.tolist(),
+            'intercept': self.intercept.tolist(),
+            'accuracy': self.accuracy,
+            'reference_accuracy': self.reference_accuracy,
+        }
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls(**json.load(f))
@@ -0,0 +1,66 @@
+"""
+Spectral features for EEG windows.
+
+Band power is computed for all windows and channels at once: one real FFT
+along the time axis, then a matrix product that sums the power spectrum into
+frequency bands.
+
+Features are not cached: sliding windows overlap but never repeat, so a
+cache keyed on window contents would miss on every call in the app.
+"""
+
+import numpy as np
+
+# Standard EEG bands in Hz, [low, high)
+BANDS = {
+    'delta': (1.0, 4.0),
+    'theta': (4.0, 8.0),
+    'alpha': (8.0, 13.0),
+    'beta': (13.0, 30.0),
+    'gamma': (30.0, 45.0),
+}
+
+
+class BandPowerExtractor:
+    """Turns (n, window_size, channels) windows into (n, channels * bands) log band powers.
+
+    Features are ordered channel-major: all bands of channel 1, then channel 2, ...
+    """
+
+    def __init__(self, sample_rate=250, window_size=100, bands=None, log=True):
+        self.sample_rate = sample_rate
+        self.window_size = window_size
+        self.bands = dict(bands or BANDS)
+        self.log = log
+        self._taper = np.hanning(window_size).astype(np.float32)[:, np.newaxis]
+        freqs = np.fft.rfftfreq(window_size, 1.0 / sample_rate)
+        # (bands, frequencies) 0/1 matrix; a band narrower than the resolution gets its nearest bin
+        matrix = np.zeros((len(self.bands), len(freqs)), dtype=np.float32)
+        for row, (low, high) in enumerate(self.bands.values()):
+            in_band = (freqs >= low) & (freqs < high)
+            if not in_band.any():
+                in_band[np.argmin(np.abs(freqs - (low + high) / 2))] = True
+            matrix[row, in_band] = 1.0
+        self.band_matrix = matrix
+
+    @property
+    def n_bands(self):
+        return len(self.bands)
+
+    def transform(self, windows):
+        x = np.asarray(windows, dtype=np.float32)
+        if x.ndim == 2:
+            x = x[np.newaxis]
+        x = x - x.mean(axis=1, keepdims=True)
+        x *= self._taper
+        spectrum = np.fft.rfft(x, axis=1)
+        power = (spectrum.real ** 2 + spectrum.imag ** 2).astype(np.float32)
+        # (bands, F) @ (n, F, channels) -> (n, bands, channels)
+        band_power = np.matmul(self.band_matrix, power)
+        features = band_power.transpose(0, 2, 1).reshape(len(x), -1)
+        if self.log:
+            features = np.log1p(features)
+        return features
+
+    __call__ = transform
+
@@ -0,0 +1,137 @@
+"""
+Online band-pass and mains-notch filtering.
+
+The filter is one cascade of second-order sections (a Butterworth band-pass
+followed by an IIR notch) applied with scipy's sosfilt along the sample axis,
+so all channels are filtered in a single call. The section state is kept
+between calls: feeding a recording chunk by chunk gives exactly the same
+output as filtering it in one go, which is what `apply` does for stored
+sessions. `apply` also takes a batch of separate snapshots (e.g. the
+100-sample windows of a calibration session) and filters each from its own
+fresh state, so no transient runs from one snapshot into the next.
+
+The state starts at the filter's steady-state response to the first sample
+(sosfilt_zi), so a DC offset does not ring through the first second of data.
+
+Every `process` call is timed against `budget_ms`, the share of the
+acquisition period the filter may take. Calls over budget are counted and
+reported once, since a filter that cannot keep up delays every window behind
+it.
+
+The design is saved next to the model (models/filter.json) by the training
+script, and the app filters the live stream only when that file exists, so
+the model always sees data conditioned the way it was trained.
+"""
+
+import json
+import time
+
+import numpy as np
+from scipy import signal
+
+from eeg.metrics import LatencyTracker
+
+
+class StreamingFilter:
+    def __init__(self, sample_rate, channels, band=(1.0, 40.0), notch=50.0, order=4, notch_q=30.0,
+                 budget_ms=2.0):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.band = tuple(band) if band else None
+        self.notch = notch
+        self.order = order
+        self.notch_q = notch_q
+        self.budget_ms = budget_ms
+        self.sos = self._design()
+        self._zi_unit = signal.sosfilt_zi(self.sos)  # (sections, 2) steady state for a unit step
+        self._zi = None
+        self.latency = LatencyTracker('filter per chunk')
+        self.over_budget = 0
+
+    def _design(self):
+        nyquist = self.sample_rate / 2
+        sections = []
+        if self.band:
+            low, high = self.band
+            if low and high and high < nyquist:
+                sections.append(signal.butter(self.order, (low, high), btype='bandpass', output='sos',
+                                              fs=self.sample_rate))
+            elif low:
+                sections.append(signal.butter(self.order, low, btype='highpass', output='sos', fs=self.sample_rate))
+            elif high and high < nyquist:
+                sections.append(signal.butter(self.order, high, btype='lowpass', output='sos', fs=self.sample_rate))
+        if self.notch and self.notch < nyquist:
+            b, a = signal.iirnotch(self.notch, self.notch_q, fs=self.sample_rate)
+            sections.append(signal.tf2sos(b, a))
+        if not sections:
+            raise ValueError("Filter has neither a usable band nor a notch")
+        return np.vstack(sections)
+
+    def reset(self):
+        self._zi = None
+
+    def clone(self):
+        """A filter with the same design and fresh state (e.g. one per recording)."""
+        return StreamingFilter(self.sample_rate, self.channels, self.band, self.notch, self.order, self.notch_q,
+                               self.budget_ms)
+
+    def _initial_state(self, first_sample):
+        # (sections, ..., channels, 2): each channel starts settled at its first reading
+        first_sample = np.asarray(first_sample, dtype=np.float64)
+        unit = self._zi_unit.reshape((len(self._zi_unit),) + (1,) * first_sample.ndim + (2,))
+        return unit * first_sample[np.newaxis, ..., np.newaxis]
+
+    def process(self, chunk):
+        """Filter the next (channels, n) chunk of the stream; returns float32 (channels, n)."""
+        start = time.perf_counter()
+        chunk = np.asarray(chunk, dtype=np.float64)
+        if chunk.shape[1] == 0:
+            return chunk.astype(np.float32)
+        first = self._zi is None
+        if first:
+            self._zi = self._initial_state(chunk[:, 0])
+        filtered, self._zi = signal.sosfilt(self.sos, chunk, axis=1, zi=self._zi)
+        filtered = filtered.astype(np.float32)
+        elapsed = time.perf_counter() - start
+        self.latency.record(elapsed)
+        # The first call pays for scipy's lazy set-up and is not held against the budget
+        if self.budget_ms is not None and elapsed * 1000 > self.budget_ms and not first:
+            if not self.over_budget:
+                print(f"Filtering a {chunk.shape[1]}-sample chunk took {elapsed * 1000:.2f} ms, "
+                      f"over the {self.budget_ms:g} ms budget")
+            self.over_budget += 1
+        return filtered
+
+    def apply(self, data):
+        """Filter a whole (channels, n) recording, or each of (..., channels, n) snapshots, from a fresh state.
+
+        For one recording the output is the same as streaming it through `process`.
+        """
+        data = np.asarray(data, dtype=np.float64)
+        if data.shape[-1] == 0:
+            return data.astype(np.float32)
+        filtered, _ = signal.sosfilt(self.sos, data, axis=-1, zi=self._initial_state(data[..., 0]))
+        return filtered.astype(np.float32)
+
+    def fits_budget(self, chunk_size, repeats=200):
+        """Time `repeats` chunks of `chunk_size` samples on a scratch copy; returns (mean ms, within budget)."""
+        scratch = self.clone()
+        scratch.budget_ms = None
+        chunk = np.random.default_rng(0).normal(0, 10, (self.channels, chunk_size))
+        for _ in range(repeats):
+            scratch.process(chunk)
+        mean_ms = scratch.latency.summary()['mean_ms']
+        return mean_ms, self.budget_ms is None or mean_ms <= self.budget_ms
+
+    def to_dict(self):
+        return {'sample_rate': self.sample_rate, 'channels': self.channels, 'band': self.band,
+                'notch': self.notch, 'order': self.order, 'notch_q': self.notch_q, 'budget_ms': self.budget_ms}
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls(**json.load(f))
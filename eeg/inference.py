@@ -0,0 +1,231 @@
+"""
+Low-overhead inference around the LSTM classifier.
+
+`Model.predict` sets up a data pipeline on every call, which costs far more
+than the forward pass itself for a single (1, 100, 6) window. InferenceEngine
+calls a traced function directly instead, and MicroBatcher lets several
+threads share one forward pass by grouping windows that arrive close together.
+AdaptiveEngine swaps in a cheaper model while the main one is over its
+latency budget.
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+from eeg.metrics import LatencyTracker
+
+
+class InferenceEngine:
+    """Wraps a `forward(batch) -> probabilities` callable and tracks its latency.
+
+    `batch` is a float32 array of shape (n, timesteps, features).
+    """
+
+    def __init__(self, forward, window_shape=(100, 6)):
+        self._forward = forward
+        self.window_shape = tuple(window_shape)
+        self.latency = LatencyTracker('inference')
+
+    @classmethod
+    def load(cls, model_path, backend='numpy', precision='float32'):
+        """Build an engine for a Keras `.h5` model on the 'numpy' or 'keras' backend.
+
+        `precision` selects a float16/int8 export (see eeg.quantization); numpy backend only.
+        """
+        if precision != 'float32' and backend != 'numpy':
+            raise ValueError(f"{precision} models are only supported by the numpy backend")
+        if backend == 'numpy':
+            from eeg.quantization import load_model_precision
+
+            model = load_model_precision(model_path, precision)
+            engine = cls(model.predict, model.window_shape)
+            engine.warm_up()
+            return engine
+        if backend == 'keras':
+            import tensorflow as tf
+
+            return cls.from_keras(tf.keras.models.load_model(model_path))
+        raise ValueError(f"Unknown inference backend: {backend}")
+
+    @classmethod
+    def from_keras(cls, model):
+        import tensorflow as tf
+
+        window_shape = tuple(model.input_shape[1:])
+        # A fixed, batch-agnostic signature means the graph is traced exactly once
+        signature = [tf.TensorSpec((None,) + window_shape, tf.float32)]
+        traced = tf.function(lambda x: model(x, training=False), input_signature=signature)
+
+        def forward(batch):
+            return traced(tf.convert_to_tensor(batch)).numpy()
+
+        engine = cls(forward, window_shape)
+        engine.warm_up()
+        return engine
+
+    def warm_up(self):
+        # The first call traces/initialises the model; keep it out of the latency stats
+        self._forward(np.zeros((1,) + self.window_shape, dtype=np.float32))
+
+    def predict_batch(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+        start = time.perf_counter()
+        predictions = self._forward(batch)
+        self.latency.record(time.perf_counter() - start)
+        return predictions
+
+    def predict(self, window):
+        """Classify a single window; returns probabilities of shape (1, n_classes)."""
+        window = np.asarray(window, dtype=np.float32)
+        return self.predict_batch(window.reshape((1,) + self.window_shape))
+
+
+class AdaptiveEngine:
+    """Runs `primary` and falls back to `fast` while the primary is too slow.
+
+    When the median per-window latency of the last `window` primary calls
+    (call time divided by batch size, so a large MicroBatcher batch is not
+    mistaken for a slow model) exceeds `budget` seconds, e.g. because the
+    machine is busy, calls go to `fast` for `hold` seconds; then the primary
+    is tried again. Both engines take the same
+    preprocessed (n, timesteps, features) batches. Exposes the InferenceEngine
+    interface, so it can sit behind a MicroBatcher or the control-mode
+    classifier unchanged.
+    """
+
+    def __init__(self, primary, fast, budget=0.025, window=20, hold=5.0):
+        if tuple(fast.window_shape) != tuple(primary.window_shape):
+            raise ValueError(f"Fast model takes {fast.window_shape} windows, the primary {primary.window_shape}")
+        self.primary = primary
+        self.fast = fast
+        self.budget = budget
+        self.hold = hold
+        self.window_shape = primary.window_shape
+        self.latency = LatencyTracker('adaptive inference')
+        self.primary_windows = 0
+        self.fast_windows = 0
+        self.fallbacks = 0
+        self._recent = deque(maxlen=window)
+        self._fast_until = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def using_fast(self):
+        return time.perf_counter() < self._fast_until
+
+    def predict_batch(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+        use_fast = self.using_fast
+        start = time.perf_counter()
+        predictions = (self.fast if use_fast else self.primary).predict_batch(batch)
+        elapsed = time.perf_counter() - start
+        self.latency.record(elapsed)
+        with self._lock:
+            if use_fast:
+                self.fast_windows += len(batch)
+                return predictions
+            self.primary_windows += len(batch)
+            self._recent.append(elapsed / max(1, len(batch)))
+            if len(self._recent) == self._recent.maxlen and np.median(self._recent) > self.budget:
+                print(f"Inference over its {self.budget * 1000:.0f} ms budget "
+                      f"(median {np.median(self._recent) * 1000:.1f} ms per window); using the fast model for {self.hold:g} s")
+                self._fast_until = time.perf_counter() + self.hold
+                self._recent.clear()
+                self.fallbacks += 1
+        return predictions
+
+    def predict(self, window):
+        window = np.asarray(window, dtype=np.float32)
+        return self.predict_batch(window.reshape((1,) + tuple(self.window_shape)))
+
+    def warm_up(self):
+        self.primary.warm_up()
+        self.fast.warm_up()
+
+
+class MicroBatcher:
+    """Groups windows submitted from any thread into batched forward passes.
+
+    The worker takes the first queued window, then keeps collecting for up to
+    `max_wait` seconds or until `max_batch` windows are queued, and runs them
+    through the engine together. `submit` returns a Future for the window's
+    probability row.
+    """
+
+    def __init__(self, engine, max_batch=32, max_wait=0.002):
+        self.engine = engine
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.latency = LatencyTracker('batched inference')
+        self.batches = 0
+        self.windows = 0
+        self._queue = queue.Queue()
+        self._buffer = np.empty((max_batch,) + engine.window_shape, dtype=np.float32)
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="inference-batcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    @property
+    def mean_batch_size(self):
+        return self.windows / self.batches if self.batches else 0.0
+
+    def submit(self, window):
+        future = Future()
+        # Copy, so callers may pass views into buffers they go on to reuse
+        self._queue.put((np.array(window, dtype=np.float32).reshape(self.engine.window_shape),
+                         future, time.perf_counter()))
+        return future
+
+    def _collect(self):
+        item = self._queue.get()
+        if item is None:
+            return None
+        items = [item]
+        deadline = time.perf_counter() + self.max_wait
+        while len(items) < self.max_batch:
+            timeout = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)  # Finish this batch, then stop
+                break
+            items.append(item)
+        return items
+
+    def _run(self):
+        while True:
+            items = self._collect()
+            if items is None:
+                return
+            n = len(items)
+            for i, (window, _, _) in enumerate(items):
+                self._buffer[i] = window
+            try:
+                predictions = self.engine.predict_batch(self._buffer[:n])
+            except Exception as e:
+                for _, future, _ in items:
+                    future.set_exception(e)
+                continue
+            done = time.perf_counter()
+            self.batches += 1
+            self.windows += n
+            for i, (_, future, submitted) in enumerate(items):
+                self.latency.record(done - submitted)
+                future.set_result(predictions[i:i + 1].copy())
@@ -0,0 +1,174 @@
+"""
+Named stage timers and counters for the acquire -> preprocess -> predict ->
+render -> save path.
+
+Each stage is a LatencyTracker, so recording costs one lock and one deque
+append, and only the most recent samples are kept for the rolling
+percentiles and histograms. Components that already keep their own tracker
+(InferenceEngine.latency, SlidingWindowClassifier.latency, ...) are attached
+under a stage name instead of being timed twice.
+
+Snapshots can be exported as JSON or CSV, and cProfile can be switched on
+around a single run (it profiles the thread that starts it, i.e. the Tk thread).
+Components leave longer text results (a control-mode report, the last profile
+path) as notes, which the performance panel shows below the table.
+"""
+
+import csv
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+from eeg.metrics import LatencyTracker
+
+HISTOGRAM_EDGES_MS = (0.1, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+_NULL_STAGE = nullcontext()
+
+
+class Instrumentation:
+    def __init__(self, enabled=True, history=500):
+        self.enabled = enabled
+        self.history = history
+        self._timers = {}
+        self._counters = {}
+        self._notes = {}
+        self._attached = set()
+        self._lock = threading.Lock()
+        self._profiler = None
+        self.profile_next_run = False
+        self.started_at = time.time()
+
+    def timer(self, name):
+        tracker = self._timers.get(name)
+        if tracker is None:
+            with self._lock:
+                tracker = self._timers.setdefault(name, LatencyTracker(name, history=self.history))
+        return tracker
+
+    def trackers(self):
+        """Return [(stage name, LatencyTracker)] sorted by name."""
+        with self._lock:
+            return sorted(self._timers.items())
+
+    def attach(self, name, tracker):
+        """Report an existing LatencyTracker under `name`."""
+        with self._lock:
+            self._timers[name] = tracker
+            self._attached.add(name)
+
+    def stage(self, name):
+        """Context manager timing one execution of stage `name`."""
+        if not self.enabled:
+            return _NULL_STAGE
+        return self.timer(name).time()
+
+    def record(self, name, seconds):
+        if self.enabled:
+            self.timer(name).record(seconds)
+
+    def count(self, name, n=1):
+        if self.enabled:
+            with self._lock:
+                self._counters[name] = self._counters.get(name, 0) + n
+
+    def note(self, name, text):
+        """Keep `text` under `name`, replacing an earlier note of that name."""
+        with self._lock:
+            self._notes[name] = text
+
+    def notes(self):
+        with self._lock:
+            return list(self._notes.items())
+
+    def reset(self):
+        with self._lock:
+            # Attached trackers belong to their components; only our own timers start over
+            self._timers = {name: tracker for name, tracker in self._timers.items() if name in self._attached}
+            self._counters = {}
+            self._notes = {}
+        self.started_at = time.time()
+
+    def snapshot(self, edges_ms=HISTOGRAM_EDGES_MS):
+        with self._lock:
+            counters = dict(self._counters)
+        stages = {}
+        for name, tracker in self.trackers():
+            summary = tracker.summary()
+            summary['name'] = name
+            summary['histogram'] = tracker.histogram(edges_ms)
+            stages[name] = summary
+        return {'started_at': self.started_at, 'taken_at': time.time(), 'stages': stages, 'counters': counters}
+
+    def export_json(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+    def export_csv(self, path):
+        """One row per stage; histogram buckets become extra columns."""
+        snapshot = self.snapshot()
+        stages = list(snapshot['stages'].values())
+        bucket_labels = [label for label, _ in stages[0]['histogram']] if stages else []
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['stage', 'count', 'mean_ms', 'p50_ms', 'p99_ms', 'max_ms'] + bucket_labels)
+            for name, summary in snapshot['stages'].items():
+                writer.writerow([name] + [summary.get(key, '') for key in ('count', 'mean_ms', 'p50_ms', 'p99_ms',
+                                                                          'max_ms')]
+                                + [count for _, count in summary['histogram']])
+            for name, value in snapshot['counters'].items():
+                writer.writerow([f'counter:{name}', value])
+
+    def format_table(self):
+        lines = [f"{'stage':<24}{'n':>7}{'mean':>9}{'p50':>9}{'p99':>9}{'max':>9}  (ms)"]
+        for name, s in self.snapshot()['stages'].items():
+            if 'mean_ms' in s:
+                lines.append(f"{name:<24}{s['count']:>7}{s['mean_ms']:>9.2f}{s['p50_ms']:>9.2f}"
+                             f"{s['p99_ms']:>9.2f}{s['max_ms']:>9.2f}")
+            else:
+                lines.append(f"{name:<24}{s['count']:>7}")
+        with self._lock:
+            counters = sorted(self._counters.items())
+        if counters:
+            lines.append('')
+            lines.extend(f"{name:<24}{value:>7}" for name, value in counters)
+        return "\n".join(lines)
+
+    @property
+    def profiling(self):
+        return self._profiler is not None
+
+    def start_profile(self):
+        import cProfile
+
+        if self._profiler is None:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def stop_profile(self, directory='profiles', label='run', top=30):
+        """Stop profiling and write `<label>-<time>.prof` plus a text summary; returns the .prof path."""
+        import io
+        import pstats
+
+        if self._profiler is None:
+            return None
+        self._profiler.disable()
+        profiler, self._profiler = self._profiler, None
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{label}-{time.strftime('%Y%m%d-%H%M%S')}.prof")
+        profiler.dump_stats(path)
+        text = io.StringIO()
+        pstats.Stats(profiler, stream=text).sort_stats('cumulative').print_stats(top)
+        with open(os.path.splitext(path)[0] + '.txt', 'w') as f:
+            f.write(text.getvalue())
+        return path
+
+
+# One instance shared by the whole app; OMEGAVR_INSTRUMENT=0 turns recording off
+_instrumentation = Instrumentation(enabled=os.environ.get('OMEGAVR_INSTRUMENT', '1') != '0')
+_instrumentation.profile_next_run = os.environ.get('OMEGAVR_PROFILE_CALIBRATION') == '1'
+
+
+def get_instrumentation():
+    return _instrumentation
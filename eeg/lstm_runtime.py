@@ -0,0 +1,197 @@
+"""
+Pure-NumPy runtime for the Keras LSTM classifier.
+
+The weights and layer configuration are read from the Keras `.h5` file once
+and cached next to it as a compact `.npz`, so the app can classify windows
+without importing TensorFlow. Supported layers are the ones the training
+script builds: LSTM (tanh/sigmoid) followed by Dense layers.
+"""
+
+import json
+import os
+
+import numpy as np
+
+
+def _sigmoid_(x):
+    # In-place sigmoid, written via tanh so large inputs cannot overflow
+    x *= 0.5
+    np.tanh(x, out=x)
+    x *= 0.5
+    x += 0.5
+    return x
+
+
+def _softmax(x):
+    x = x - x.max(axis=-1, keepdims=True)
+    np.exp(x, out=x)
+    x /= x.sum(axis=-1, keepdims=True)
+    return x
+
+
+_ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0, out=x),
+    'tanh': lambda x: np.tanh(x, out=x),
+    'sigmoid': _sigmoid_,
+    'softmax': _softmax,
+}
+
+
+def _decode(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def read_h5_model(h5_path):
+    """Return (layers, weights) from a Keras `.h5` file.
+
+    `layers` is a list of {'type', 'name', ...} dicts and `weights` maps
+    '<index>/<weight>' to float32 arrays.
+    """
+    import h5py
+
+    layers = []
+    weights = {}
+    with h5py.File(h5_path, 'r') as f:
+        config = json.loads(_decode(f.attrs['model_config']))
+        weight_group = f['model_weights']
+        for layer in config['config']['layers']:
+            kind = layer['class_name']
+            cfg = layer['config']
+            if kind == 'InputLayer':
+                continue
+            if kind not in ('LSTM', 'Dense'):
+                raise ValueError(f"Unsupported layer type for the NumPy runtime: {kind}")
+            if cfg.get('activation') not in _ACTIVATIONS:
+                raise ValueError(f"Unsupported activation {cfg.get('activation')!r} in {cfg['name']}")
+
+            index = len(layers)
+            group = weight_group[cfg['name']]
+            names = [_decode(n) for n in group.attrs['weight_names']]
+            arrays = {n.split('/')[-1]: np.asarray(group[n], dtype=np.float32) for n in names}
+            if kind == 'LSTM':
+                if cfg.get('recurrent_activation') != 'sigmoid' or cfg.get('go_backwards') or cfg.get('stateful'):
+                    raise ValueError(f"Unsupported LSTM configuration in {cfg['name']}")
+                layers.append({'type': 'lstm', 'name': cfg['name'], 'units': cfg['units'],
+                               'activation': cfg['activation'],
+                               'return_sequences': cfg.get('return_sequences', False)})
+                units = cfg['units']
+                bias = arrays.get('bias', np.zeros(4 * units, dtype=np.float32))
+                # Keras orders the gates i, f, c, o; store them as i, f, o, c so the three
+                # sigmoid gates form one contiguous block
+                order = np.r_[0:2 * units, 3 * units:4 * units, 2 * units:3 * units]
+                weights[f'{index}/kernel'] = arrays['kernel'][:, order]
+                weights[f'{index}/recurrent_kernel'] = arrays['recurrent_kernel'][:, order]
+                weights[f'{index}/bias'] = bias[order]
+            else:
+                layers.append({'type': 'dense', 'name': cfg['name'], 'units': cfg['units'],
+                               'activation': cfg['activation']})
+                weights[f'{index}/kernel'] = arrays['kernel']
+                weights[f'{index}/bias'] = arrays.get('bias', np.zeros(cfg['units'], dtype=np.float32))
+            if index == 0:
+                input_shape = config['config'].get('build_input_shape') or config['config']['layers'][0]['config']['batch_shape']
+                layers[0]['input_shape'] = list(input_shape[1:])
+    return layers, weights
+
+
+def cache_path_for(h5_path):
+    return os.path.splitext(h5_path)[0] + '.npz'
+
+
+def save_cache(path, layers, weights):
+    np.savez(path, __layers__=np.array(json.dumps(layers)), **weights)
+
+
+def load_cache(path):
+    with np.load(path) as data:
+        layers = json.loads(str(data['__layers__']))
+        weights = {k: data[k] for k in data.files if k != '__layers__'}
+    return layers, weights
+
+
+class NumpyLSTMModel:
+    """Forward pass of an LSTM + Dense stack over batches of (timesteps, features) windows."""
+
+    def __init__(self, layers, weights):
+        self.layers = layers
+        self.weights = weights
+        self.window_shape = tuple(layers[0]['input_shape'])
+        self.input_shape = (None,) + self.window_shape
+
+    @classmethod
+    def load(cls, h5_path, use_cache=True):
+        """Load from the `.npz` cache, (re)building it from `h5_path` when stale."""
+        cache = cache_path_for(h5_path)
+        if use_cache and os.path.exists(cache) and (
+                not os.path.exists(h5_path) or os.path.getmtime(cache) >= os.path.getmtime(h5_path)):
+            return cls(*load_cache(cache))
+        layers, weights = read_h5_model(h5_path)
+        if use_cache:
+            try:
+                save_cache(cache, layers, weights)
+            except OSError as e:
+                print(f"Could not write model cache {cache}: {e}")
+        return cls(layers, weights)
+
+    def count_params(self):
+        return int(sum(w.size for w in self.weights.values()))
+
+    @property
+    def resident_bytes(self):
+        """Bytes of weights held in memory between calls."""
+        return int(sum(w.nbytes for w in self.weights.values()))
+
+    def weight(self, name):
+        """float32 weight `name` for the forward pass."""
+        return self.weights[name]
+
+    def _lstm(self, x, index, layer):
+        kernel = self.weight(f'{index}/kernel')
+        recurrent = self.weight(f'{index}/recurrent_kernel')
+        bias = self.weight(f'{index}/bias')
+        units = layer['units']
+        activation = _ACTIVATIONS[layer['activation']]
+        batch, timesteps, _ = x.shape
+
+        # Input contributions for every timestep in a single matmul
+        x_proj = x @ kernel
+        x_proj += bias
+        h = np.zeros((batch, units), dtype=np.float32)
+        c = np.zeros((batch, units), dtype=np.float32)
+        z = np.empty((batch, 4 * units), dtype=np.float32)
+        tmp = np.empty((batch, units), dtype=np.float32)
+        outputs = np.empty((batch, timesteps, units), dtype=np.float32) if layer['return_sequences'] else None
+
+        for t in range(timesteps):
+            np.matmul(h, recurrent, out=z)
+            z += x_proj[:, t]
+            gates = _sigmoid_(z[:, :3 * units])
+            candidate = activation(z[:, 3 * units:])
+            i, f, o = gates[:, :units], gates[:, units:2 * units], gates[:, 2 * units:]
+            c *= f
+            np.multiply(i, candidate, out=tmp)
+            c += tmp
+            np.copyto(tmp, c)
+            np.multiply(o, activation(tmp), out=h)
+            if outputs is not None:
+                outputs[:, t] = h
+        return outputs if outputs is not None else h
+
+    def predict(self, batch):
+        x = np.asarray(batch, dtype=np.float32)
+        if x.ndim == len(self.window_shape):
+            x = x[np.newaxis]
+        for index, layer in enumerate(self.layers):
+            if layer['type'] == 'lstm':
+                x = self._lstm(x, index, layer)
+            else:
+                x = x @ self.weight(f'{index}/kernel')
+                x += self.weight(f'{index}/bias')
+                x = _ACTIVATIONS[layer['activation']](x)
+        return x
+
+    __call__ = predict
+
+
+def load_model(h5_path, use_cache=True):
+    return NumpyLSTMModel.load(h5_path, use_cache)
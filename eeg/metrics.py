@@ -0,0 +1,81 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+class LatencyTracker:
+    """Rolling record of the most recent `history` latencies (in seconds)."""
+
+    def __init__(self, name, history=1000):
+        self.name = name
+        self._samples = deque(maxlen=history)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+            self._count += 1
+
+    def time(self):
+        return _Timing(self)
+
+    @property
+    def count(self):
+        return self._count
+
+    def summary(self):
+        """Return count, mean, p50, p99 and max in milliseconds."""
+        with self._lock:
+            samples = np.fromiter(self._samples, dtype=float, count=len(self._samples))
+        if not len(samples):
+            return {'name': self.name, 'count': self._count}
+        p50, p99 = np.percentile(samples, [50, 99]) * 1000
+        return {
+            'name': self.name,
+            'count': self._count,
+            'mean_ms': samples.mean() * 1000,
+            'p50_ms': p50,
+            'p99_ms': p99,
+            'max_ms': samples.max() * 1000,
+        }
+
+    def histogram(self, edges_ms=(1, 2, 5, 10, 20, 50, 100, 200, 500)):
+        """Return [(label, count)] for latencies bucketed by the given edges in milliseconds."""
+        with self._lock:
+            samples = np.fromiter(self._samples, dtype=float, count=len(self._samples)) * 1000
+        edges = np.asarray(edges_ms, dtype=float)
+        counts = np.bincount(np.searchsorted(edges, samples, side='right'), minlength=len(edges) + 1)
+        labels = [f"< {edges[0]:g} ms"]
+        labels += [f"{low:g}-{high:g} ms" for low, high in zip(edges[:-1], edges[1:])]
+        labels.append(f">= {edges[-1]:g} ms")
+        return list(zip(labels, counts.tolist()))
+
+    def format_histogram(self, edges_ms=(1, 2, 5, 10, 20, 50, 100, 200, 500), width=40):
+        buckets = self.histogram(edges_ms)
+        peak = max((count for _, count in buckets), default=0) or 1
+        return "\n".join(f"{label:>14} | {'#' * round(width * count / peak):<{width}} {count}"
+                         for label, count in buckets)
+
+    def __str__(self):
+        s = self.summary()
+        if 'mean_ms' not in s:
+            return f"{self.name}: no samples"
+        return (f"{self.name}: n={s['count']} mean={s['mean_ms']:.2f}ms "
+                f"p50={s['p50_ms']:.2f}ms p99={s['p99_ms']:.2f}ms max={s['max_ms']:.2f}ms")
+
+
+class _Timing:
+    def __init__(self, tracker):
+        self.tracker = tracker
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+        self.tracker.record(self.elapsed)
+        return False
@@ -0,0 +1,115 @@
+"""
+Training-time normalization for EEG windows.
+
+The training script fits the artifact-replacement values and min/max scaling
+once over the whole dataset and exports them next to the model. At runtime the
+same statistics are applied to single windows or batches, without refitting.
+"""
+
+import json
+import threading
+
+import numpy as np
+
+
+class EEGNormalizer:
+    """Replaces small-amplitude artifacts with per-channel means, then min-max scales.
+
+    This mirrors the preprocessing in `eeg_classification.py`: readings whose
+    absolute value is below `threshold` are treated as missing and replaced by
+    the channel mean of the remaining readings, and each channel is scaled to
+    [0, 1] using its training-set minimum and maximum.
+    """
+
+    def __init__(self, fill_values, data_min, data_max, threshold=10.0):
+        self.fill_values = np.asarray(fill_values, dtype=np.float32)
+        self.data_min = np.asarray(data_min, dtype=np.float32)
+        self.data_max = np.asarray(data_max, dtype=np.float32)
+        self.threshold = float(threshold)
+        data_range = self.data_max - self.data_min
+        data_range[data_range == 0] = 1.0  # Constant channels map to 0, as MinMaxScaler does
+        self.scale = (1.0 / data_range).astype(np.float32)
+        self._scratch = threading.local()
+
+    @property
+    def n_channels(self):
+        return len(self.fill_values)
+
+    @classmethod
+    def fit(cls, X, threshold=10.0):
+        """Fit on readings of shape (..., channels)."""
+        X = np.asarray(X, dtype=np.float64).reshape(-1, np.shape(X)[-1])
+        masked = np.where(np.abs(X) < threshold, np.nan, X)
+        valid = ~np.isnan(masked)
+        counts = valid.sum(axis=0)
+        fill = np.where(counts > 0, np.nansum(masked, axis=0) / np.maximum(counts, 1), 0.0)
+        filled = np.where(valid, X, fill)
+        return cls(fill, filled.min(axis=0), filled.max(axis=0), threshold)
+
+    @classmethod
+    def fit_chunks(cls, chunks, threshold=10.0):
+        """Fit on an iterable of (..., channels) arrays in one pass; same result as `fit` on their concatenation."""
+        total = count = low = high = has_missing = None
+        for chunk in chunks:
+            chunk = np.asarray(chunk, dtype=np.float64)
+            chunk = chunk.reshape(-1, chunk.shape[-1])
+            if total is None:
+                channels = chunk.shape[1]
+                total, count = np.zeros(channels), np.zeros(channels, dtype=np.int64)
+                low, high = np.full(channels, np.inf), np.full(channels, -np.inf)
+                has_missing = np.zeros(channels, dtype=bool)
+            valid = np.abs(chunk) >= threshold
+            total += np.where(valid, chunk, 0.0).sum(axis=0)
+            count += valid.sum(axis=0)
+            low = np.minimum(low, np.where(valid, chunk, np.inf).min(axis=0, initial=np.inf))
+            high = np.maximum(high, np.where(valid, chunk, -np.inf).max(axis=0, initial=-np.inf))
+            has_missing |= ~valid.all(axis=0)
+        if total is None:
+            raise ValueError("No readings to fit the normalizer on")
+        fill = np.where(count > 0, total / np.maximum(count, 1), 0.0)
+        # Missing readings are replaced by the fill value, so it takes part in the min/max
+        low = np.where(has_missing, np.minimum(low, fill), low)
+        high = np.where(has_missing, np.maximum(high, fill), high)
+        return cls(fill, low, high, threshold)
+
+    def transform(self, x, out=None):
+        """Normalize readings of shape (..., channels) into float32 `out`."""
+        x = np.asarray(x)
+        if out is None:
+            out = np.empty(x.shape, dtype=np.float32)
+        mask = self._mask(x.shape)
+        np.abs(x, out=out)
+        np.less(out, self.threshold, out=mask)
+        np.copyto(out, x)
+        np.copyto(out, self.fill_values, where=mask)
+        out -= self.data_min
+        out *= self.scale
+        return out
+
+    def _mask(self, shape):
+        # Boolean scratch buffer reused per thread and shape
+        masks = getattr(self._scratch, 'masks', None)
+        if masks is None:
+            masks = self._scratch.masks = {}
+        mask = masks.get(shape)
+        if mask is None:
+            mask = masks[shape] = np.empty(shape, dtype=bool)
+        return mask
+
+    def to_dict(self):
+        return {
+            'threshold': self.threshold,
+            'fill_values': self.fill_values.tolist(),
+            'data_min': self.data_min.tolist(),
+            'data_max': self.data_max.tolist(),
+        }
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            stats = json.load(f)
+        return cls(stats['fill_values'], stats['data_min'], stats['data_max'], stats['threshold'])
@@ -0,0 +1,102 @@
+"""
+Model input preparation shared by the GUI, control mode and the inference server.
+
+Raw windows are (channels, samples) readings, e.g. views into the acquisition
+buffer; the model takes float32 batches of shape (n, samples, channels)
+normalized with the statistics fitted at training time. When the model was
+trained on band-pass/notch filtered sessions, the acquisition stream is
+filtered the same way before windows are cut (see load_stream_filter).
+"""
+
+import os
+
+import numpy as np
+
+from eeg.instrumentation import get_instrumentation
+from eeg.normalizer import EEGNormalizer
+from eeg.startup import DEFAULT_MODEL_PATH
+
+normalizer_path = os.path.join('models', 'normalizer.json')
+normalizer = None
+filter_path = os.path.join('models', 'filter.json')
+
+instrumentation = get_instrumentation()
+
+# Set on .h5 models saved by the training script together with a normalizer.json; older models were trained
+# on per-window normalization and have no normalizer to go with them
+NORMALIZER_ATTR = 'omegavr_normalizer'
+
+
+def mark_trained_with_normalizer(model_path):
+    import h5py
+
+    with h5py.File(model_path, 'a') as f:
+        f.attrs[NORMALIZER_ATTR] = True
+
+
+def trained_with_normalizer(model_path=DEFAULT_MODEL_PATH):
+    if not os.path.exists(model_path):
+        return False
+    try:
+        import h5py
+
+        with h5py.File(model_path, 'r') as f:
+            return bool(f.attrs.get(NORMALIZER_ATTR, False))
+    except (ImportError, OSError):
+        return False
+
+
+def load_normalizer():
+    # Statistics fitted by eeg_classification.py; without them each window is normalized on its own
+    global normalizer
+    if normalizer is None and os.path.exists(normalizer_path):
+        normalizer = EEGNormalizer.load(normalizer_path)
+        if os.path.exists(DEFAULT_MODEL_PATH) and os.path.getmtime(DEFAULT_MODEL_PATH) > os.path.getmtime(normalizer_path):
+            # Training writes both files together; an older normalizer belongs to a previous model
+            print(f"WARNING: {DEFAULT_MODEL_PATH} is newer than {normalizer_path}. The normalizer was probably "
+                  f"not copied with the model, so predictions will be scaled differently from training. "
+                  f"Copy the normalizer.json written with this model into models/.")
+    elif normalizer is None:
+        if trained_with_normalizer(DEFAULT_MODEL_PATH):
+            print(f"WARNING: {normalizer_path} not found. {DEFAULT_MODEL_PATH} was trained with fitted "
+                  f"normalization; normalizing each window with its own statistics instead will not match it")
+        else:
+            print(f"{normalizer_path} not found, normalizing each window with its own statistics")
+        normalizer = False
+    return normalizer
+
+
+def load_stream_filter(sample_rate, channels):
+    # The band-pass/notch design the model was trained with, or None if it was trained on unfiltered data.
+    # OMEGAVR_FILTER=0 turns filtering off regardless
+    if os.environ.get('OMEGAVR_FILTER') == '0' or not os.path.exists(filter_path):
+        return None
+    from eeg.filters import StreamingFilter
+
+    stream_filter = StreamingFilter.load(filter_path)
+    if (stream_filter.sample_rate, stream_filter.channels) != (sample_rate, channels):
+        print(f"{filter_path} is for {stream_filter.channels} channels at {stream_filter.sample_rate} Hz, "
+              f"not {channels} at {sample_rate} Hz; filtering disabled")
+        return None
+    return stream_filter
+
+
+def preprocess_eeg_data(eeg_data):
+    # Accepts one (channels, samples) window or a batch of them and returns
+    # float32 model input of shape (n, samples, channels)
+    with instrumentation.stage('preprocess'):
+        eeg_data = np.swapaxes(np.asarray(eeg_data), -1, -2)
+        if eeg_data.ndim == 2:
+            eeg_data = eeg_data[np.newaxis]
+
+        fitted = load_normalizer()
+        if fitted:
+            return fitted.transform(eeg_data)
+        return np.stack([EEGNormalizer.fit(window).transform(window) for window in eeg_data])
+
+
+def make_prediction(model, eeg_data):
+    # `model` is an InferenceEngine (or anything with a compatible predict method)
+    processed_data = preprocess_eeg_data(eeg_data)
+    predictions = model.predict(processed_data)
+    return predictions, np.argmax(predictions, axis=-1)
@@ -0,0 +1,233 @@
+"""
+Reduced-precision exports of the LSTM for the NumPy runtime.
+
+Besides the float32 `.npz` cache, a model can be exported as
+
+    float16   every weight matrix stored as float16 (half the size)
+    int8      dynamic-range quantization: weight matrices stored as int8 with
+              one float32 scale per output unit (symmetric, ~quarter size);
+              biases stay float32
+
+next to the `.h5` file (models/lstm_model.float16.npz, ...int8.npz). The
+weights stay in memory at the exported precision (ReducedPrecisionModel).
+Each forward pass upcasts one layer's weights to float32 just before its
+matrix products and drops the copy afterwards: NumPy has no fast int8 or
+float16 matrix products (both are 8-50x slower than float32 BLAS on small
+matrices). Resident weight memory therefore shrinks with the file, for the
+price of the upcast on every call. `compare_precisions` measures the
+accuracy cost of the rounding, the per-window latency and the resident
+weight bytes on held-out windows, rather than assuming them.
+
+Export from the training script, or for an existing model:
+    python -m eeg.quantization models/lstm_model.h5 --data data
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from eeg.lstm_runtime import NumpyLSTMModel, load_model
+
+PRECISIONS = ('float32', 'float16', 'int8')
+
+
+def quantized_path(h5_path, precision):
+    return f"{os.path.splitext(h5_path)[0]}.{precision}.npz"
+
+
+def _is_matrix(name):
+    return not name.endswith('/bias')
+
+
+def quantize_weights(weights, precision):
+    """Return the arrays to store for `precision`; int8 scales are stored as '<name>.scale'."""
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision {precision!r}, expected one of {PRECISIONS}")
+    stored = {}
+    for name, w in weights.items():
+        if precision == 'float32' or not _is_matrix(name):
+            stored[name] = w.astype(np.float32)
+        elif precision == 'float16':
+            stored[name] = w.astype(np.float16)
+        else:
+            # One scale per output unit (column), so a single large weight only coarsens its own unit
+            scale = np.abs(w).max(axis=0) / 127.0
+            scale[scale == 0] = 1.0
+            stored[name] = np.clip(np.rint(w / scale), -127, 127).astype(np.int8)
+            stored[f'{name}.scale'] = scale.astype(np.float32)
+    return stored
+
+
+def dequantize_weights(stored):
+    weights = {}
+    for name, w in stored.items():
+        if name.endswith('.scale'):
+            continue
+        scale = stored.get(f'{name}.scale')
+        weights[name] = w.astype(np.float32) * scale if scale is not None else w.astype(np.float32)
+    return weights
+
+
+class ReducedPrecisionModel(NumpyLSTMModel):
+    """NumpyLSTMModel whose weights stay stored as float16 or int8 (+ float32 scales) between calls."""
+
+    def __init__(self, layers, stored, precision):
+        self.layers = layers
+        self.stored = stored
+        self.precision = precision
+        self.window_shape = tuple(layers[0]['input_shape'])
+        self.input_shape = (None,) + self.window_shape
+
+    @property
+    def weights(self):
+        return dequantize_weights(self.stored)
+
+    def count_params(self):
+        return int(sum(w.size for name, w in self.stored.items() if not name.endswith('.scale')))
+
+    @property
+    def resident_bytes(self):
+        return int(sum(w.nbytes for w in self.stored.values()))
+
+    def weight(self, name):
+        w = self.stored[name]
+        if w.dtype == np.float32:
+            return w
+        scale = self.stored.get(f'{name}.scale')
+        w = w.astype(np.float32)
+        if scale is not None:
+            w *= scale
+        return w
+
+
+def export_quantized(model, path, precision):
+    stored = quantize_weights(model.weights, precision)
+    np.savez(path, __layers__=np.array(json.dumps(model.layers)), __precision__=np.array(precision), **stored)
+    return path
+
+
+def load_quantized(path):
+    """Load an exported model, keeping its weights at the exported precision."""
+    with np.load(path) as data:
+        layers = json.loads(str(data['__layers__']))
+        precision = str(data['__precision__'])
+        stored = {k: data[k] for k in data.files if not k.startswith('__')}
+    return ReducedPrecisionModel(layers, stored, precision)
+
+
+def load_model_precision(h5_path, precision='float32'):
+    """The NumPy model for `h5_path` at `precision`; reduced precisions must have been exported first."""
+    if precision == 'float32':
+        return load_model(h5_path)
+    path = quantized_path(h5_path, precision)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No {precision} export of {h5_path}; run python -m eeg.quantization {h5_path}")
+    if os.path.exists(h5_path) and os.path.getmtime(path) < os.path.getmtime(h5_path):
+        print(f"Warning: {path} is older than {h5_path}; re-export it")
+    return load_quantized(path)
+
+
+def _single_window_latency(model, windows, repeats):
+    model.predict(windows[:1])
+    times = np.empty(repeats)
+    for i in range(repeats):
+        window = windows[i % len(windows)][np.newaxis]
+        start = time.perf_counter()
+        model.predict(window)
+        times[i] = time.perf_counter() - start
+    return np.percentile(times, 50) * 1000, np.percentile(times, 99) * 1000
+
+
+def compare_precisions(models, windows, labels=None, repeats=300):
+    """One report row per {precision: model}, against the float32 model on the same windows.
+
+    `labels` are 0-based classes; without them only agreement with float32 is reported.
+    """
+    reference = models['float32'].predict(windows)
+    rows = []
+    for precision, model in models.items():
+        probabilities = model.predict(windows)
+        p50, p99 = _single_window_latency(model, windows, repeats)
+        row = {
+            'precision': precision,
+            'accuracy': float((probabilities.argmax(axis=1) == labels).mean()) if labels is not None else None,
+            'agreement': float((probabilities.argmax(axis=1) == reference.argmax(axis=1)).mean()),
+            'max_prob_diff': float(np.abs(probabilities - reference).max()),
+            'p50_ms': float(p50),
+            'p99_ms': float(p99),
+            'resident_kb': model.resident_bytes / 1024,  # Weights held in memory between calls
+        }
+        rows.append(row)
+    return rows
+
+
+def format_report(rows):
+    lines = [f"{'precision':<10}{'accuracy':>10}{'agreement':>11}{'max dp':>9}{'p50 ms':>9}{'p99 ms':>9}"
+             f"{'resident kB':>13}{'file kB':>10}"]
+    for row in rows:
+        accuracy = f"{row['accuracy']:.4f}" if row['accuracy'] is not None else '-'
+        file_kb = f"{row['file_kb']:.1f}" if row.get('file_kb') is not None else '-'
+        lines.append(f"{row['precision']:<10}{accuracy:>10}{row['agreement']:>11.4f}{row['max_prob_diff']:>9.4f}"
+                     f"{row['p50_ms']:>9.3f}{row['p99_ms']:>9.3f}{row['resident_kb']:>13.1f}{file_kb:>10}")
+    return "\n".join(lines)
+
+
+def export_all(h5_path, windows, labels=None, precisions=('float16', 'int8'), repeats=300):
+    """Export `precisions` next to `h5_path`, compare them with float32 and write `<model>.precision.json`.
+
+    Returns the report rows.
+    """
+    model = load_model(h5_path)
+    models = {'float32': model}
+    for precision in precisions:
+        path = export_quantized(model, quantized_path(h5_path, precision), precision)
+        models[precision] = load_quantized(path)
+    rows = compare_precisions(models, windows, labels, repeats)
+    for row in rows:
+        path = h5_path if row['precision'] == 'float32' else quantized_path(h5_path, row['precision'])
+        row['file_kb'] = os.path.getsize(path) / 1024
+    with open(os.path.splitext(h5_path)[0] + '.precision.json', 'w') as f:
+        json.dump(rows, f, indent=2)
+    print(format_report(rows))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export float16/int8 variants of a model and compare them")
+    parser.add_argument('model', nargs='?', default=os.path.join('models', 'lstm_model.h5'))
+    parser.add_argument('--data', nargs='+', required=True, help='.eegs/.csv files or folders with held-out windows')
+    parser.add_argument('--normalizer', default=os.path.join('models', 'normalizer.json'))
+    parser.add_argument('--filter', default=os.path.join('models', 'filter.json'))
+    parser.add_argument('--max-windows', type=int, default=2000)
+    parser.add_argument('--repeats', type=int, default=300)
+    args = parser.parse_args()
+
+    from eeg.normalizer import EEGNormalizer
+    from eeg.training_data import WindowDataset
+
+    stream_filter = None
+    if os.path.exists(args.filter):
+        from eeg.filters import StreamingFilter
+
+        stream_filter = StreamingFilter.load(args.filter)
+    # The same held-out split (and conditioning) the training script evaluates on
+    dataset = WindowDataset(args.data, test_fraction=0.2, validation_fraction=0.16, seed=42,
+                            stream_filter=stream_filter)
+    normalizer = EEGNormalizer.load(args.normalizer) if os.path.exists(args.normalizer) else None
+    windows, labels = [], []
+    for batch, targets in dataset.batches(1024, 'test', shuffle=False, normalizer=normalizer):
+        windows.append(batch)
+        labels.append(targets.argmax(axis=1))
+        if sum(len(b) for b in windows) >= args.max_windows:
+            break
+    if not windows:
+        raise SystemExit("No held-out windows found")
+    export_all(args.model, np.concatenate(windows)[:args.max_windows], np.concatenate(labels)[:args.max_windows],
+               repeats=args.repeats)
+
+
+if __name__ == '__main__':
+    main()
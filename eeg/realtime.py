@@ -0,0 +1,222 @@
+"""
+Continuous sliding-window classification.
+
+Overlapping windows are cut from the acquisition buffer every `stride`
+samples, classified in batches, smoothed and debounced, and only then turned
+into actions. Latency is measured from the arrival of a window's newest sample
+to the moment its action is dispatched (or the prediction is discarded).
+
+Headless load test (no display needed):
+    python -m eeg.realtime --duration 30 --stride 25
+    python -m eeg.realtime --source synthetic --duration 14400 --report-interval 600
+    python -m eeg.realtime --source replay:sessions/ --speed 4
+"""
+
+import argparse
+import threading
+import time
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from eeg.metrics import LatencyTracker
+
+ACTIONS = ["Left Click", "Right Click", "Scroll Up", "Scroll Down"]
+
+
+class PredictionSmoother:
+    """Turns a stream of per-window probabilities into debounced action triggers.
+
+    Probabilities are smoothed with an exponential moving average. An action
+    fires when the same class has led the average with at least `threshold`
+    probability for `min_consecutive` windows in a row, and no action fired
+    within the last `refractory` seconds.
+    """
+
+    def __init__(self, n_classes=len(ACTIONS), alpha=0.5, threshold=0.6, min_consecutive=3, refractory=0.5):
+        self.alpha = alpha
+        self.threshold = threshold
+        self.min_consecutive = min_consecutive
+        self.refractory = refractory
+        self._average = np.full(n_classes, 1.0 / n_classes)
+        self._candidate = None
+        self._streak = 0
+        self._last_fired = -np.inf
+
+    def reset(self):
+        self._average[:] = 1.0 / len(self._average)
+        self._candidate = None
+        self._streak = 0
+
+    def update(self, probabilities, now):
+        """Feed one window's probabilities; returns the class index to fire, or None."""
+        self._average *= 1 - self.alpha
+        self._average += self.alpha * np.asarray(probabilities).ravel()
+        best = int(np.argmax(self._average))
+        if self._average[best] < self.threshold:
+            self._candidate, self._streak = None, 0
+            return None
+        if best == self._candidate:
+            self._streak += 1
+        else:
+            self._candidate, self._streak = best, 1
+        if self._streak >= self.min_consecutive and now - self._last_fired >= self.refractory:
+            self._last_fired = now
+            self._streak = 0
+            return best
+        return None
+
+
+class SlidingWindowClassifier:
+    """Classifies overlapping windows of the live stream on a background thread.
+
+    `preprocess(windows)` turns a (n, channels, window_size) batch into model
+    input and `predict(batch)` returns (n, n_classes) probabilities. `dispatch`
+    is called on the classifier thread with the class index of each debounced
+    action, so it must be thread-safe.
+    """
+
+    def __init__(self, acquisition, predict, preprocess, dispatch, window_size=100, stride=25,
+                 smoother=None, latency_budget=0.05):
+        self.acquisition = acquisition
+        self.predict = predict
+        self.preprocess = preprocess
+        self.dispatch = dispatch
+        self.window_size = window_size
+        self.stride = stride
+        self.smoother = smoother or PredictionSmoother()
+        self.latency_budget = latency_budget
+        self.latency = LatencyTracker('sample-to-dispatch', history=10000)
+        self.windows = 0
+        self.actions = 0
+        self.over_budget = 0
+        self.skipped_windows = 0
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if not self.running:
+            self._stop_event.clear()
+            self.smoother.reset()
+            self._thread = threading.Thread(target=self._run, name="sliding-classifier", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        buffer = self.acquisition.buffer
+        # End (exclusive sample index) of the next window to classify
+        next_end = max(buffer.total_written, self.window_size)
+        while not self._stop_event.is_set():
+            if not buffer.wait_for(next_end, timeout=0.1):
+                continue
+            total = buffer.total_written
+            # Classify every window that became complete, in one batch
+            last_end = next_end + (total - next_end) // self.stride * self.stride
+            first_start = next_end - self.window_size
+            if total - first_start > buffer.capacity:
+                # Fell behind by more than the buffer holds; skip to the newest windows
+                oldest = total - buffer.capacity + self.window_size
+                skipped = (oldest - next_end + self.stride - 1) // self.stride
+                self.skipped_windows += skipped
+                next_end += skipped * self.stride
+                first_start = next_end - self.window_size
+            span = buffer.read_since(first_start)[0][:, :last_end - first_start]
+            windows = sliding_window_view(span, self.window_size, axis=1)[:, ::self.stride]
+            windows = np.moveaxis(windows, 1, 0)  # (n, channels, window_size) views
+            self._classify(buffer, windows, next_end)
+            next_end = last_end + self.stride
+
+    def _classify(self, buffer, windows, first_end):
+        probabilities = self.predict(self.preprocess(windows))
+        for i, row in enumerate(probabilities):
+            arrival = buffer.arrival_time(first_end + i * self.stride - 1)
+            action = self.smoother.update(row, time.perf_counter())
+            if action is not None:
+                self.dispatch(action)
+                self.actions += 1
+            latency = time.perf_counter() - arrival
+            self.latency.record(latency)
+            self.windows += 1
+            if latency > self.latency_budget:
+                self.over_budget += 1
+
+    def report(self):
+        lines = [
+            f"windows classified: {self.windows}, actions dispatched: {self.actions}, "
+            f"skipped windows: {self.skipped_windows}",
+            f"over {self.latency_budget * 1000:.0f} ms budget: {self.over_budget}",
+            str(self.latency),
+            self.latency.format_histogram(),
+        ]
+        return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless sliding-window classification load test")
+    parser.add_argument('--duration', type=float, default=30.0, help='seconds to run')
+    parser.add_argument('--stride', type=int, default=25, help='samples between window starts')
+    parser.add_argument('--budget-ms', type=float, default=50.0, help='sample-to-dispatch latency budget')
+    parser.add_argument('--source', default=None,
+                        help="'synthetic' or 'replay:<file>[,<file>...]|<dir>' (default: OMEGAVR_EEG_SOURCE or the headset)")
+    parser.add_argument('--speed', type=float, default=None, help='replay/synthetic speed relative to real time')
+    parser.add_argument('--report-interval', type=float, default=0, help='print the report every N seconds')
+    args = parser.parse_args()
+
+    from eeg.acquisition import AcquisitionEngine
+    from eeg.preprocessing import load_stream_filter, preprocess_eeg_data
+    from eeg.sources import WINDOW_SIZE, open_source
+    from eeg.startup import ModelLoader
+
+    source = open_source(args.source, args.speed)
+    engine = ModelLoader().wait()
+    if engine is None:
+        raise SystemExit("Model failed to load")
+    acquisition = AcquisitionEngine(source, sample_rate=source.sample_rate, channels=source.channels,
+                                    stream_filter=load_stream_filter(source.sample_rate, source.channels))
+    dispatched = []
+    correct = [0, 0]  # Dispatches matching the source's current label, dispatches with a label
+
+    def dispatch(class_index):
+        dispatched.append(class_index)
+        labels = getattr(source, 'last_labels', None)
+        if labels is not None and len(labels) and labels[-1]:
+            correct[1] += 1
+            correct[0] += int(labels[-1] == class_index + 1)
+
+    classifier = SlidingWindowClassifier(acquisition, engine.predict_batch, preprocess_eeg_data,
+                                         dispatch, window_size=WINDOW_SIZE, stride=args.stride,
+                                         latency_budget=args.budget_ms / 1000)
+    acquisition.start()
+    classifier.start()
+    try:
+        end = time.monotonic() + args.duration
+        while time.monotonic() < end:
+            time.sleep(min(args.report_interval or args.duration, max(0.0, end - time.monotonic())))
+            if args.report_interval and time.monotonic() < end:
+                print(classifier.report(), flush=True)
+    finally:
+        classifier.stop()
+        acquisition.stop()
+    print(classifier.report())
+    if hasattr(engine, 'fallbacks'):
+        print(f"fallbacks to the fast model: {engine.fallbacks}, windows on the LSTM: {engine.primary_windows}, "
+              f"on the fast model: {engine.fast_windows}")
+    if acquisition.stream_filter is not None:
+        print(acquisition.stream_filter.latency, f"over budget: {acquisition.stream_filter.over_budget}")
+    print("dispatched:", {ACTIONS[i]: dispatched.count(i) for i in set(dispatched)})
+    if correct[1]:
+        print(f"matching the source label: {correct[0]}/{correct[1]} ({correct[0] / correct[1]:.0%})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""
+Calibration session files.
+
+Sessions are stored in a compact binary format (`.eegs`):
+
+    8 bytes   magic b'EEGSESS1'
+    4 bytes   little-endian uint32 length of the JSON header
+    n bytes   UTF-8 JSON header (channels, n_samples, sample_rate, segments, offsets)
+    padding   to a 64-byte boundary
+    float32   (channels, n_samples) readings, C order
+    int8      (n_samples,) class label per sample, 0 for unlabeled samples
+
+Each segment in the header records the action, its label, the sample range
+[start, stop) and the capture timestamp. Calibration sessions are separate
+snapshots, one per segment; `continuous` in the header marks sessions whose
+segments join up into one uninterrupted recording. Readers memory-map the arrays, so
+opening a session costs no copies regardless of its size.
+
+Sessions can also be exported as CSV in the layout CSVDataProcessor merges:
+a class-name row followed by one "[c1, c2, ...]" row per sample.
+"""
+
+import csv
+import json
+import os
+import struct
+
+import numpy as np
+
+MAGIC = b'EEGSESS1'
+ALIGNMENT = 64
+CLASS_DICT = {'Left Click': 1, 'Right Click': 2, 'Scroll Up': 3, 'Scroll Down': 4}
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def write_session(path, segments, sample_rate=None, class_dict=CLASS_DICT, continuous=False):
+    """Write segments, an iterable of (action, data, timestamp) with data shaped (channels, n).
+
+    Set `continuous` when each segment starts where the previous one stopped.
+    """
+    segments = [(action, np.asarray(data, dtype=np.float32), timestamp) for action, data, timestamp in segments]
+    channels = segments[0][1].shape[0] if segments else 0
+    n_samples = sum(data.shape[1] for _, data, _ in segments)
+
+    header = {
+        'version': 1,
+        'channels': channels,
+        'n_samples': n_samples,
+        'sample_rate': sample_rate,
+        'class_dict': class_dict,
+        'continuous': continuous,
+        'segments': [],
+    }
+    start = 0
+    for action, data, timestamp in segments:
+        if data.shape[0] != channels:
+            raise ValueError(f"Segment '{action}' has {data.shape[0]} channels, expected {channels}")
+        stop = start + data.shape[1]
+        header['segments'].append({'action': action, 'label': class_dict.get(action, 0),
+                                   'start': start, 'stop': stop, 'timestamp': timestamp})
+        start = stop
+
+    # The offsets depend on the header length, which depends on the offsets. Size the header
+    # with placeholders at least as wide as the real values, so the real header always fits
+    header['data_offset'] = header['labels_offset'] = 10 ** 12
+    header_size = len(MAGIC) + 4 + len(json.dumps(header).encode())
+    header['data_offset'] = _align(header_size)
+    header['labels_offset'] = header['data_offset'] + channels * n_samples * 4
+    header_bytes = json.dumps(header).encode()
+
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<I', len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b'\0' * (header['data_offset'] - f.tell()))
+        # Channel-major: each channel's samples from all segments are contiguous
+        for channel in range(channels):
+            for _, data, _ in segments:
+                f.write(np.ascontiguousarray(data[channel]).tobytes())
+        labels = np.zeros(n_samples, dtype=np.int8)
+        for segment in header['segments']:
+            labels[segment['start']:segment['stop']] = segment['label']
+        f.write(labels.tobytes())
+
+
+class Session:
+    """Memory-mapped view of an `.eegs` file."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not an EEG session file")
+            (length,) = struct.unpack('<I', f.read(4))
+            self.header = json.loads(f.read(length))
+        self.channels = self.header['channels']
+        self.n_samples = self.header['n_samples']
+        self.sample_rate = self.header['sample_rate']
+        self.segments = self.header['segments']
+        self.continuous = self.header.get('continuous', False)
+        if self.n_samples:
+            self.data = np.memmap(path, dtype=np.float32, mode='r', offset=self.header['data_offset'],
+                                  shape=(self.channels, self.n_samples))
+            self.labels = np.memmap(path, dtype=np.int8, mode='r', offset=self.header['labels_offset'],
+                                    shape=(self.n_samples,))
+        else:
+            self.data = np.empty((self.channels, 0), dtype=np.float32)
+            self.labels = np.empty(0, dtype=np.int8)
+
+    def segment_data(self, segment):
+        return self.data[:, segment['start']:segment['stop']]
+
+    def windows(self, window_size):
+        """Yield (label, view) for consecutive (window_size, channels) windows of each segment."""
+        for segment in self.segments:
+            for start in range(segment['start'], segment['stop'] - window_size + 1, window_size):
+                yield segment['label'], self.data[:, start:start + window_size].T
+
+
+def read_session(path):
+    return Session(path)
+
+
+def write_csv_session(path, segments):
+    """Export segments as CSV: the action name, then one bracketed reading row per sample."""
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        for action, data, _ in segments:
+            writer.writerow([action])
+            for sample in np.asarray(data).T:
+                writer.writerow(['[' + ', '.join(map(repr, sample.tolist())) + ']'])
+
+
+def load_samples(paths):
+    """Concatenate session files into (n_samples, channels) readings and per-sample labels.
+
+    Unlabeled samples are dropped.
+    """
+    readings, labels = [], []
+    for path in paths:
+        session = read_session(path)
+        keep = session.labels != 0
+        readings.append(session.data[:, keep].T)
+        labels.append(session.labels[keep])
+    if not readings:
+        return np.empty((0, 0), dtype=np.float32), np.empty(0, dtype=np.int8)
+    return np.concatenate(readings), np.concatenate(labels)
+
+
+def is_session_file(path):
+    return os.path.splitext(path)[1] == '.eegs'
@@ -0,0 +1,287 @@
+"""
+Acquisition back-ends with the EEGHardware interface.
+
+Every source has `sample_rate`, `channels` and `read_chunk(n)` returning a
+(channels, n) float32 array, so it can be handed to AcquisitionEngine (and
+through it to the GUI, SlidingWindowClassifier and the signal-quality
+monitor) in place of the headset.
+
+ReplaySource streams saved calibration sessions (`.eegs`, or CSVs written by
+save_data) in order, looping by default. SyntheticSource generates
+class-dependent rhythms, noise and artifacts for any channel count and sample
+rate. Both expose `speed`: AcquisitionEngine paces reads at
+sample_rate * speed, so `speed=4` replays at 4x real time and
+`speed=float('inf')` reads as fast as the consumer keeps up.
+
+Both also keep the class label of the samples they last returned
+(`last_labels`), so unattended capacity runs can score predictions against
+the ground truth.
+
+Select a source for the app or the headless tools with OMEGAVR_EEG_SOURCE:
+    OMEGAVR_EEG_SOURCE=synthetic
+    OMEGAVR_EEG_SOURCE=replay:sessions/a.eegs,sessions/b.csv OMEGAVR_EEG_SPEED=4
+
+Without it they read the headset (EEGHardware). The headset's channel count,
+sample rate and the classifier's window size live here too, so the headless
+tools get them without importing the GUI.
+"""
+
+import os
+
+import numpy as np
+
+from eeg.session import CLASS_DICT, is_session_file, read_session
+
+NUM_CHANNELS = 6
+WINDOW_SIZE = 100
+SAMPLE_RATE = 250
+
+
+class EEGHardware:
+    def __init__(self, sample_rate=SAMPLE_RATE, channels=NUM_CHANNELS):
+        # Initialize connection to the hardware
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self._sample_index = 0
+
+    def read_chunk(self, n_samples):
+        # This should return the next n_samples from the device as a (channels, n_samples) array
+
+        # Simulate hardware data acquisition for testing purposes
+        t = (self._sample_index + np.arange(n_samples)) / self.sample_rate
+        self._sample_index += n_samples
+        return np.sin(2 * np.pi * 10 * t) + np.random.randn(self.channels, n_samples) * 0.1
+
+    def get_data(self):
+        # Single snapshot of 6 channels with 100 data points each
+        return self.read_chunk(WINDOW_SIZE)
+
+
+def _parse_csv_session(path, class_dict):
+    # save_data CSVs: an action-name row, then one "[c1, c2, ...]" row per sample
+    readings, labels = [], []
+    label = 0
+    with open(path) as f:
+        for line in f:
+            line = line.strip().strip('"')
+            if not line:
+                continue
+            if line.startswith('['):
+                readings.append(line.strip('[]'))
+                labels.append(label)
+            else:
+                label = class_dict.get(line, 0)
+    if not readings:
+        raise ValueError(f"{path} contains no readings")
+    channels = readings[0].count(',') + 1
+    values = np.fromstring(','.join(readings), dtype=np.float32, sep=',')
+    if values.size != len(readings) * channels:
+        raise ValueError(f"{path}: rows do not all have {channels} readings")
+    return values.reshape(len(readings), channels).T, np.array(labels, dtype=np.int8)
+
+
+def load_recording(path, class_dict=CLASS_DICT):
+    """Return (data, labels, sample_rate) for a saved session; sample_rate is None for CSVs."""
+    if is_session_file(path):
+        session = read_session(path)
+        return session.data, session.labels, session.sample_rate
+    data, labels = _parse_csv_session(path, class_dict)
+    return data, labels, None
+
+
+class ReplaySource:
+    """Streams recorded sessions back, sample for sample, in file order.
+
+    `.eegs` readings stay memory-mapped, so hours-long recordings cost no
+    memory up front. With `loop=False`, empty chunks are returned and
+    `finished` is set once every file has been played.
+    """
+
+    def __init__(self, paths, sample_rate=None, speed=1.0, loop=True, class_dict=CLASS_DICT):
+        if isinstance(paths, str):
+            paths = [paths]
+        recordings = [load_recording(path, class_dict) for path in paths]
+        if not recordings:
+            raise ValueError("No recordings to replay")
+        channels = {data.shape[0] for data, _, _ in recordings}
+        if len(channels) != 1:
+            raise ValueError(f"Recordings have different channel counts: {sorted(channels)}")
+        rates = {rate for _, _, rate in recordings if rate}
+        self.sample_rate = sample_rate or (rates.pop() if len(rates) == 1 else 250)
+        self.channels = channels.pop()
+        self.speed = speed
+        self.loop = loop
+        self.paths = list(paths)
+        self._recordings = [(data, labels) for data, labels, _ in recordings if data.shape[1]]
+        self._file = 0
+        self._position = 0
+        self.samples_read = 0
+        self.loops = 0
+        self.finished = not self._recordings
+        self.last_labels = np.empty(0, dtype=np.int8)
+
+    def read_chunk(self, n_samples):
+        out = np.empty((self.channels, n_samples), dtype=np.float32)
+        labels = np.zeros(n_samples, dtype=np.int8)
+        filled = 0
+        while filled < n_samples and not self.finished:
+            data, file_labels = self._recordings[self._file]
+            take = min(n_samples - filled, data.shape[1] - self._position)
+            out[:, filled:filled + take] = data[:, self._position:self._position + take]
+            labels[filled:filled + take] = file_labels[self._position:self._position + take]
+            filled += take
+            self._position += take
+            if self._position == data.shape[1]:
+                self._position = 0
+                self._file += 1
+                if self._file == len(self._recordings):
+                    self._file = 0
+                    self.loops += 1
+                    self.finished = not self.loop
+        self.samples_read += filled
+        self.last_labels = labels[:filled]
+        return out[:, :filled]
+
+    def rewind(self):
+        self._file = self._position = 0
+        self.finished = not self._recordings
+
+
+class SyntheticSource:
+    """Vectorized EEG-like generator with class-dependent patterns and artifacts.
+
+    Each sample is the sum of:
+      - a background alpha rhythm (`alpha_freq`, random phase per channel),
+      - the active class's pattern: a sinusoid at `class_freqs[label - 1]`
+        weighted per channel, so the classes are separable by frequency and
+        topography,
+      - Gaussian noise plus `line_noise` amplitude at `line_freq`,
+      - eye blinks (Gaussian bumps on the first two channels) arriving at
+        `blink_rate` per second, and electrode pops (step decays on a random
+        channel) at `pop_rate` per second.
+
+    Classes follow `schedule` (labels, 0 for rest), each held for
+    `segment_seconds`; set `label` to drive it by hand instead. Channels listed
+    in `flat_channels` read zero and `clip_level` saturates the output, for
+    exercising the signal-quality checks.
+    """
+
+    def __init__(self, channels=6, sample_rate=250, seed=None, speed=1.0, schedule=(1, 2, 3, 4),
+                 segment_seconds=4.0, class_freqs=(8.0, 13.0, 18.0, 24.0), class_amplitude=10.0,
+                 alpha_freq=10.0, alpha_amplitude=5.0, noise=3.0, line_freq=50.0, line_noise=0.0,
+                 blink_rate=0.0, blink_amplitude=100.0, pop_rate=0.0, pop_amplitude=200.0,
+                 flat_channels=(), clip_level=None):
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.speed = speed
+        self.schedule = np.asarray(schedule, dtype=np.int8)
+        self.segment_samples = max(1, int(segment_seconds * sample_rate))
+        self.label = None
+        self.class_freqs = np.concatenate(([0.0], class_freqs))  # Index 0 is rest
+        self.alpha_freq = alpha_freq
+        self.alpha_amplitude = alpha_amplitude
+        self.noise = noise
+        self.line_freq = line_freq
+        self.line_noise = line_noise
+        self.blink_rate = blink_rate
+        self.blink_amplitude = blink_amplitude
+        self.pop_rate = pop_rate
+        self.pop_amplitude = pop_amplitude
+        self.flat_channels = list(flat_channels)
+        self.clip_level = clip_level
+        self._rng = np.random.default_rng(seed)
+        self._alpha_phase = self._rng.uniform(0, 2 * np.pi, (channels, 1))
+        # Per-class topography: each class is strongest on a different part of the montage
+        centers = np.linspace(0, channels - 1, len(class_freqs))
+        distance = np.abs(np.arange(channels)[None, :] - centers[:, None])
+        weights = np.exp(-(distance / max(1.0, channels / 4)) ** 2) * class_amplitude
+        self._class_weights = np.vstack([np.zeros(channels), weights]).astype(np.float32)
+        self._events = []  # (start sample, channel mask, amplitude, kind) of blinks and pops still decaying
+        self._sample_index = 0
+        self.last_labels = np.empty(0, dtype=np.int8)
+
+    def labels_for(self, start, n_samples):
+        if self.label is not None:
+            return np.full(n_samples, self.label, dtype=np.int8)
+        segment = (start + np.arange(n_samples)) // self.segment_samples
+        return self.schedule[segment % len(self.schedule)]
+
+    def read_chunk(self, n_samples):
+        start = self._sample_index
+        self._sample_index += n_samples
+        index = start + np.arange(n_samples)
+        t = index / self.sample_rate
+        labels = self.labels_for(start, n_samples)
+
+        data = self._rng.normal(0.0, self.noise, (self.channels, n_samples))
+        data += self.alpha_amplitude * np.sin(2 * np.pi * self.alpha_freq * t + self._alpha_phase)
+        data += self._class_weights[labels].T * np.sin(2 * np.pi * self.class_freqs[labels] * t)
+        if self.line_noise:
+            data += self.line_noise * np.sin(2 * np.pi * self.line_freq * t)
+        self._add_artifacts(data, start, n_samples)
+        if self.flat_channels:
+            data[self.flat_channels] = 0.0
+        if self.clip_level is not None:
+            np.clip(data, -self.clip_level, self.clip_level, out=data)
+        self.last_labels = labels
+        return data.astype(np.float32)
+
+    def _add_artifacts(self, data, start, n_samples):
+        seconds = n_samples / self.sample_rate
+        for kind, rate, amplitude in (('blink', self.blink_rate, self.blink_amplitude),
+                                      ('pop', self.pop_rate, self.pop_amplitude)):
+            for offset in np.sort(self._rng.integers(0, n_samples, self._rng.poisson(rate * seconds))):
+                mask = np.zeros(self.channels, dtype=bool)
+                if kind == 'blink':
+                    mask[:min(2, self.channels)] = True
+                else:
+                    mask[self._rng.integers(self.channels)] = True
+                self._events.append((start + offset, mask, amplitude * self._rng.uniform(0.7, 1.3), kind))
+        if not self._events:
+            return
+        blink_width = 0.1 * self.sample_rate  # ~300 ms from onset to baseline
+        pop_decay = 0.2 * self.sample_rate
+        index = start + np.arange(n_samples)
+        live = []
+        for onset, mask, amplitude, kind in self._events:
+            age = index - onset
+            if kind == 'blink':
+                shape = np.exp(-0.5 * ((age - 1.5 * blink_width) / (0.5 * blink_width)) ** 2)
+                done = age[-1] > 3 * blink_width
+            else:
+                shape = np.where(age >= 0, np.exp(-np.maximum(age, 0) / pop_decay), 0.0)
+                done = age[-1] > 8 * pop_decay
+            data[mask] += amplitude * shape
+            if not done:
+                live.append((onset, mask, amplitude, kind))
+        self._events = live
+
+
+def create_source(spec, sample_rate=SAMPLE_RATE, channels=NUM_CHANNELS, speed=None):
+    """Build a source from a spec string ('synthetic' or 'replay:<path>[,<path>...]').
+
+    Returns None for an empty spec or 'hardware', so the caller falls back to the
+    headset. `speed` defaults to OMEGAVR_EEG_SPEED (or real time).
+    """
+    if not spec or spec == 'hardware':
+        return None
+    if speed is None:
+        speed = float(os.environ.get('OMEGAVR_EEG_SPEED', '1'))
+    kind, _, argument = spec.partition(':')
+    if kind == 'synthetic':
+        return SyntheticSource(channels=channels, sample_rate=sample_rate, speed=speed,
+                               blink_rate=0.2, pop_rate=0.02)
+    if kind == 'replay':
+        paths = [path for path in argument.split(',') if path]
+        if len(paths) == 1 and os.path.isdir(paths[0]):
+            directory = paths[0]
+            paths = sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                           if name.endswith('.eegs') or name.endswith('.csv'))
+        return ReplaySource(paths, speed=speed)
+    raise ValueError(f"Unknown EEG source '{spec}'")
+
+
+def open_source(spec=None, speed=None):
+    """The source named by `spec` (default OMEGAVR_EEG_SOURCE), or the headset."""
+    spec = spec or os.environ.get('OMEGAVR_EEG_SOURCE')
+    return create_source(spec, SAMPLE_RATE, NUM_CHANNELS, speed) or EEGHardware()
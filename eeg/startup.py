@@ -0,0 +1,125 @@
+"""
+Startup helpers: phase timing and background model warm-up.
+
+This module is imported before the login screen is shown, so it must stay
+free of heavy imports; the model and its dependencies are only loaded on
+the warm-up thread.
+"""
+
+import importlib
+import os
+import threading
+import time
+
+DEFAULT_MODEL_PATH = os.path.join('models', 'lstm_model.h5')
+DEFAULT_FAST_MODEL_PATH = os.path.join('models', 'bandpower_model.json')
+
+
+class PhaseTimer:
+    """Records named startup phases as offsets from process start."""
+
+    def __init__(self):
+        self._start = time.perf_counter()
+        self._last = self._start
+        self.phases = []
+        self._lock = threading.Lock()
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        with self._lock:
+            self.phases.append((phase, now - self._last, now - self._start))
+            self._last = now
+        print(f"[startup] {phase}: +{(now - self._start) * 1000:.0f} ms")
+
+    def report(self):
+        lines = [f"{phase:<30} {step * 1000:8.1f} ms  (at {total * 1000:8.1f} ms)"
+                 for phase, step, total in self.phases]
+        return "\n".join(lines)
+
+
+class ModelLoader:
+    """Loads the inference engine (and preloads modules) on a background thread.
+
+    `engine` is None until loading has finished; `error` holds the exception
+    if it failed. Tk code should poll `ready` with `after` rather than block.
+
+    `classifier` (default OMEGAVR_CLASSIFIER, else 'auto') picks the model:
+    'lstm', 'fast' for the band-power classifier only, or 'auto' for the LSTM
+    with automatic fallback to the band-power classifier under load (just the
+    LSTM if no band-power model was trained). `fast_engine` is the band-power
+    engine when one was loaded. `precision` (default OMEGAVR_MODEL_PRECISION,
+    else 'float32') picks a float16/int8 export of the LSTM.
+    """
+
+    def __init__(self, model_path=None, backend=None, preload=(), timer=None, classifier=None,
+                 fast_model_path=None, precision=None):
+        self.model_path = model_path or DEFAULT_MODEL_PATH
+        self.backend = backend or os.environ.get('OMEGAVR_MODEL_BACKEND', 'numpy')
+        self.precision = precision or os.environ.get('OMEGAVR_MODEL_PRECISION', 'float32')
+        self.classifier = classifier or os.environ.get('OMEGAVR_CLASSIFIER', 'auto')
+        self.fast_model_path = fast_model_path or DEFAULT_FAST_MODEL_PATH
+        self.preload = preload
+        self.timer = timer
+        self.engine = None
+        self.fast_engine = None
+        self.error = None
+        self._done = threading.Event()
+        self._thread = None
+
+    @property
+    def started(self):
+        return self._thread is not None
+
+    @property
+    def ready(self):
+        return self._done.is_set()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._load, name="model-warmup", daemon=True)
+            self._thread.start()
+        return self
+
+    def wait(self, timeout=None):
+        self.start()
+        self._done.wait(timeout)
+        return self.engine
+
+    def _mark(self, phase):
+        if self.timer is not None:
+            self.timer.mark(phase)
+
+    def _load(self):
+        try:
+            from eeg.inference import AdaptiveEngine, InferenceEngine
+
+            if self.classifier not in ('lstm', 'fast', 'auto'):
+                raise ValueError(f"Unknown classifier {self.classifier!r}, expected 'lstm', 'fast' or 'auto'")
+            if self.classifier == 'fast' or (self.classifier == 'auto' and os.path.exists(self.fast_model_path)):
+                self.fast_engine = self._load_fast()
+            if self.classifier == 'fast':
+                self.engine = self.fast_engine
+            else:
+                engine = InferenceEngine.load(self.model_path, self.backend, self.precision)
+                self._mark(f"model loaded ({self.backend}, {self.precision})")
+                self.engine = AdaptiveEngine(engine, self.fast_engine) if self.fast_engine else engine
+            for module in self.preload:
+                importlib.import_module(module)
+                self._mark(f"preloaded {module}")
+        except Exception as e:
+            self.error = e
+            print(f"Model warm-up failed: {e}")
+        finally:
+            self._done.set()
+
+    def _load_fast(self):
+        from eeg.fast_model import BandPowerClassifier
+        from eeg.inference import InferenceEngine
+
+        model = BandPowerClassifier.load(self.fast_model_path)
+        engine = InferenceEngine(model.predict, model.window_shape)
+        engine.warm_up()
+        if model.accuracy is not None and model.reference_accuracy is not None:
+            print(f"Band-power model: {model.accuracy:.1%} test accuracy vs {model.reference_accuracy:.1%} for the LSTM")
+        self._mark("band-power model loaded")
+        return engine
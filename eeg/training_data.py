@@ -0,0 +1,351 @@
+"""
+Streaming training data.
+
+Windows of (window_size, channels) readings are cut on the fly from recorded
+sessions, either `.eegs` files (memory-mapped) or CSVs in the merged layout
+written by CSVDataProcessor (read in chunks with pandas). Only one chunk per
+source plus the shuffle buffer is ever held in memory, so memory use does not
+grow with the number of windows.
+
+Every window is assigned to the train, validation or test split by a hash of
+its position in its source file, so the split is the same on every pass
+without storing an index.
+"""
+
+import glob
+import os
+import queue
+import threading
+
+import numpy as np
+import pandas as pd
+
+from eeg.normalizer import EEGNormalizer
+from eeg.session import CLASS_DICT, is_session_file, read_session
+
+SPLITS = ('train', 'validation', 'test')
+
+
+def _uniform(source_index, offsets, seed):
+    # splitmix64 of (source, offset): a stateless, well-mixed value in [0, 1) per window
+    salt = (int(source_index) * 0x9E3779B97F4A7C15 + int(seed)) % 2 ** 64
+    x = np.asarray(offsets, dtype=np.uint64) + np.uint64(salt)
+    x ^= x >> np.uint64(30)
+    x *= np.uint64(0xBF58476D1CE4E5B9)
+    x ^= x >> np.uint64(27)
+    x *= np.uint64(0x94D049BB133111EB)
+    x ^= x >> np.uint64(31)
+    return (x >> np.uint64(11)).astype(np.float64) / 2.0 ** 53
+
+
+class SessionSource:
+    """Windows from one `.eegs` file; each labeled segment is windowed separately.
+
+    With a `stream_filter` the recording is filtered chunk by chunk in file
+    order, carrying the filter state from one chunk to the next like the live
+    acquisition, so only the chunk being windowed is ever held filtered in
+    memory. Chunks are then visited in file order rather than shuffled. The
+    state carries across segments only in `continuous` sessions; calibration
+    sessions are separate snapshots, and each segment is filtered from a fresh
+    state so no transient from a join ends up in a window.
+    """
+
+    gap_samples = 65536  # Unlabeled stretches between chunks are filtered in pieces of this size
+
+    def __init__(self, path, window_size, stride, chunk_windows, stream_filter=None):
+        self.path = path
+        self.window_size = window_size
+        self.stride = stride
+        self.chunk_windows = chunk_windows
+        self.stream_filter = stream_filter
+
+    def _blocks(self, session):
+        # (segment, first window start, number of windows) units of at most chunk_windows windows
+        w, stride = self.window_size, self.stride
+        for segment in session.segments:
+            if not segment['label']:
+                continue
+            n_windows = max(0, (segment['stop'] - segment['start'] - w) // stride + 1)
+            for first in range(0, n_windows, self.chunk_windows):
+                yield segment, segment['start'] + first * stride, min(self.chunk_windows, n_windows - first)
+
+    def _filtered_spans(self, data, blocks, continuous):
+        # Yield (segment, start, count, span) with span filtered from the start of the file (continuous) or
+        # of its segment, in file order. Consecutive blocks overlap by window_size - stride samples, so that
+        # tail is kept from the last span
+        w, stride = self.window_size, self.stride
+        stream_filter = self.stream_filter.clone()
+        stream_filter.budget_ms = None  # Offline; whole blocks are filtered at once
+        position = buffered_from = 0
+        filtered = np.empty((data.shape[0], 0), dtype=np.float32)
+        current = None
+        for segment, start, count in sorted(blocks, key=lambda block: block[1]):
+            stop = start + (count - 1) * stride + w
+            if not continuous and segment is not current:
+                # A new snapshot: start settled at its first reading, as if the stream began here
+                current = segment
+                stream_filter.reset()
+                position = buffered_from = segment['start']
+                filtered = filtered[:, :0]
+            while position < start:
+                step = min(start - position, self.gap_samples)
+                stream_filter.process(data[:, position:position + step])
+                position += step
+                filtered, buffered_from = filtered[:, :0], position
+            fresh = stream_filter.process(data[:, position:stop]) if stop > position else filtered[:, :0]
+            filtered = np.concatenate([filtered[:, start - buffered_from:], fresh], axis=1)
+            buffered_from, position = start, max(position, stop)
+            yield segment, start, count, filtered[:, :stop - start]
+
+    def chunks(self, rng=None):
+        """Yield (windows, labels, offsets); offsets are each window's first sample in the file."""
+        session = read_session(self.path)
+        blocks = list(self._blocks(session))
+        if self.stream_filter:
+            spans = self._filtered_spans(session.data, blocks, session.continuous)
+        else:
+            if rng is not None:
+                rng.shuffle(blocks)
+            spans = ((segment, start, count, session.data[:, start:start + (count - 1) * self.stride + self.window_size])
+                     for segment, start, count in blocks)
+        w, stride = self.window_size, self.stride
+        for segment, start, count, span in spans:
+            views = np.lib.stride_tricks.sliding_window_view(span, w, axis=1)[:, ::stride]
+            windows = np.ascontiguousarray(views.transpose(1, 2, 0), dtype=np.float32)
+            offsets = start + stride * np.arange(count)
+            yield windows, np.full(count, segment['label'], dtype=np.int8), offsets
+
+
+class CSVSource:
+    """Windows from a merged CSV (reading columns followed by a 'Class' column).
+
+    Windows are consecutive rows with the same class, like the 100-row blocks
+    CSVDataProcessor writes; rows without a class are skipped. Those blocks
+    are separate calibration snapshots, so a `stream_filter` filters each
+    window from its own fresh state rather than the rows as one stream.
+    """
+
+    def __init__(self, path, window_size, chunk_rows, stream_filter=None):
+        self.path = path
+        self.window_size = window_size
+        self.chunk_rows = chunk_rows
+        self.stream_filter = stream_filter
+
+    def chunks(self, rng=None):
+        # CSV rows can only be read in order; shuffling happens across sources and in the buffer
+        w = self.window_size
+        carry_values = carry_labels = None
+        row_offset = 0  # File row of the first carried (or, without carry, first chunk) row
+        reader = pd.read_csv(self.path, chunksize=self.chunk_rows)
+        chunk = next(reader, None)
+        while chunk is not None:
+            following = next(reader, None)
+            values = chunk.iloc[:, :-1].to_numpy(dtype=np.float32)
+            labels = chunk.iloc[:, -1].fillna(0).to_numpy(dtype=np.int8)
+            if carry_values is not None:
+                values = np.concatenate([carry_values, values])
+                labels = np.concatenate([carry_labels, labels])
+            windows, window_labels, offsets, carry_from = self._windows(values, labels, final=following is None)
+            if len(windows):
+                if self.stream_filter is not None:
+                    windows = np.ascontiguousarray(self.stream_filter.apply(windows.transpose(0, 2, 1)).transpose(0, 2, 1))
+                yield windows, window_labels, row_offset + offsets
+            carry_values, carry_labels = values[carry_from:], labels[carry_from:]
+            row_offset += carry_from
+            chunk = following
+
+    def _windows(self, values, labels, final):
+        w = self.window_size
+        n = len(labels)
+        if n == 0:
+            return values.reshape(0, w, values.shape[1]), labels, np.empty(0, dtype=np.int64), 0
+        change = np.flatnonzero(labels[1:] != labels[:-1]) + 1
+        starts = np.concatenate(([0], change))
+        lengths = np.diff(np.concatenate((starts, [n])))
+        usable = lengths // w * w
+        # The last run may continue in the next chunk; carry its incomplete tail over
+        carry_from = n if final else starts[-1] + usable[-1]
+        run = np.repeat(np.arange(len(starts)), lengths)
+        position = np.arange(n) - starts[run]
+        keep = (position < usable[run]) & (labels != 0)
+        rows = np.flatnonzero(keep)
+        windows = values[rows].reshape(-1, w, values.shape[1])
+        return windows, labels[rows[::w]], rows[::w], carry_from
+
+
+class WindowDataset:
+    """Labeled (window_size, channels) windows streamed from session files.
+
+    `paths` may mix `.eegs` and merged `.csv` files; a directory is expanded to
+    the `.eegs` files in it. Labels are the CLASS_DICT values (1-based); batches
+    carry one-hot targets over `n_classes`, with class k at index k - 1.
+
+    `stream_filter` (an eeg.filters.StreamingFilter) conditions every source
+    the same way the app filters its live stream.
+    """
+
+    def __init__(self, paths, window_size=100, stride=None, n_classes=len(CLASS_DICT), test_fraction=0.2,
+                 validation_fraction=0.0, seed=42, chunk_windows=4096, csv_chunk_rows=100_000, stream_filter=None):
+        expanded = []
+        for path in paths:
+            if os.path.isdir(path):
+                expanded.extend(sorted(glob.glob(os.path.join(path, '*.eegs'))))
+            else:
+                expanded.append(path)
+        self.paths = expanded
+        self.window_size = window_size
+        self.stride = stride or window_size
+        self.n_classes = n_classes
+        self.test_fraction = test_fraction
+        self.validation_fraction = validation_fraction
+        self.seed = seed
+        self.stream_filter = stream_filter
+        self.sources = [SessionSource(path, window_size, self.stride, chunk_windows, stream_filter)
+                        if is_session_file(path) else CSVSource(path, window_size, csv_chunk_rows, stream_filter)
+                        for path in self.paths]
+        self.counts = None
+
+    def _split_mask(self, source_index, offsets, split):
+        if split is None:
+            return None
+        u = _uniform(source_index, offsets, self.seed)
+        if split == 'test':
+            return u < self.test_fraction
+        if split == 'validation':
+            return (u >= self.test_fraction) & (u < self.test_fraction + self.validation_fraction)
+        if split == 'train':
+            return u >= self.test_fraction + self.validation_fraction
+        raise ValueError(f"Unknown split {split!r}, expected one of {SPLITS}")
+
+    def source_chunks(self, source_index, split=None, rng=None):
+        """Yield (windows, labels) chunks of one source, restricted to `split`."""
+        for windows, labels, offsets in self.sources[source_index].chunks(rng):
+            mask = self._split_mask(source_index, offsets, split)
+            if mask is not None:
+                windows, labels = windows[mask], labels[mask]
+            if len(labels):
+                yield windows, labels
+
+    def chunks(self, split=None, shuffle=False, epoch=0):
+        order = np.arange(len(self.sources))
+        rng = np.random.default_rng((self.seed, epoch)) if shuffle else None
+        if rng is not None:
+            rng.shuffle(order)
+        for source_index in order:
+            yield from self.source_chunks(source_index, split, rng)
+
+    def scan(self, threshold=10.0):
+        """One pass over the data: fit an EEGNormalizer on the training windows and count every split.
+
+        Returns the normalizer; the counts are kept in `self.counts`.
+        """
+        counts = dict.fromkeys(SPLITS, 0)
+
+        def train_readings():
+            for source_index in range(len(self.sources)):
+                for windows, labels, offsets in self.sources[source_index].chunks():
+                    for split in SPLITS:
+                        mask = self._split_mask(source_index, offsets, split)
+                        counts[split] += int(np.count_nonzero(mask))
+                    train = self._split_mask(source_index, offsets, 'train')
+                    if train.any():
+                        yield windows[train]
+
+        normalizer = EEGNormalizer.fit_chunks(train_readings(), threshold)
+        self.counts = counts
+        return normalizer
+
+    def _targets(self, labels):
+        return np.eye(self.n_classes, dtype=np.float32)[labels.astype(np.intp) - 1]
+
+    def batches(self, batch_size, split='train', shuffle=True, shuffle_buffer=16384, epoch=0, normalizer=None):
+        """Yield (windows, one-hot targets) batches.
+
+        With `shuffle`, sources and their chunks are visited in a random order
+        and windows are mixed through a buffer of `shuffle_buffer` windows.
+        """
+        rng = np.random.default_rng((self.seed, epoch, 1))
+        pool_windows, pool_labels, pooled = [], [], 0
+
+        def drain(final):
+            windows = np.concatenate(pool_windows)
+            labels = np.concatenate(pool_labels)
+            if shuffle:
+                permutation = rng.permutation(len(labels))
+                windows, labels = windows[permutation], labels[permutation]
+            end = len(labels) if final else len(labels) // batch_size * batch_size
+            for start in range(0, end, batch_size):
+                batch = windows[start:start + batch_size]
+                if normalizer is not None:
+                    batch = normalizer.transform(batch)
+                yield batch, self._targets(labels[start:start + batch_size])
+            return windows[end:], labels[end:]
+
+        for windows, labels in self.chunks(split, shuffle, epoch):
+            pool_windows.append(windows)
+            pool_labels.append(labels)
+            pooled += len(labels)
+            if pooled >= (shuffle_buffer if shuffle else batch_size):
+                rest_windows, rest_labels = yield from drain(final=False)
+                pool_windows, pool_labels, pooled = [rest_windows], [rest_labels], len(rest_labels)
+        if pooled:
+            yield from drain(final=True)
+
+    def tf_dataset(self, batch_size, split='train', shuffle=True, shuffle_buffer=16384, normalizer=None):
+        """Build a tf.data pipeline: sources are read in parallel, interleaved, shuffled, batched and prefetched.
+
+        Each iteration over the dataset (one Keras epoch) reshuffles with a new seed.
+        """
+        import tensorflow as tf
+
+        window_spec = tf.TensorSpec((None, self.window_size, None), tf.float32)
+        label_spec = tf.TensorSpec((None,), tf.int8)
+        epochs = [0] * len(self.sources)
+
+        def generate(source_index):
+            source_index = int(source_index)
+            rng = np.random.default_rng((self.seed, epochs[source_index], source_index)) if shuffle else None
+            epochs[source_index] += 1
+            for windows, labels in self.source_chunks(source_index, split, rng):
+                if normalizer is not None:
+                    windows = normalizer.transform(windows)
+                yield windows, labels
+
+        n_classes = self.n_classes
+        dataset = tf.data.Dataset.range(len(self.sources))
+        if shuffle:
+            dataset = dataset.shuffle(len(self.sources), seed=self.seed, reshuffle_each_iteration=True)
+        dataset = dataset.interleave(
+            lambda i: tf.data.Dataset.from_generator(generate, args=(i,), output_signature=(window_spec, label_spec)),
+            cycle_length=min(4, max(1, len(self.sources))), num_parallel_calls=tf.data.AUTOTUNE,
+            deterministic=not shuffle)
+        dataset = dataset.unbatch()
+        if shuffle:
+            dataset = dataset.shuffle(shuffle_buffer, seed=self.seed, reshuffle_each_iteration=True)
+        dataset = dataset.batch(batch_size)
+        dataset = dataset.map(lambda x, y: (x, tf.one_hot(tf.cast(y, tf.int32) - 1, n_classes)),
+                              num_parallel_calls=tf.data.AUTOTUNE)
+        return dataset.prefetch(tf.data.AUTOTUNE)
+
+
+def prefetch(iterable, depth=2):
+    """Run `iterable` on a background thread, keeping up to `depth` items ready."""
+    items = queue.Queue(maxsize=depth)
+    done = object()
+
+    def run():
+        try:
+            for item in iterable:
+                items.put(item)
+        except Exception as e:
+            items.put(e)
+        items.put(done)
+
+    threading.Thread(target=run, name="training-prefetch", daemon=True).start()
+    while True:
+        item = items.get()
+        if item is done:
+            return
+        if isinstance(item, Exception):
+            raise item
+        yield item
@@ -0,0 +1,158 @@
+import threading
+from collections import OrderedDict
+
+from PIL import Image, ImageTk
+
+
+def _size_bytes(key):
+    width, height = key[1]
+    return width * height * 4
+
+
+class AssetCache:
+    """Decodes each image file once and keeps resized variants in a bounded LRU.
+
+    Variants are keyed by (path, size). PIL images can be produced from any
+    thread (see `prerender`); PhotoImages are created on first use from the Tk
+    thread and cached the same way, so showing an image that was shown before
+    costs a dictionary lookup.
+
+    Both LRUs are bounded by estimated memory (width * height * 4 bytes per
+    entry) rather than entry count, since a window-sized background variant
+    costs as much as thousands of icons. Each keeps at most `max_bytes`, and
+    always the entry added last.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, resample=Image.Resampling.LANCZOS):
+        self.max_bytes = max_bytes
+        self.resample = resample
+        self._sources = {}
+        self._variants = OrderedDict()
+        self._variant_bytes = 0
+        self._photos = OrderedDict()
+        self._photo_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def source(self, path):
+        """Return the decoded original for `path`, reading the file only the first time."""
+        with self._lock:
+            image = self._sources.get(path)
+        if image is None:
+            with Image.open(path) as f:
+                f.load()
+                image = f.copy()
+            with self._lock:
+                image = self._sources.setdefault(path, image)
+        return image
+
+    def get(self, path, size):
+        """Return `path` resized to `size` (width, height) as a PIL image."""
+        key = (path, tuple(size))
+        with self._lock:
+            image = self._variants.get(key)
+            if image is not None:
+                self._variants.move_to_end(key)
+                self.hits += 1
+                return image
+            self.misses += 1
+        source = self.source(path)
+        image = source if source.size == key[1] else source.resize(key[1], self.resample)
+        with self._lock:
+            if key not in self._variants:
+                self._variants[key] = image
+                self._variant_bytes = self._evict(self._variants, self._variant_bytes + _size_bytes(key))
+        return image
+
+    def photo(self, path, size):
+        """Return an ImageTk.PhotoImage of `path` at `size`. Call from the Tk thread only."""
+        key = (path, tuple(size))
+        photo = self._photos.get(key)
+        if photo is not None:
+            self._photos.move_to_end(key)
+            return photo
+        photo = ImageTk.PhotoImage(self.get(path, size))
+        self._photos[key] = photo
+        # Widgets keep their own reference, so evicting here never blanks a label
+        self._photo_bytes = self._evict(self._photos, self._photo_bytes + _size_bytes(key))
+        return photo
+
+    def _evict(self, entries, total):
+        # Drop least recently used entries until `total` fits, keeping the newest; returns the new total
+        while total > self.max_bytes and len(entries) > 1:
+            key, _ = entries.popitem(last=False)
+            total -= _size_bytes(key)
+        return total
+
+    @property
+    def cached_bytes(self):
+        return self._variant_bytes + self._photo_bytes
+
+    def prerender(self, requests):
+        """Decode and resize [(path, size), ...] on a background thread.
+
+        Errors are ignored here; they surface again when the image is requested.
+        """
+        def run():
+            for path, size in requests:
+                try:
+                    self.get(path, size)
+                except Exception:
+                    pass
+
+        thread = threading.Thread(target=run, name="asset-prerender", daemon=True)
+        thread.start()
+        return thread
+
+    def clear(self):
+        with self._lock:
+            self._sources.clear()
+            self._variants.clear()
+            self._variant_bytes = 0
+        self._photos.clear()
+        self._photo_bytes = 0
+
+
+class ResizeDebouncer:
+    """Coalesces a burst of <Configure> events into one callback.
+
+    `callback(width, height)` runs once the widget has kept the same size for
+    `delay_ms`, and not at all if the size did not actually change.
+    """
+
+    def __init__(self, widget, callback, delay_ms=80):
+        self.widget = widget
+        self.callback = callback
+        self.delay_ms = delay_ms
+        self._job = None
+        self._size = None
+
+    def __call__(self, event=None):
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+        self._job = self.widget.after(self.delay_ms, self._fire)
+
+    def _fire(self):
+        self._job = None
+        size = (self.widget.winfo_width(), self.widget.winfo_height())
+        if size != self._size and size[0] > 1 and size[1] > 1:
+            self._size = size
+            self.callback(*size)
+
+    def reset(self):
+        """Forget the last size so the next event always fires."""
+        self._size = None
+
+    def cancel(self):
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._job = None
+
+
+# One cache shared by every window in the app
+_cache = AssetCache()
+
+
+def get_cache():
+    return _cache
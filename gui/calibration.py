@@ -2,9 +2,13 @@ import numpy as np
 import cv2
 import tkinter as tk
 from PIL import Image, ImageTk
+from gui.camera_pipeline import FrameGrabber, FrameScheduler, Undistorter
+
+TARGET_FPS = 30
+STATS_INTERVAL_MS = 500
 
 class CalibrationTool(tk.Toplevel):
-    def __init__(self, parent):
+    def __init__(self, parent, target_fps=TARGET_FPS):
         super().__init__(parent)
         self.title("Eye Tracking Calibration")
         self.geometry("800x600")
@@ -13,33 +17,68 @@ class CalibrationTool(tk.Toplevel):
         self.image_label = tk.Label(self)
         self.image_label.pack()
         self.cap = cv2.VideoCapture(0)  # Use the correct camera index for your setup
+        self.grabber = FrameGrabber(self.cap)
+        self.undistorter = Undistorter()
+        self.scheduler = FrameScheduler(target_fps)
         self.distortion_parameters = None
+        # One PhotoImage and canvas item are reused for every frame
+        self.photo = None
+        self.canvas_image = None
+        self.rgb_frame = None
+        self.last_seq = 0
+        self._frame_job = None
+        self._stats_job = None
+        # Rolling FPS and per-stage latency, drawn over the preview
+        self.stats_text = self.canvas.create_text(10, 10, anchor=tk.NW, fill="yellow", font=("Courier", 10))
+        self.protocol("WM_DELETE_WINDOW", self.close)
         self.start_calibration()
 
     def start_calibration(self):
-        self.after(100, self.update_frame)
+        self.grabber.start()
+        self._frame_job = self.after(1, self.update_frame)
+        self._stats_job = self.after(STATS_INTERVAL_MS, self.update_stats)
 
     def update_frame(self):
-        ret, frame = self.cap.read()
-        if ret:
+        scheduler = self.scheduler
+        scheduler.begin_tick()
+        seq, frame, captured_at = self.grabber.latest()
+        if frame is None or not scheduler.accept(seq, self.last_seq, captured_at):
+            # Nothing new (or the newest frame is already stale)
+            self.last_seq = max(self.last_seq, seq)
+            self._frame_job = self.after(scheduler.idle_delay_ms(), self.update_frame)
+            return
+        self.last_seq = seq
+        with scheduler.stage('undistort'):
             frame = self.apply_barrel_distortion(frame)
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            image = Image.fromarray(frame)
-            image = ImageTk.PhotoImage(image)
-            self.canvas.create_image(0, 0, anchor=tk.NW, image=image)
-            self.image_label.image = image
-        self.after(100, self.update_frame)
+        with scheduler.stage('convert'):
+            if self.rgb_frame is None or self.rgb_frame.shape != frame.shape:
+                self.rgb_frame = np.empty_like(frame)
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self.rgb_frame)
+            image = Image.fromarray(self.rgb_frame)
+        with scheduler.stage('display'):
+            self.show_image(image)
+        scheduler.frame_displayed(captured_at)
+        self._frame_job = self.after(scheduler.next_delay_ms(), self.update_frame)
+
+    def update_stats(self):
+        self.canvas.itemconfig(self.stats_text, text=self.scheduler.status_text(self.grabber.capture_latency))
+        self.canvas.tag_raise(self.stats_text)
+        self._stats_job = self.after(STATS_INTERVAL_MS, self.update_stats)
+
+    def show_image(self, image):
+        if self.photo is None or (self.photo.width(), self.photo.height()) != image.size:
+            self.photo = ImageTk.PhotoImage(image)
+            if self.canvas_image is None:
+                self.canvas_image = self.canvas.create_image(0, 0, anchor=tk.NW, image=self.photo)
+            else:
+                self.canvas.itemconfig(self.canvas_image, image=self.photo)
+        else:
+            self.photo.paste(image)  # Update the existing image in place
 
     def apply_barrel_distortion(self, image):
         if self.distortion_parameters is None:
             self.distortion_parameters = self.calculate_distortion_parameters(image)
-        k1, k2, k3, p1, p2 = self.distortion_parameters
-        h, w = image.shape[:2]
-        fx = fy = w / 2
-        cx = cy = w / 2
-        camera_matrix = np.array([[fx, 0, cx], [0, fy, cy], [0, 0, 1]])
-        dist_coeffs = np.array([k1, k2, p1, p2, k3])
-        return cv2.undistort(image, camera_matrix, dist_coeffs)
+        return self.undistorter.apply(image, self.distortion_parameters)
 
     def calculate_distortion_parameters(self, image):
         # Placeholder values for the distortion parameters
@@ -51,5 +90,9 @@ class CalibrationTool(tk.Toplevel):
         return k1, k2, k3, p1, p2
 
     def close(self):
+        for job in (self._frame_job, self._stats_job):
+            if job is not None:
+                self.after_cancel(job)
+        self.grabber.stop()
         self.cap.release()
         self.destroy()
@@ -0,0 +1,180 @@
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+from eeg.metrics import LatencyTracker
+
+
+class FrameGrabber:
+    """Reads frames from a cv2.VideoCapture on a background thread.
+
+    Only the newest frame is kept; a consumer that falls behind simply skips
+    the frames it missed instead of working through a backlog.
+    """
+
+    def __init__(self, capture):
+        self.capture = capture
+        self._frame = None
+        self._seq = 0
+        self._timestamp = None
+        self.capture_latency = LatencyTracker('capture', history=120)
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="camera-grabber", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def latest(self):
+        """Return (sequence number, frame, capture time); frame is None until the first read."""
+        with self._lock:
+            return self._seq, self._frame, self._timestamp
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            start = time.perf_counter()
+            ret, frame = self.capture.read()
+            if not ret:
+                self._stop_event.wait(0.01)
+                continue
+            now = time.perf_counter()
+            self.capture_latency.record(now - start)
+            with self._lock:
+                self._frame = frame
+                self._seq += 1
+                self._timestamp = now
+
+
+class Undistorter:
+    """Barrel-distortion correction using precomputed remap tables.
+
+    The maps are built once and only rebuilt when the distortion parameters or
+    the frame size change; each frame then costs a single cv2.remap into a
+    reused output buffer.
+    """
+
+    def __init__(self):
+        self._key = None
+        self._maps = None
+        self._out = None
+
+    def _build_maps(self, parameters, width, height):
+        k1, k2, k3, p1, p2 = parameters
+        fx = fy = width / 2
+        cx = cy = width / 2
+        camera_matrix = np.array([[fx, 0, cx], [0, fy, cy], [0, 0, 1]])
+        dist_coeffs = np.array([k1, k2, p1, p2, k3])
+        # Same model as cv2.undistort: no rectification, output camera matrix == input
+        return cv2.initUndistortRectifyMap(camera_matrix, dist_coeffs, None, camera_matrix,
+                                           (width, height), cv2.CV_16SC2)
+
+    def apply(self, frame, parameters):
+        height, width = frame.shape[:2]
+        key = (tuple(parameters), width, height)
+        if key != self._key:
+            self._maps = self._build_maps(parameters, width, height)
+            self._out = np.empty_like(frame)
+            self._key = key
+        elif self._out.shape != frame.shape:
+            self._out = np.empty_like(frame)
+        map1, map2 = self._maps
+        return cv2.remap(frame, map1, map2, cv2.INTER_LINEAR, dst=self._out)
+
+
+class FrameScheduler:
+    """Paces the preview loop at a target FPS and keeps rolling per-stage statistics.
+
+    Frames older than `max_frame_age` when they reach the display loop are
+    dropped rather than processed late. The delay before the next tick is
+    measured from the current tick's deadline, so a slow frame is caught up on
+    the next one; if processing alone keeps exceeding the frame period, the
+    loop backs off to a rate the machine can sustain.
+    """
+
+    STAGES = ('undistort', 'convert', 'display')
+
+    def __init__(self, target_fps=30, max_frame_age=None, history=120):
+        self.target_fps = target_fps
+        self.period = 1.0 / target_fps
+        self.max_frame_age = max_frame_age if max_frame_age is not None else 2 * self.period
+        self.stages = {name: LatencyTracker(name, history=history) for name in self.STAGES}
+        self.frame_latency = LatencyTracker('capture-to-display', history=history)
+        self.processing = LatencyTracker('processing', history=history)
+        self._display_times = deque(maxlen=history)
+        self.displayed = 0
+        self.dropped = 0
+        self._tick_start = None
+        self._deadline = None
+
+    def begin_tick(self):
+        self._tick_start = time.perf_counter()
+        if self._deadline is None:
+            self._deadline = self._tick_start
+
+    def stage(self, name):
+        return self.stages[name].time()
+
+    def accept(self, seq, last_seq, capture_time):
+        """Decide whether to process frame `seq`; counts frames skipped or too old."""
+        if seq <= last_seq:
+            return False
+        self.dropped += seq - last_seq - 1  # Overwritten in the grabber before we saw them
+        if time.perf_counter() - capture_time > self.max_frame_age:
+            self.dropped += 1
+            return False
+        return True
+
+    def frame_displayed(self, capture_time):
+        now = time.perf_counter()
+        self.displayed += 1
+        self._display_times.append(now)
+        self.frame_latency.record(now - capture_time)
+        self.processing.record(now - self._tick_start)
+
+    @property
+    def fps(self):
+        times = self._display_times
+        if len(times) < 2 or times[-1] == times[0]:
+            return 0.0
+        return (len(times) - 1) / (times[-1] - times[0])
+
+    def effective_period(self):
+        # Back off when the average frame takes longer than the target period,
+        # leaving the Tk main loop some headroom
+        summary = self.processing.summary()
+        return max(self.period, summary.get('mean_ms', 0.0) / 1000 * 1.25)
+
+    def idle_delay_ms(self, poll_ms=5):
+        # No new frame yet: poll again shortly without moving the deadline
+        return max(1, min(poll_ms, int((self._deadline + self.effective_period() - time.perf_counter()) * 1000)))
+
+    def next_delay_ms(self):
+        now = time.perf_counter()
+        self._deadline += self.effective_period()
+        if self._deadline < now:
+            # Already late: run again as soon as possible, without trying to make up missed ticks
+            self._deadline = now
+        return max(1, int((self._deadline - now) * 1000))
+
+    def status_text(self, capture_latency=None):
+        lines = [f"FPS {self.fps:5.1f} / {self.target_fps}   shown {self.displayed}   dropped {self.dropped}"]
+        trackers = ([capture_latency] if capture_latency is not None else []) + list(self.stages.values())
+        trackers.append(self.frame_latency)
+        for tracker in trackers:
+            summary = tracker.summary()
+            if 'mean_ms' in summary:
+                lines.append(f"{tracker.name:<18} {summary['mean_ms']:6.1f} ms  p99 {summary['p99_ms']:6.1f} ms")
+        return "\n".join(lines)
@@ -1,23 +1,51 @@
 import tkinter as tk
 
+from eeg.signal_quality import FLAT, GOOD
+
+STATUS_COLORS = {GOOD: "green", "Inactive": "red", FLAT: "red"}
+WARNING_COLOR = "orange"
+
 
 class ElectrodeStatusPage(tk.Frame):
-    def __init__(self, parent, electrode_status):
+    """One label per electrode, created once and reconfigured in place on every update.
+
+    `update_status` accepts either a list of booleans or a
+    eeg.signal_quality.QualityReport.
+    """
+
+    def __init__(self, parent, electrode_status, title_font=("Helvetica", 20), label_font=("Helvetica", 15)):
         super().__init__(parent)
         self.electrode_status = electrode_status
+        self.title_font = title_font
+        self.label_font = label_font
+        self.labels = []
+        self._shown = []  # (text, color) currently on each label
         self.initUI()
 
     def initUI(self):
         self.configure(bg="white")
-        tk.Label(self, text="Electrode Status", font=("Helvetica", 20), bg="white").pack(pady=10)
+        tk.Label(self, text="Electrode Status", font=self.title_font, bg="white").pack(pady=10)
 
-        for idx, status in enumerate(self.electrode_status):
-            color = "green" if status else "red"
-            tk.Label(self, text=f"Electrode {idx + 1}: {'Active' if status else 'Inactive'}",
-                     font=("Helvetica", 15), bg=color, width=20).pack(pady=5)
+        for _ in self.electrode_status:
+            label = tk.Label(self, font=self.label_font, width=30, anchor="w")
+            label.pack(pady=2)
+            self.labels.append(label)
+            self._shown.append(None)
+        self.update_status(self.electrode_status)
 
     def update_status(self, new_status):
-        self.electrode_status = new_status
-        for widget in self.winfo_children():
-            widget.destroy()
-        self.initUI()
+        if hasattr(new_status, "status"):
+            # The label shows the state only: an RMS reading changes on every check and would redraw every row
+            rows = list(zip(new_status.status, new_status.good))
+            self.electrode_status = list(new_status.good)
+        else:
+            rows = [(GOOD if status else "Inactive", status) for status in new_status]
+            self.electrode_status = list(new_status)
+
+        for idx, (label, (state, good)) in enumerate(zip(self.labels, rows)):
+            text = f"Electrode {idx + 1}: {state}"
+            color = STATUS_COLORS.get(state, "green" if good else WARNING_COLOR)
+            # Only touch widgets whose text or color actually changed
+            if self._shown[idx] != (text, color):
+                label.config(text=text, bg=color)
+                self._shown[idx] = (text, color)
@@ -0,0 +1,141 @@
+import time
+
+import numpy as np
+
+PLOT_SECONDS = 2  # Seconds of signal the live traces show
+
+
+class LivePlot:
+    """Scrolling multi-channel trace plot that redraws with blitting.
+
+    The line artists are created once and marked animated, so a full canvas
+    draw only renders the static parts (axes, ticks, titles). That render is
+    cached on every draw event, and each update restores it, sets the new
+    samples on the lines and blits them. Updates arriving faster than
+    `target_fps` are skipped.
+    """
+
+    def __init__(self, fig, axs, canvas, n_samples, target_fps=30, y_limits=(-2.0, 2.0)):
+        self.fig = fig
+        self.axs = list(axs)
+        self.canvas = canvas
+        self.n_samples = n_samples
+        self.min_interval = 1.0 / target_fps
+        self._x = np.arange(n_samples)
+        self._background = None
+        self._last_update = 0.0
+        self.lines = []
+        for ax in self.axs:
+            line, = ax.plot(self._x, np.full(n_samples, np.nan), animated=True)
+            ax.set_xlim(0, n_samples - 1)
+            ax.set_ylim(*y_limits)
+            self.lines.append(line)
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_lines()
+
+    def _draw_lines(self):
+        for ax, line in zip(self.axs, self.lines):
+            ax.draw_artist(line)
+
+    def set_titles(self, titles):
+        # Titles are static artists, so changing them needs one full redraw
+        for ax, title in zip(self.axs, titles):
+            ax.set_title(title)
+        self.canvas.draw_idle()
+
+    def _fit_limits(self, data):
+        # Grow the y-range when the signal leaves it; a full redraw is only needed then
+        rescaled = False
+        for ax, row in zip(self.axs, data):
+            if not len(row):
+                continue
+            low, high = ax.get_ylim()
+            row_min, row_max = np.nanmin(row), np.nanmax(row)
+            if row_min < low or row_max > high:
+                margin = 0.2 * (max(high, row_max) - min(low, row_min))
+                ax.set_ylim(min(low, row_min - margin), max(high, row_max + margin))
+                rescaled = True
+        return rescaled
+
+    def update(self, data, force=False):
+        """Show `data` (channels x samples, newest last). Returns True if redrawn."""
+        now = time.perf_counter()
+        if not force and now - self._last_update < self.min_interval:
+            return False
+        self._last_update = now
+
+        for line, row in zip(self.lines, data):
+            n = len(row)
+            if n == self.n_samples:
+                # set_data, not set_ydata: an earlier partial window may have left x shorter
+                line.set_data(self._x, row)
+            else:
+                # Right-align a partial window so the trace scrolls in from the right
+                n = min(n, self.n_samples)
+                line.set_data(self._x[self.n_samples - n:], row[-n:] if n else row[:0])
+
+        if self._fit_limits(data) or self._background is None:
+            self.canvas.draw()
+            return True
+        self.canvas.restore_region(self._background)
+        self._draw_lines()
+        self.canvas.blit(self.fig.bbox)
+        return True
+
+
+class HistoryPlot:
+    """Line plot of a growing series that appends points instead of replotting.
+
+    Values are kept in a preallocated array that doubles when full, and axis
+    limits grow geometrically so the static background rarely needs redrawing.
+    """
+
+    def __init__(self, ax, canvas, label=None, y_limits=(0.0, 1.0), capacity=64):
+        self.ax = ax
+        self.canvas = canvas
+        self._values = np.empty(capacity)
+        self._count = 0
+        self._background = None
+        self.line, = ax.plot([], [], label=label, animated=True)
+        ax.set_xlim(0, capacity - 1)
+        ax.set_ylim(*y_limits)
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.ax.figure.bbox)
+        self.ax.draw_artist(self.line)
+
+    @property
+    def values(self):
+        return self._values[:self._count]
+
+    def clear(self):
+        self._count = 0
+        self.line.set_data([], [])
+        self.canvas.draw_idle()
+
+    def append(self, value):
+        if self._count == len(self._values):
+            self._values = np.concatenate([self._values, np.empty_like(self._values)])
+        self._values[self._count] = value
+        self._count += 1
+        self.line.set_data(np.arange(self._count), self.values)
+
+        redraw = self._background is None
+        if self._count > self.ax.get_xlim()[1] + 1:
+            self.ax.set_xlim(0, 2 * self._count)
+            redraw = True
+        low, high = self.ax.get_ylim()
+        if not low <= value <= high:
+            self.ax.set_ylim(min(low, value), max(high, value))
+            redraw = True
+
+        if redraw:
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(self._background)
+        self.ax.draw_artist(self.line)
+        self.canvas.blit(self.ax.figure.bbox)
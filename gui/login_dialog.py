@@ -1,10 +1,11 @@
 import tkinter as tk
 from tkinter import messagebox
-from PIL import Image, ImageTk
 import os
 from database.database import register_user, login_user
 from datetime import datetime
-from gui.calibration import CalibrationTool 
+from gui.asset_cache import ResizeDebouncer, get_cache
+
+BACKGROUND_PATH = os.path.join("assets", "background.png")
 
 
 class LoginDialog(tk.Frame):
@@ -12,10 +13,12 @@ class LoginDialog(tk.Frame):
         super().__init__(parent)
         self.password_entry = None
         self.username_entry = None
-        self.background_image_original = None
         self.background_image = None
         self.background_label = None
         self.on_success = on_success
+        self.assets = get_cache()
+        # Only re-render the background once a resize has settled
+        self.resize_debouncer = ResizeDebouncer(self, lambda width, height: self.update_background_image())
         self.initUI()
         self.bind("<Configure>", self.on_resize)
 
@@ -37,11 +40,14 @@ class LoginDialog(tk.Frame):
         tk.Button(self, text="Calibrate", command=self.open_calibration_tool).place(relx=0.5, y=390, anchor="n")  # Add Calibrate button
 
     def open_calibration_tool(self):
+        from gui.calibration import CalibrationTool  # OpenCV is only imported when needed
+
         CalibrationTool(self)  # Open the calibration tool
 
     def load_background_image(self):
         try:
-            self.background_image_original = Image.open(os.path.join("assets", "background.png"))
+            self.assets.source(BACKGROUND_PATH)
+            self.resize_debouncer.reset()
             self.update_background_image()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load background image: {e}")
@@ -50,8 +56,7 @@ class LoginDialog(tk.Frame):
         width = self.winfo_width()
         height = self.winfo_height()
         if width > 1 and height > 1:
-            self.background_image = self.background_image_original.resize((width, height), Image.Resampling.LANCZOS)
-            self.background_image = ImageTk.PhotoImage(self.background_image)
+            self.background_image = self.assets.photo(BACKGROUND_PATH, (width, height))
             if self.background_label is not None:
                 self.background_label.config(image=self.background_image)
                 self.background_label.image = self.background_image
@@ -61,7 +66,7 @@ class LoginDialog(tk.Frame):
                 self.background_label.lower()
 
     def on_resize(self, event):
-        self.update_background_image()
+        self.resize_debouncer(event)
 
     def setup_register(self):
         self.clear_frame()
@@ -101,8 +106,9 @@ class LoginDialog(tk.Frame):
     def login(self):
         username = self.username_entry.get()
         password = self.password_entry.get()
-        if login_user(username, password):
-            self.on_success()
+        user = login_user(username, password)
+        if user:
+            self.on_success(user)
         else:
             messagebox.showerror("Error", "Invalid username or password")
 
@@ -145,6 +151,6 @@ class LoginDialog(tk.Frame):
 if __name__ == "__main__":
     root = tk.Tk()
     root.geometry("800x600")
-    app = LoginDialog(root, on_success=lambda: print("Login successful!"))
+    app = LoginDialog(root, on_success=lambda user: print(f"Login successful! {user}"))
     app.pack(fill="both", expand=True)
     root.mainloop()
@@ -1,83 +1,100 @@
-import csv
+import logging
 import os
+import queue
+import time
 import tkinter as tk
 from tkinter import messagebox, filedialog
-from PIL import Image, ImageTk
 from matplotlib import pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import boto3
-from botocore.exceptions import NoCredentialsError
 import numpy as np
-from sklearn.preprocessing import MinMaxScaler
-import tensorflow as tf
-
-# Load your LSTM model
-model_path = 'update your model path'
-model = tf.keras.models.load_model(model_path)
-
-scaler = MinMaxScaler()
-
-class EEGHardware:
-    def __init__(self):
-        # Initialize connection to the hardware
-        pass
-
-    def get_data(self):
-
-        # This should return a list of 6 channels with 100 data points each
-        # Example: [[ch1_data], [ch2_data], ..., [ch6_data]]
-
-        # Simulate hardware data acquisition for testing purposes
-        time_points = np.linspace(0, 1, 100)
-        eeg_data = [np.sin(2 * np.pi * 10 * time_points) + np.random.randn(100) * 0.1 for _ in range(6)]
-        return eeg_data
-
-eeg_hardware = EEGHardware()
-
-def upload_to_aws(local_file, bucket, s3_file):
-    s3 = boto3.client(
-        's3',
-        aws_access_key_id='YOUR_ACCESS_KEY',
-        aws_secret_access_key='YOUR_SECRET_KEY',
-        region_name='us-east-1'
-    )
-    try:
-        s3.upload_file(local_file, bucket, s3_file)
-        print("Upload Successful")
-        return True
-    except FileNotFoundError:
-        print("The file was not found")
-        return False
-    except NoCredentialsError:
-        print("Credentials not available")
-        return False
-
-def preprocess_eeg_data(eeg_data):
-    eeg_data = np.array(eeg_data)
-
-    # Replace feature value which its absolute value is less than 10
-    eeg_data = np.where(np.abs(eeg_data) < 10, np.nan, eeg_data)
-    eeg_data = np.where(np.isnan(eeg_data), np.nanmean(eeg_data, axis=0), eeg_data)
-
-    eeg_data = scaler.fit_transform(eeg_data)
-
-    eeg_data = eeg_data.reshape((1, 100, 6))
-    return eeg_data
-
-def make_prediction(model, eeg_data):
-    processed_data = preprocess_eeg_data(eeg_data)
-    predictions = model.predict(processed_data)
-    return predictions, np.argmax(predictions, axis=-1)
+from cloud.upload_queue import UploadQueue
+from database.calibration_store import CalibrationStore
+from eeg.acquisition import AcquisitionEngine
+from eeg.inference import MicroBatcher
+from eeg.instrumentation import get_instrumentation
+from eeg.preprocessing import load_normalizer, load_stream_filter, make_prediction, preprocess_eeg_data
+from eeg.quantization import PRECISIONS, quantized_path
+from eeg.realtime import SlidingWindowClassifier
+from eeg.session import write_session, write_csv_session
+from eeg.signal_quality import SignalQualityMonitor
+from eeg.sources import NUM_CHANNELS, SAMPLE_RATE, WINDOW_SIZE, EEGHardware, open_source
+from eeg.startup import ModelLoader
+from gui.asset_cache import get_cache
+from gui.electrode_status_page import ElectrodeStatusPage
+from gui.live_plot import PLOT_SECONDS, LivePlot, HistoryPlot
+
+# The LSTM model is loaded in the background by a ModelLoader (models/lstm_model.h5 by default).
+# The 'numpy' backend runs it without TensorFlow; set OMEGAVR_MODEL_BACKEND=keras to use TensorFlow instead.
+# If a band-power model was trained too, inference falls back to it while the LSTM is over its latency
+# budget; OMEGAVR_CLASSIFIER=lstm or =fast pins one model. float16/int8 exports of the LSTM (eeg.quantization)
+# can be chosen from the precision menu or with OMEGAVR_MODEL_PRECISION.
+# boto3 is only imported by the upload queue when the first upload starts.
+# With OMEGAVR_INFERENCE_SERVER set (e.g. unix:/tmp/omegavr-inference.sock), windows are classified by a
+# shared server (python -m server.inference_server) instead of the local model.
+
+logger = logging.getLogger(__name__)
+
+# Stage timers for the acquire -> preprocess -> predict -> render -> save path (see PerformancePanel)
+instrumentation = get_instrumentation()
+
+PLOT_FPS = 30
+CONTROL_STRIDE = 25  # Samples between overlapping windows in control mode
+PREDICTION_POLL_MS = 10  # How often the Tk thread picks up finished predictions
+QUALITY_INTERVAL_MS = 250  # Signal-quality checks run at a fixed, low rate off the classification path
+INFERENCE_SERVER = os.environ.get('OMEGAVR_INFERENCE_SERVER')
+
+CALIBRATION_IMAGE_DIR = os.path.join("gui", "calibration_images")
+CALIBRATION_IMAGES = {
+    "Left Click": "left_click.png",
+    "Right Click": "right_click.png",
+    "Scroll Up": "scroll_up.png",
+    "Scroll Down": "scroll_down.png"
+}
+CALIBRATION_IMAGE_SIZE = (200, 200)
+SMALL_ICON_PATH = os.path.join(CALIBRATION_IMAGE_DIR, "small_icon.png")
+SMALL_ICON_SIZE = (50, 50)
+
+# OMEGAVR_EEG_SOURCE=synthetic or replay:<files> swaps the headset for an eeg.sources back-end
+eeg_hardware = open_source()
 
 class MainWindow(tk.Frame):
-    def __init__(self, parent, exit_callback):
+    def __init__(self, parent, exit_callback, model_loader=None, user=None):
         super().__init__(parent)
         self.parent = parent
         self.exit_callback = exit_callback
+        self.user_id = user[0] if user else None  # (id, username) row from login_user
+        self.calibration_store = CalibrationStore()
+        instrumentation.attach('save.calibration_db', self.calibration_store.latency)
+        self.performance_panel = None
+        self.model_loader = (model_loader or ModelLoader()).start()
+        self.batcher = None
+        self.classifier = None
         self.calibration_data = []
+        self.calibration_segments = []  # (action, window, timestamp) in capture order
         self.calibrating = False
-        self.electrode_status = [True] * 6
+        # Sized from the active source, which may be a replay recorded at another rate or channel count
+        self.electrode_status = [True] * eeg_hardware.channels
+        self.signal_quality = SignalQualityMonitor(eeg_hardware.channels, eeg_hardware.sample_rate)
         self.accuracy_data = []
+        self.acquisition = AcquisitionEngine(eeg_hardware, sample_rate=eeg_hardware.sample_rate,
+                                             channels=eeg_hardware.channels,
+                                             stream_filter=load_stream_filter(eeg_hardware.sample_rate,
+                                                                              eeg_hardware.channels))
+        if self.acquisition.stream_filter is not None:
+            instrumentation.attach('filter', self.acquisition.stream_filter.latency)
+        self.acquisition.start()
+        # Upload and calibration-save callbacks arrive on worker threads and are drained on the Tk thread
+        self.upload_events = queue.Queue()
+        self.upload_queue = UploadQueue(
+            on_progress=lambda job, sent, total: self.upload_events.put(('progress', job, sent, total)),
+            on_complete=lambda job, success, error: self.upload_events.put(('complete', job, success, error)))
+        self.upload_queue.start()
+        # Finished predictions are handed over the same way: (action, predictions, error) from the batcher thread
+        self.prediction_results = queue.Queue()
+        # Decode and resize the calibration images before the first calibration step needs them
+        self.assets = get_cache()
+        self.assets.prerender([(os.path.join(CALIBRATION_IMAGE_DIR, name), CALIBRATION_IMAGE_SIZE)
+                               for name in CALIBRATION_IMAGES.values()] + [(SMALL_ICON_PATH, SMALL_ICON_SIZE)])
         self.initUI()
 
     def initUI(self):
@@ -89,9 +106,15 @@ class MainWindow(tk.Frame):
         self.right_frame = tk.Frame(self, bg="white")
         self.right_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=1)
 
-        self.fig, self.axs = plt.subplots(6, 1, figsize=(5, 12), dpi=100)
-        self.fig.tight_layout(pad=3.0)
+        self.fig, axs = plt.subplots(eeg_hardware.channels, 1, figsize=(5, 12), dpi=100, squeeze=False)
+        self.axs = axs[:, 0]
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.left_frame)
+        self.live_plot = LivePlot(self.fig, self.axs, self.canvas,
+                                  n_samples=int(PLOT_SECONDS * eeg_hardware.sample_rate),
+                                  target_fps=PLOT_FPS)
+        for i, ax in enumerate(self.axs):
+            ax.set_title(f"EEG Data - Electrode {i + 1}")
+        self.fig.tight_layout(pad=3.0)
         self.canvas.draw()
         self.canvas.get_tk_widget().pack(side=tk.LEFT, fill=tk.BOTH, expand=1)
 
@@ -108,28 +131,152 @@ class MainWindow(tk.Frame):
         self.electrode_status_button = tk.Button(self.right_frame, text="Electrode Status",
                                                  command=self.show_electrode_status)
         self.electrode_status_button.pack(pady=10)
+        self.control_button = tk.Button(self.right_frame, text="Start Control Mode", command=self.toggle_control_mode)
+        self.control_button.pack(pady=10)
+        tk.Button(self.right_frame, text="Performance", command=self.show_performance_panel).pack(pady=5)
+        # Only the precisions exported next to the model are offered; a remote server uses its own model
+        self.precision = tk.StringVar(value=self.model_loader.precision)
+        precisions = [p for p in PRECISIONS
+                      if p == 'float32' or os.path.exists(quantized_path(self.model_loader.model_path, p))]
+        if len(precisions) > 1 and not INFERENCE_SERVER:
+            precision_frame = tk.Frame(self.right_frame, bg="white")
+            precision_frame.pack(pady=5)
+            tk.Label(precision_frame, text="Model precision:", bg="white").pack(side=tk.LEFT)
+            tk.OptionMenu(precision_frame, self.precision, *precisions, command=self.change_precision).pack(side=tk.LEFT)
+        self.upload_label = tk.Label(self.right_frame, text="", font=("Helvetica", 10), bg="white")
+        self.upload_label.pack(pady=5)
+        self.electrode_panel = ElectrodeStatusPage(self.right_frame, self.electrode_status,
+                                                   title_font=("Helvetica", 12), label_font=("Helvetica", 10))
+        self.electrode_panel.pack(pady=5)
 
         # Frame for accuracy plot
         self.accuracy_frame = tk.Frame(self.right_frame, bg="white")
         self.accuracy_frame.pack(side=tk.BOTTOM, fill=tk.BOTH, expand=1)
         self.accuracy_fig, self.accuracy_ax = plt.subplots(figsize=(5, 3), dpi=100)
         self.accuracy_canvas = FigureCanvasTkAgg(self.accuracy_fig, master=self.accuracy_frame)
+        self.accuracy_plot = HistoryPlot(self.accuracy_ax, self.accuracy_canvas, label='Accuracy')
+        self.accuracy_ax.set_title('Model Accuracy')
+        self.accuracy_ax.set_xlabel('Calibration Step')
+        self.accuracy_ax.set_ylabel('Accuracy')
+        self.accuracy_ax.legend()
         self.accuracy_canvas.draw()
         self.accuracy_canvas.get_tk_widget().pack(side=tk.BOTTOM, fill=tk.BOTH, expand=1)
 
         self.small_icon_label = tk.Label(self.left_frame, bg="white")
         self.small_icon_label.place(relx=0.0, rely=1.0, anchor='sw')
 
+        self.refresh_plot()
+        self.refresh_signal_quality()
+        self.poll_uploads()
+        self.poll_predictions()
+
+    def poll_uploads(self):
+        try:
+            while True:
+                event = self.upload_events.get_nowait()
+                if event[0] == 'saved':
+                    if event[1] is not None:
+                        messagebox.showerror("Error", f"Failed to save the calibration session: {event[1]}")
+                elif event[0] == 'progress':
+                    _, job, sent, total = event
+                    percent = 100 * sent / total if total else 100
+                    self.upload_label.config(text=f"Uploading {job['key']}: {percent:.0f}%")
+                else:
+                    _, job, success, error = event
+                    if success:
+                        self.upload_label.config(text=f"Uploaded {job['key']} to AWS S3")
+                    else:
+                        self.upload_label.config(text=f"Upload of {job['key']} failed: {error}")
+        except queue.Empty:
+            pass
+        self._upload_job = self.after(200, self.poll_uploads)
+
+    def refresh_plot(self):
+        # Scroll the live traces; LivePlot skips frames beyond its target FPS. The next frame is scheduled
+        # first, so one failed draw does not stop the plot for the rest of the session
+        self._plot_job = self.after(int(1000 / PLOT_FPS), self.refresh_plot)
+        start = time.perf_counter()
+        if self.live_plot.update(self.acquisition.latest(self.live_plot.n_samples)):
+            instrumentation.record('render.live_plot', time.perf_counter() - start)
+
+    def refresh_signal_quality(self):
+        if self.acquisition.buffer.total_written >= self.signal_quality.window_size:
+            with instrumentation.stage('signal_quality'):
+                report = self.signal_quality.update(self.acquisition)
+            self.electrode_status = list(report.good)
+            self.electrode_panel.update_status(report)
+        self._quality_job = self.after(QUALITY_INTERVAL_MS, self.refresh_signal_quality)
+
     def start_calibration(self):
         if not self.calibrating:
+            if not self.model_ready():
+                return
             self.calibrating = True
+            if instrumentation.profile_next_run:
+                # One-shot cProfile of this calibration run, written when it completes
+                instrumentation.profile_next_run = False
+                instrumentation.start_profile()
             self.start_button.config(text="Calibrating...", state=tk.DISABLED)
             self.electrode_status_button.config(state=tk.DISABLED)
             self.actions = ["Left Click", "Right Click", "Scroll Up", "Scroll Down"]
             self.calibration_data = {action: [] for action in self.actions}
+            self.calibration_segments = []
             self.current_action = 0
             self.next_calibration_step()
 
+    def model_ready(self):
+        # Show a loading state until the background warm-up has produced the model
+        if self.batcher is not None:
+            return True
+        if INFERENCE_SERVER:
+            return self.connect_inference_server()
+        if not self.model_loader.ready:
+            self.instruction_label.config(text="Model loading, please wait...")
+            self.start_button.config(text="Model loading...", state=tk.DISABLED)
+            self.after(100, self.start_calibration)
+            return False
+        if self.model_loader.engine is None:
+            self.instruction_label.config(text="")
+            self.start_button.config(text="Start Calibration", state=tk.NORMAL)
+            messagebox.showerror("Error", f"Failed to load model: {self.model_loader.error}")
+            return False
+        self.instruction_label.config(text="")
+        self.batcher = MicroBatcher(self.model_loader.engine).start()
+        instrumentation.attach('predict.forward', self.model_loader.engine.latency)
+        fast_engine = self.model_loader.fast_engine
+        if fast_engine is not None and fast_engine is not self.model_loader.engine:
+            instrumentation.attach('predict.forward.lstm', self.model_loader.engine.primary.latency)
+            instrumentation.attach('predict.forward.fast', fast_engine.latency)
+        instrumentation.attach('predict.batched', self.batcher.latency)
+        return True
+
+    def connect_inference_server(self):
+        # The client has the same submit() -> Future interface as the MicroBatcher
+        from server.client import InferenceClient
+
+        try:
+            self.batcher = InferenceClient(INFERENCE_SERVER)
+        except OSError as e:
+            messagebox.showerror("Error", f"Failed to connect to the inference server at {INFERENCE_SERVER}: {e}")
+            return False
+        instrumentation.attach('predict.server', self.batcher.latency)
+        return True
+
+    def change_precision(self, precision):
+        loader = self.model_loader
+        if precision == loader.precision:
+            return
+        if self.calibrating or (self.classifier is not None and self.classifier.running):
+            messagebox.showinfo("Model Precision", "Stop calibration or control mode before switching models.")
+            self.precision.set(loader.precision)
+            return
+        if self.batcher is not None:
+            self.batcher.stop()
+            self.batcher = None
+        # The next calibration or control-mode start waits for this load, as at startup
+        self.model_loader = ModelLoader(loader.model_path, loader.backend, classifier=loader.classifier,
+                                        fast_model_path=loader.fast_model_path, precision=precision).start()
+
     def next_calibration_step(self):
         if self.current_action < len(self.actions):
             action = self.actions[self.current_action]
@@ -145,61 +292,101 @@ class MainWindow(tk.Frame):
         self.after(5000, self.next_calibration_step)
 
     def show_calibration_image(self, action):
-        image_file_map = {
-            "Left Click": "left_click.png",
-            "Right Click": "right_click.png",
-            "Scroll Up": "scroll_up.png",
-            "Scroll Down": "scroll_down.png"
-        }
-        image_path = os.path.join("gui", "calibration_images", image_file_map[action])
+        image_path = os.path.join(CALIBRATION_IMAGE_DIR, CALIBRATION_IMAGES[action])
         try:
-            image = Image.open(image_path)
-            image = image.resize((200, 200))
-            image = ImageTk.PhotoImage(image)
+            image = self.assets.photo(image_path, CALIBRATION_IMAGE_SIZE)
             self.image_label.config(image=image)
             self.image_label.image = image
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load image for {action}: {e}")
 
-        small_icon_path = os.path.join("gui", "calibration_images", "small_icon.png")
         try:
-            small_icon = Image.open(small_icon_path)
-            small_icon = small_icon.resize((50, 50))
-            small_icon = ImageTk.PhotoImage(small_icon)
+            small_icon = self.assets.photo(SMALL_ICON_PATH, SMALL_ICON_SIZE)
             self.small_icon_label.config(image=small_icon)
             self.small_icon_label.image = small_icon
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load small icon: {e}")
 
     def capture_eeg_data(self, action):
-        eeg_data = eeg_hardware.get_data()
-        self.calibration_data[action].append(eeg_data)
-        for i, ax in enumerate(self.axs):
-            ax.clear()
-            ax.plot(eeg_data[i])
-            ax.set_title(f"EEG Data - Electrode {i + 1} - {action}")
-        self.fig.tight_layout(pad=3.0)
-        self.canvas.draw()
+        with instrumentation.stage('acquire'):
+            self.acquisition.wait_for(WINDOW_SIZE, timeout=1.0)
+            eeg_data = self.acquisition.latest(WINDOW_SIZE)
+            # The window is a view into the ring buffer; keep a copy of the unfiltered readings for saving
+            window = self.acquisition.latest(WINDOW_SIZE, raw=True).copy()
+        instrumentation.count('windows_captured')
+        self.calibration_data[action].append(window)
+        self.calibration_segments.append((action, window, time.time()))
+        with instrumentation.stage('render.titles'):
+            self.live_plot.set_titles([f"EEG Data - Electrode {i + 1} - {action}" for i in range(len(self.axs))])
+
+        # Classify off the Tk thread; poll_predictions picks the result up once it is ready
+        submitted = time.perf_counter()
+        future = self.batcher.submit(preprocess_eeg_data(eeg_data))
+        future.add_done_callback(lambda future: self.prediction_done(future, action, submitted))
+
+        self.current_action += 1
+        self.progress_bar.config(text=f"Progress: {self.current_action}/{len(self.actions)}")
+
+    def prediction_done(self, future, action, submitted):
+        # Runs on the batcher thread: time the prediction itself and hand the result to the Tk thread
+        instrumentation.record('predict.roundtrip', time.perf_counter() - submitted)
+        error = future.exception()
+        self.prediction_results.put((action, None if error else future.result(), error))
 
-        predictions, predicted_class = make_prediction(model, eeg_data)
-        self.update_gui_with_prediction(predicted_class)
+    def poll_predictions(self):
+        try:
+            while True:
+                self.handle_prediction(*self.prediction_results.get_nowait())
+        except queue.Empty:
+            pass
+        self._prediction_job = self.after(PREDICTION_POLL_MS, self.poll_predictions)
+
+    def handle_prediction(self, action, predictions, error):
+        if error is not None:
+            instrumentation.count('prediction_errors')
+            messagebox.showerror("Error", f"Prediction failed: {error}")
+            return
+        self.update_gui_with_prediction(np.argmax(predictions, axis=-1))
 
         # Calculate accuracy (assuming ground truth is the current action's index)
         true_class = self.actions.index(action)
         accuracy = predictions[0][true_class]
         self.accuracy_data.append(accuracy)
-
-        # Update accuracy plot
-        self.accuracy_ax.clear()
-        self.accuracy_ax.plot(self.accuracy_data, label='Accuracy')
-        self.accuracy_ax.set_title('Model Accuracy')
-        self.accuracy_ax.set_xlabel('Calibration Step')
-        self.accuracy_ax.set_ylabel('Accuracy')
-        self.accuracy_ax.legend()
-        self.accuracy_canvas.draw()
-
-        self.current_action += 1
-        self.progress_bar.config(text=f"Progress: {self.current_action}/{len(self.actions)}")
+        with instrumentation.stage('render.accuracy_plot'):
+            self.accuracy_plot.append(accuracy)
+
+    def toggle_control_mode(self):
+        # Continuous classification of overlapping windows from the live stream
+        if self.classifier is not None and self.classifier.running:
+            self.classifier.stop()
+            report = self.classifier.report()
+            instrumentation.note('Last control-mode run', report)
+            logger.info("Control mode stopped\n%s", report)
+            self.control_button.config(text="Start Control Mode")
+            return
+        if INFERENCE_SERVER:
+            if not self.model_ready():
+                return
+            predict_batch = self.batcher.predict_batch
+        else:
+            engine = self.model_loader.engine
+            if engine is None:
+                if self.model_loader.ready:
+                    messagebox.showerror("Error", f"Failed to load model: {self.model_loader.error}")
+                else:
+                    messagebox.showinfo("Control Mode", "The model is still loading, please try again shortly.")
+                return
+            predict_batch = engine.predict_batch
+        self.classifier = SlidingWindowClassifier(self.acquisition, predict_batch, preprocess_eeg_data,
+                                                  self.dispatch_action, window_size=WINDOW_SIZE,
+                                                  stride=CONTROL_STRIDE)
+        instrumentation.attach('control.sample_to_dispatch', self.classifier.latency)
+        self.classifier.start()
+        self.control_button.config(text="Stop Control Mode")
+
+    def dispatch_action(self, class_index):
+        # Called on the classifier thread, so the simulate_* handlers must not touch Tk widgets
+        self.update_gui_with_prediction([class_index])
 
     def update_gui_with_prediction(self, prediction):
         actions = ["Left Click", "Right Click", "Scroll Up", "Scroll Down"]
@@ -227,6 +414,13 @@ class MainWindow(tk.Frame):
         print("Simulating Scroll Down")
 
     def complete_calibration(self):
+        # Persist the session in the database without blocking the UI; poll_uploads reports the outcome
+        saved = self.calibration_store.save_async(self.user_id, self.calibration_segments, eeg_hardware.sample_rate)
+        saved.add_done_callback(lambda future: self.upload_events.put(('saved', future.exception())))
+        if instrumentation.profiling:
+            profile_path = instrumentation.stop_profile(label='calibration')
+            instrumentation.note('Last calibration profile', profile_path)
+            logger.info("Calibration profile written to %s", profile_path)
         overall_accuracy = np.mean(self.accuracy_data) * 100
         messagebox.showinfo("Calibration Complete", f"Calibration is complete!\nOverall Accuracy: {overall_accuracy:.2f}%")
         self.instruction_label.config(text="Calibration Complete")
@@ -237,37 +431,63 @@ class MainWindow(tk.Frame):
         self.calibrating = False
 
     def save_data(self):
-        file_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV files", "*.csv")])
+        file_path = filedialog.asksaveasfilename(defaultextension=".eegs",
+                                                 filetypes=[("EEG session files", "*.eegs"), ("CSV files", "*.csv")])
         if not file_path:
             return
 
         try:
-            with open(file_path, 'w', newline='') as file:
-                writer = csv.writer(file)
-                for action, data in self.calibration_data.items():
-                    writer.writerow([action])
-                    for row in zip(*data):
-                        writer.writerow(row)
-            messagebox.showinfo("Success", "Data saved successfully!")
-
-            bucket = 'your-bucket-name'
-            s3_file = os.path.basename(file_path)
-            if upload_to_aws(file_path, bucket, s3_file):
-                messagebox.showinfo("Success", "Data uploaded to AWS S3 successfully")
-            else:
-                messagebox.showerror("Error", "Failed to upload data to AWS S3")
+            # Binary sessions by default; CSV remains available as an export format
+            with instrumentation.stage('save.write'):
+                if file_path.lower().endswith('.csv'):
+                    write_csv_session(file_path, self.calibration_segments)
+                else:
+                    write_session(file_path, self.calibration_segments, sample_rate=eeg_hardware.sample_rate)
+            # Uploads continue in the background and resume after a restart if interrupted
+            self.upload_queue.enqueue(file_path)
+            self.upload_label.config(text=f"Queued {os.path.basename(file_path)} for upload")
+            messagebox.showinfo("Success", "Data saved successfully! Upload to AWS S3 continues in the background.")
 
             if messagebox.askyesno("Exit Application", "Do you want to exit the application?"):
                 self.exit_callback()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save data: {e}")
 
+    def destroy(self):
+        self.after_cancel(self._plot_job)
+        self.after_cancel(self._upload_job)
+        self.after_cancel(self._prediction_job)
+        self.after_cancel(self._quality_job)
+        self.upload_queue.stop(timeout=1.0)
+        self.calibration_store.stop(timeout=5.0)
+        if self.classifier is not None:
+            self.classifier.stop()
+        self.acquisition.stop()
+        if self.batcher is not None:
+            self.batcher.stop()
+        super().destroy()
+
+    def show_performance_panel(self):
+        from gui.performance_panel import PerformancePanel
+
+        if self.performance_panel is None or not self.performance_panel.winfo_exists():
+            self.performance_panel = PerformancePanel(self, instrumentation)
+        else:
+            self.performance_panel.lift()
+
     def show_electrode_status(self):
-        status_message = "\n".join([f"Electrode {i + 1}: {'Active' if status else 'Inactive'}"
-                                    for i, status in enumerate(self.electrode_status)])
+        report = self.signal_quality.last_report
+        if report is None:
+            status_message = "\n".join([f"Electrode {i + 1}: {'Active' if status else 'Inactive'}"
+                                        for i, status in enumerate(self.electrode_status)])
+        else:
+            status_message = "\n".join([
+                f"Electrode {i + 1}: {report.status[i]} (RMS {report.rms[i]:.3f}, clipped {report.clipped_fraction[i]:.0%}, "
+                f"line noise {report.line_noise_ratio[i]:.0%})" for i in range(len(report.status))])
         messagebox.showinfo("Electrode Status", status_message)
 
 def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
     root = tk.Tk()
     root.title("OmegaVR EEG Calibration")
     root.geometry("1200x800")
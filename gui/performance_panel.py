@@ -0,0 +1,73 @@
+import tkinter as tk
+from tkinter import filedialog, messagebox
+
+from eeg.instrumentation import get_instrumentation
+
+REFRESH_MS = 500
+
+
+class PerformancePanel(tk.Toplevel):
+    """Live per-stage timing table with histograms, export and one-shot profiling.
+
+    The table is a single Text widget whose contents are replaced on every
+    refresh, so an open panel costs one snapshot and one redraw per REFRESH_MS.
+    """
+
+    def __init__(self, parent, instrumentation=None):
+        super().__init__(parent)
+        self.title("Performance")
+        self.geometry("640x520")
+        self.instrumentation = instrumentation or get_instrumentation()
+        self.show_histograms = tk.BooleanVar(value=False)
+        self.profile_next = tk.BooleanVar(value=self.instrumentation.profile_next_run)
+
+        controls = tk.Frame(self)
+        controls.pack(side=tk.TOP, fill=tk.X, padx=5, pady=5)
+        tk.Checkbutton(controls, text="Histograms", variable=self.show_histograms).pack(side=tk.LEFT)
+        tk.Checkbutton(controls, text="Profile next calibration", variable=self.profile_next,
+                       command=self.on_profile_toggle).pack(side=tk.LEFT)
+        tk.Button(controls, text="Reset", command=self.instrumentation.reset).pack(side=tk.RIGHT)
+        tk.Button(controls, text="Export CSV", command=lambda: self.export('csv')).pack(side=tk.RIGHT)
+        tk.Button(controls, text="Export JSON", command=lambda: self.export('json')).pack(side=tk.RIGHT)
+
+        self.text = tk.Text(self, font=("Courier", 9), wrap=tk.NONE)
+        self.text.pack(fill=tk.BOTH, expand=1)
+        self._job = None
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self.refresh()
+
+    def refresh(self):
+        content = self.instrumentation.format_table()
+        if self.show_histograms.get():
+            for name, tracker in self.instrumentation.trackers():
+                if tracker.count:
+                    content += f"\n\n{name}\n{tracker.format_histogram((0.5, 1, 2, 5, 10, 20, 50, 100), width=30)}"
+        for name, text in self.instrumentation.notes():
+            content += f"\n\n{name}\n{text}"
+        if self.instrumentation.profiling:
+            content = "Profiling this calibration run...\n\n" + content
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", content)
+        self.profile_next.set(self.instrumentation.profile_next_run)
+        self._job = self.after(REFRESH_MS, self.refresh)
+
+    def on_profile_toggle(self):
+        self.instrumentation.profile_next_run = self.profile_next.get()
+
+    def export(self, kind):
+        path = filedialog.asksaveasfilename(parent=self, defaultextension=f".{kind}",
+                                            filetypes=[(f"{kind.upper()} files", f"*.{kind}")])
+        if not path:
+            return
+        try:
+            if kind == 'csv':
+                self.instrumentation.export_csv(path)
+            else:
+                self.instrumentation.export_json(path)
+        except OSError as e:
+            messagebox.showerror("Error", f"Failed to export timings: {e}", parent=self)
+
+    def close(self):
+        if self._job is not None:
+            self.after_cancel(self._job)
+        self.destroy()
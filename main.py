@@ -1,7 +1,19 @@
+from eeg.startup import PhaseTimer, ModelLoader
+
+startup_timer = PhaseTimer()
+
+import logging
 import tkinter as tk
 from database.database import setup_db
+from database.calibration_store import setup_calibration_tables
 from gui.login_dialog import LoginDialog
-from gui.main_window import MainWindow
+
+startup_timer.mark("imports")
+
+# Heavy modules the main window needs, warmed up off the Tk thread. gui.main_window itself is imported on the
+# Tk thread when the window is built: importing it opens the EEG source and pulls in tkinter widgets
+MAIN_WINDOW_DEPS = ("numpy", "h5py", "scipy.signal", "matplotlib.figure", "eeg.acquisition", "eeg.preprocessing",
+                    "eeg.quantization", "eeg.realtime", "eeg.signal_quality", "eeg.sources")
 
 
 class EEGCalibrationApp(tk.Tk):
@@ -9,16 +21,26 @@ class EEGCalibrationApp(tk.Tk):
         super().__init__()
         self.title("EEG Data Capture and Calibration")
         self.geometry("1200x800")
+        # The model and the main window's heavy modules are loaded once the login screen is up
+        self.model_loader = ModelLoader(preload=MAIN_WINDOW_DEPS, timer=startup_timer)
         self.setup_login()
 
     def setup_login(self):
         self.clear_frame()
         login_dialog = LoginDialog(self, self.setup_main_window)
         login_dialog.pack(fill=tk.BOTH, expand=1)
+        self.after_idle(self.on_login_visible)
+
+    def on_login_visible(self):
+        if not self.model_loader.started:
+            startup_timer.mark("login screen visible")
+            self.model_loader.start()
+
+    def setup_main_window(self, user=None):
+        from gui.main_window import MainWindow
 
-    def setup_main_window(self):
         self.clear_frame()
-        main_window = MainWindow(self, self.exit_application)
+        main_window = MainWindow(self, self.exit_application, self.model_loader, user=user)
         main_window.pack(fill=tk.BOTH, expand=1)
 
     def clear_frame(self):
@@ -30,6 +52,10 @@ class EEGCalibrationApp(tk.Tk):
 
 
 if __name__ == "__main__":
+    # Registration, login, calibration-store and server messages go through logging
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
     setup_db()
+    setup_calibration_tables()
+    startup_timer.mark("database ready")
     app = EEGCalibrationApp()
     app.mainloop()
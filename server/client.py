@@ -0,0 +1,102 @@
+"""
+Blocking client for the inference server.
+
+`submit` has the same contract as eeg.inference.MicroBatcher.submit (a
+preprocessed (samples, channels) window in, a Future of a (1, n_classes)
+probability row out), so MainWindow can use either one. A reader thread
+resolves the futures as results arrive; `predict_batch` is a drop-in `predict`
+callable for SlidingWindowClassifier.
+"""
+
+import itertools
+import socket
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from eeg.metrics import LatencyTracker
+from server import protocol
+
+
+class InferenceClient:
+    def __init__(self, address, timeout=5.0):
+        self.address = address
+        self.timeout = timeout
+        kind, target = protocol.parse_address(address)
+        family = socket.AF_UNIX if kind == 'unix' else socket.AF_INET
+        self._sock = socket.socket(family, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        self._sock.connect(target)
+        self._sock.settimeout(None)
+        if kind == 'tcp':
+            self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.latency = LatencyTracker('server round trip')
+        self._ids = itertools.count()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._closed = False
+        self._reader = threading.Thread(target=self._read_loop, name="inference-client", daemon=True)
+        self._reader.start()
+
+    def submit(self, window, preprocessed=True):
+        """Send one window; preprocessed windows are (samples, channels), raw ones (channels, samples)."""
+        window = np.asarray(window, dtype=np.float32)
+        if window.ndim == 3:
+            window = window[0]
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise ConnectionError("Inference client is closed")
+            request_id = next(self._ids) & 0xFFFFFFFF
+            self._pending[request_id] = (future, time.perf_counter())
+        frame = protocol.encode_window(request_id, window, preprocessed)
+        # Blocks while the server has paused reading this connection (backpressure)
+        with self._send_lock:
+            self._sock.sendall(frame)
+        return future
+
+    def submit_raw(self, window):
+        return self.submit(window, preprocessed=False)
+
+    def predict_batch(self, batch):
+        """Classify preprocessed windows of shape (n, samples, channels); blocks until all results arrive."""
+        futures = [self.submit(window) for window in np.asarray(batch, dtype=np.float32)]
+        return np.concatenate([future.result(self.timeout) for future in futures])
+
+    def _read_loop(self):
+        error = ConnectionError("Connection to the inference server closed")
+        try:
+            while True:
+                kind, request_id, body = protocol.recv_message(self._sock)
+                with self._lock:
+                    future, submitted = self._pending.pop(request_id, (None, None))
+                if future is None:
+                    continue
+                if kind == protocol.RESULT:
+                    self.latency.record(time.perf_counter() - submitted)
+                    future.set_result(body.reshape(1, -1).copy())
+                else:
+                    future.set_exception(RuntimeError(f"Inference server error: {body}"))
+        except (OSError, ValueError) as e:
+            if not self._closed:
+                error = ConnectionError(f"Connection to the inference server lost: {e}")
+        with self._lock:
+            self._closed = True
+            pending, self._pending = self._pending, {}
+        for future, _ in pending.values():
+            future.set_exception(error)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+        self._reader.join(timeout=1.0)
+
+    stop = close  # MainWindow stops its batcher on destroy
@@ -0,0 +1,270 @@
+"""
+Headless inference service for several headsets on one machine.
+
+Clients stream windows over a local socket (see server.protocol). Windows from
+all clients are collected for up to `max_wait` seconds or `max_batch`
+windows, preprocessed together with preprocess_eeg_data and classified in a
+single forward pass on a worker thread, so the event loop keeps reading while
+the model runs.
+
+Backpressure is per client: the server stops reading from a connection while
+it has `max_inflight` windows queued or results not yet flushed to the
+socket, so a fast or stalled client fills its own socket buffers instead of
+the shared queue.
+
+Run from the repository root:
+    python -m server.inference_server --address unix:/tmp/omegavr-inference.sock
+    python -m server.inference_server --address tcp:127.0.0.1:8765 --max-batch 64
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from eeg.metrics import LatencyTracker
+from eeg.preprocessing import preprocess_eeg_data
+from server import protocol
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ADDRESS = os.environ.get(
+    'OMEGAVR_INFERENCE_SERVER',
+    'unix:/tmp/omegavr-inference.sock' if hasattr(socket, 'AF_UNIX') else 'tcp:127.0.0.1:8765')
+
+
+class _Client:
+    def __init__(self, writer, max_inflight):
+        self.writer = writer
+        self.slots = asyncio.Semaphore(max_inflight)
+        self.unflushed = 0
+        self.flushing = False
+        self.closed = False
+
+    def send(self, frame):
+        if not self.closed:
+            self.writer.write(frame)
+        self.unflushed += 1
+        if not self.flushing:
+            self.flushing = True
+            asyncio.get_running_loop().create_task(self._flush())
+
+    async def _flush(self):
+        # Slots are given back only once the results have left our write buffer
+        try:
+            while self.unflushed:
+                n, self.unflushed = self.unflushed, 0
+                if not self.closed:
+                    try:
+                        await self.writer.drain()
+                    except ConnectionError:
+                        self.closed = True
+                for _ in range(n):
+                    self.slots.release()
+        finally:
+            self.flushing = False
+
+
+class InferenceServer:
+    def __init__(self, engine, preprocess=preprocess_eeg_data, max_batch=64, max_wait=0.002, max_inflight=8):
+        self.engine = engine
+        self.preprocess = preprocess
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.max_inflight = max_inflight
+        self.window_shape = tuple(engine.window_shape)  # (samples, channels) model input
+        self.latency = LatencyTracker('server receive-to-result', history=10000)
+        self.batches = 0
+        self.windows = 0
+        self.clients = 0
+        self._queue = None
+        self._server = None
+        self._batch_task = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='inference-forward')
+        self._buffer = np.empty((max_batch,) + self.window_shape, dtype=np.float32)
+
+    @property
+    def mean_batch_size(self):
+        return self.windows / self.batches if self.batches else 0.0
+
+    async def start(self, address=DEFAULT_ADDRESS):
+        self._queue = asyncio.Queue()
+        kind, target = protocol.parse_address(address)
+        if kind == 'unix':
+            if os.path.exists(target):
+                os.unlink(target)  # Left behind by a previous run
+            self._server = await asyncio.start_unix_server(self._handle_client, path=target)
+        else:
+            self._server = await asyncio.start_server(self._handle_client, *target)
+        self._batch_task = asyncio.get_running_loop().create_task(self._batch_loop())
+        logger.info("Inference server listening on %s", address)
+        return self
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._batch_task is not None:
+            self._batch_task.cancel()
+        self._executor.shutdown(wait=False)
+
+    async def _handle_client(self, reader, writer):
+        client = _Client(writer, self.max_inflight)
+        self.clients += 1
+        try:
+            while True:
+                await client.slots.acquire()
+                kind, request_id, body = await protocol.read_message(reader)
+                received = time.perf_counter()
+                if kind != protocol.WINDOW:
+                    client.send(protocol.encode_error(request_id, f"Unexpected message type {kind}"))
+                    continue
+                window, preprocessed = body
+                expected = self.window_shape if preprocessed else self.window_shape[::-1]
+                if window.shape != expected:
+                    client.send(protocol.encode_error(request_id, f"Expected a {expected} window, got {window.shape}"))
+                    continue
+                self._queue.put_nowait((client, request_id, window, preprocessed, received))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except ValueError as e:
+            logger.warning("Dropping client after a malformed frame: %s", e)
+        finally:
+            self.clients -= 1
+            client.closed = True
+            writer.close()
+
+    async def _collect(self):
+        items = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        while len(items) < self.max_batch:
+            try:
+                items.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                items.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return items
+
+    def _forward(self, items):
+        # Raw windows are preprocessed in one call; preprocessed ones are copied in as they are
+        n = len(items)
+        batch = self._buffer[:n]
+        raw = [i for i, item in enumerate(items) if not item[3]]
+        if raw:
+            batch[raw] = self.preprocess(np.stack([items[i][2] for i in raw]))
+        for i, item in enumerate(items):
+            if item[3]:
+                batch[i] = item[2]
+        return self.engine.predict_batch(batch)
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = await self._collect()
+            try:
+                predictions = await loop.run_in_executor(self._executor, self._forward, items)
+            except Exception as e:
+                logger.error("Batch of %d windows failed: %s", len(items), e)
+                for client, request_id, _, _, _ in items:
+                    client.send(protocol.encode_error(request_id, e))
+                continue
+            done = time.perf_counter()
+            self.batches += 1
+            self.windows += len(items)
+            for (client, request_id, _, _, received), row in zip(items, predictions):
+                self.latency.record(done - received)
+                client.send(protocol.encode_result(request_id, row))
+
+    def report(self):
+        return (f"clients: {self.clients}  windows: {self.windows}  batches: {self.batches}  "
+                f"mean batch: {self.mean_batch_size:.1f}\n{self.latency}")
+
+
+class BackgroundServer:
+    """Runs an InferenceServer on its own event loop thread (for the GUI, tools and benchmarks)."""
+
+    def __init__(self, server, address=DEFAULT_ADDRESS):
+        self.server = server
+        self.address = address
+        self._loop = None
+        self._thread = None
+
+    def start(self):
+        started = threading.Event()
+        errors = []
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            try:
+                self._loop.run_until_complete(self.server.start(self.address))
+            except Exception as e:
+                errors.append(e)
+                started.set()
+                return
+            started.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self.server.close())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="inference-server", daemon=True)
+        self._thread.start()
+        started.wait()
+        if errors:
+            raise errors[0]
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._thread = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--address', default=DEFAULT_ADDRESS, help="'unix:/path' or 'tcp:host:port'")
+    parser.add_argument('--model', default=None, help='Keras .h5 model (default: models/lstm_model.h5)')
+    parser.add_argument('--backend', default=None, choices=['numpy', 'keras'])
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    parser.add_argument('--max-inflight', type=int, default=8, help='queued windows per client before reads pause')
+    parser.add_argument('--stats-interval', type=float, default=30.0)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+
+    from eeg.startup import ModelLoader
+
+    engine = ModelLoader(args.model, args.backend).wait()
+    if engine is None:
+        raise SystemExit("Model failed to load")
+    server = InferenceServer(engine, max_batch=args.max_batch, max_wait=args.max_wait_ms / 1000,
+                             max_inflight=args.max_inflight)
+
+    async def serve():
+        await server.start(args.address)
+        while True:
+            await asyncio.sleep(args.stats_interval)
+            logger.info(server.report())
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
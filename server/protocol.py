@@ -0,0 +1,113 @@
+"""
+Wire format between inference clients and the server.
+
+Every message is a frame:
+
+    4 bytes   little-endian uint32 length of the rest of the frame
+    1 byte    message type
+    n bytes   payload
+
+WINDOW (client -> server)
+    uint32 request id, uint8 flags, uint16 rows, uint16 columns, float32 rows x columns (C order).
+    Raw windows (flags 0) are (channels, samples) readings that the server
+    preprocesses; with FLAG_PREPROCESSED they are (samples, channels) model input.
+RESULT (server -> client)
+    uint32 request id, uint16 n_classes, float32 probabilities.
+ERROR (server -> client)
+    uint32 request id, UTF-8 message.
+
+Request ids are chosen by the client and only need to be unique per connection.
+"""
+
+import struct
+
+import numpy as np
+
+WINDOW = 1
+RESULT = 2
+ERROR = 3
+
+FLAG_PREPROCESSED = 1
+
+_FRAME = struct.Struct('<IB')
+_WINDOW = struct.Struct('<IBHH')
+_RESULT = struct.Struct('<IH')
+_ID = struct.Struct('<I')
+MAX_FRAME = 16 * 1024 * 1024
+
+
+def _frame(kind, *parts):
+    length = 1 + sum(len(part) for part in parts)
+    return b''.join((_FRAME.pack(length, kind),) + parts)
+
+
+def encode_window(request_id, window, preprocessed=False):
+    window = np.ascontiguousarray(window, dtype=np.float32)
+    rows, columns = window.shape
+    header = _WINDOW.pack(request_id, FLAG_PREPROCESSED if preprocessed else 0, rows, columns)
+    return _frame(WINDOW, header, window.tobytes())
+
+
+def encode_result(request_id, probabilities):
+    probabilities = np.ascontiguousarray(probabilities, dtype=np.float32).ravel()
+    return _frame(RESULT, _RESULT.pack(request_id, len(probabilities)), probabilities.tobytes())
+
+
+def encode_error(request_id, message):
+    return _frame(ERROR, _ID.pack(request_id), str(message).encode())
+
+
+def decode(kind, payload):
+    """Return (kind, request_id, body) where body is the window, the probabilities or the error text."""
+    if kind == WINDOW:
+        request_id, flags, rows, columns = _WINDOW.unpack_from(payload)
+        window = np.frombuffer(payload, dtype=np.float32, count=rows * columns, offset=_WINDOW.size)
+        return kind, request_id, (window.reshape(rows, columns), bool(flags & FLAG_PREPROCESSED))
+    if kind == RESULT:
+        request_id, n_classes = _RESULT.unpack_from(payload)
+        return kind, request_id, np.frombuffer(payload, dtype=np.float32, count=n_classes, offset=_RESULT.size)
+    if kind == ERROR:
+        (request_id,) = _ID.unpack_from(payload)
+        return kind, request_id, payload[_ID.size:].decode(errors='replace')
+    raise ValueError(f"Unknown message type {kind}")
+
+
+def _check_length(length):
+    if not 1 <= length <= MAX_FRAME:
+        raise ValueError(f"Invalid frame length {length}")
+
+
+async def read_message(reader):
+    """Read one frame from an asyncio StreamReader; raises IncompleteReadError at EOF."""
+    length, kind = _FRAME.unpack(await reader.readexactly(_FRAME.size))
+    _check_length(length)
+    return decode(kind, await reader.readexactly(length - 1))
+
+
+def _recv_exactly(sock, n):
+    buffer = bytearray(n)
+    view = memoryview(buffer)
+    received = 0
+    while received < n:
+        count = sock.recv_into(view[received:])
+        if not count:
+            raise ConnectionError("Connection closed by the server")
+        received += count
+    return bytes(buffer)
+
+
+def recv_message(sock):
+    """Blocking counterpart of read_message for plain sockets."""
+    length, kind = _FRAME.unpack(_recv_exactly(sock, _FRAME.size))
+    _check_length(length)
+    return decode(kind, _recv_exactly(sock, length - 1))
+
+
+def parse_address(address):
+    """'unix:/path/to.sock' or 'tcp:host:port' (a bare 'host:port' means TCP) -> ('unix', path) / ('tcp', (host, port))."""
+    if address.startswith('unix:'):
+        return 'unix', address[len('unix:'):]
+    if address.startswith('tcp:'):
+        address = address[len('tcp:'):]
+    host, _, port = address.rpartition(':')
+    return 'tcp', (host or '127.0.0.1', int(port))
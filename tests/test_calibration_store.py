@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from database import calibration_store, database
+
+
+@pytest.fixture
+def fresh_db(tmp_path):
+    database.configure(str(tmp_path / 'users.db'))
+    yield
+    database.configure(database.DB_PATH)
+
+
+def segments():
+    return [(action, np.full((6, 100), i, dtype=np.float32), 100.0 + i)
+            for i, action in enumerate(['Left Click', 'Right Click', 'Left Click'])]
+
+
+def test_save_without_setup(fresh_db):
+    # The app may start without running setup_db/setup_calibration_tables (e.g. gui.main_window.main)
+    store = calibration_store.CalibrationStore()
+    try:
+        session_id = store.save_async(None, segments(), sample_rate=250).result(10)
+    finally:
+        store.stop(timeout=5)
+    saved = calibration_store.session_windows(session_id)
+    assert [action for action, _, _ in saved] == ['Left Click', 'Right Click', 'Left Click']
+    np.testing.assert_array_equal(saved[1][2], segments()[1][1])
+    timestamps, windows = calibration_store.last_windows(None, 'Left Click', 5)
+    assert list(timestamps) == [102.0, 100.0] and windows.shape == (2, 6, 100)
+
+
+def test_failed_save_is_reported_through_the_future(fresh_db):
+    store = calibration_store.CalibrationStore()
+    try:
+        with pytest.raises(ValueError):
+            store.save_async(None, [], sample_rate=250).result(10)
+    finally:
+        store.stop(timeout=5)
@@ -0,0 +1,71 @@
+import os
+import socket
+import tempfile
+
+import numpy as np
+import pytest
+
+from server.client import InferenceClient
+from server.inference_server import BackgroundServer, InferenceServer
+
+
+class SumEngine:
+    """Stand-in model: one 'probability' per window, the sum of its first sample."""
+
+    window_shape = (100, 6)
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict_batch(self, batch):
+        self.batch_sizes.append(len(batch))
+        return batch[:, 0, :].sum(axis=1, keepdims=True)
+
+
+@pytest.fixture
+def server():
+    if hasattr(socket, 'AF_UNIX'):
+        address = 'unix:' + os.path.join(tempfile.mkdtemp(), 'inference.sock')
+    else:
+        address = 'tcp:127.0.0.1:8766'
+    # Raw (channels, samples) windows are only transposed, so results are easy to predict
+    inference = InferenceServer(SumEngine(), preprocess=lambda raw: raw.transpose(0, 2, 1), max_wait=0.01)
+    background = BackgroundServer(inference, address).start()
+    yield background
+    background.stop()
+
+
+def test_preprocessed_and_raw_windows(server):
+    window = np.random.default_rng(0).normal(size=(100, 6)).astype(np.float32)
+    client = InferenceClient(server.address)
+    try:
+        preprocessed = client.submit(window).result(5)
+        raw = client.submit_raw(window.T).result(5)
+    finally:
+        client.close()
+    np.testing.assert_allclose(preprocessed, [[window[0].sum()]], rtol=1e-6)
+    np.testing.assert_allclose(raw, preprocessed)
+
+
+def test_wrong_shape_is_an_error_for_that_request_only(server):
+    client = InferenceClient(server.address)
+    try:
+        with pytest.raises(RuntimeError, match='Expected a'):
+            client.submit(np.zeros((50, 6))).result(5)
+        assert client.submit(np.ones((100, 6))).result(5)[0, 0] == 6.0
+    finally:
+        client.close()
+
+
+def test_windows_from_several_clients_share_batches(server):
+    clients = [InferenceClient(server.address) for _ in range(4)]
+    try:
+        futures = [(i, client.submit(np.full((100, 6), i, dtype=np.float32)))
+                   for i, client in enumerate(clients) for _ in range(4)]
+        for i, future in futures:
+            assert future.result(5)[0, 0] == 6.0 * i
+    finally:
+        for client in clients:
+            client.close()
+    assert server.server.windows == 16
+    assert max(server.server.engine.batch_sizes) > 1
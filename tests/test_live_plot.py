@@ -0,0 +1,58 @@
+import matplotlib
+import numpy as np
+
+matplotlib.use('Agg')
+
+from matplotlib import pyplot as plt  # noqa: E402
+
+from gui.live_plot import LivePlot  # noqa: E402
+
+
+def make_plot(n_samples=500, channels=6):
+    fig, axs = plt.subplots(channels, 1)
+    plot = LivePlot(fig, axs, fig.canvas, n_samples)
+    fig.canvas.draw()
+    return fig, plot
+
+
+def test_partial_then_full_window():
+    fig, plot = make_plot()
+    rng = np.random.default_rng(0)
+    try:
+        assert plot.update(rng.normal(size=(6, 100)), force=True)
+        assert len(plot.lines[0].get_xdata()) == 100
+        assert plot.update(rng.normal(size=(6, 500)), force=True)
+        fig.canvas.draw()
+        for line in plot.lines:
+            assert len(line.get_xdata()) == len(line.get_ydata()) == 500
+    finally:
+        plt.close(fig)
+
+
+def test_partial_window_is_right_aligned():
+    fig, plot = make_plot()
+    try:
+        plot.update(np.ones((6, 50)), force=True)
+        x = plot.lines[0].get_xdata()
+        assert x[0] == 450 and x[-1] == 499
+    finally:
+        plt.close(fig)
+
+
+def test_longer_window_shows_the_newest_samples():
+    fig, plot = make_plot()
+    data = np.tile(np.arange(600, dtype=float), (6, 1))
+    try:
+        plot.update(data, force=True)
+        np.testing.assert_array_equal(plot.lines[0].get_ydata(), data[0, -500:])
+    finally:
+        plt.close(fig)
+
+
+def test_updates_are_rate_limited():
+    fig, plot = make_plot()
+    try:
+        assert plot.update(np.zeros((6, 500)))
+        assert not plot.update(np.zeros((6, 500)))
+    finally:
+        plt.close(fig)
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from eeg.lstm_runtime import NumpyLSTMModel, cache_path_for
+
+tf = pytest.importorskip('tensorflow')
+
+
+@pytest.fixture(scope='module')
+def keras_model(tmp_path_factory):
+    tf.keras.utils.set_random_seed(0)
+    model = tf.keras.Sequential([
+        tf.keras.Input(shape=(20, 6)),
+        tf.keras.layers.LSTM(16, return_sequences=True),
+        tf.keras.layers.LSTM(12),
+        tf.keras.layers.Dense(8, activation='relu'),
+        tf.keras.layers.Dense(4, activation='softmax'),
+    ])
+    path = str(tmp_path_factory.mktemp('model') / 'lstm_model.h5')
+    model.save(path)
+    return model, path
+
+
+@pytest.fixture
+def windows():
+    return np.random.default_rng(0).normal(0, 1, (16, 20, 6)).astype(np.float32)
+
+
+def test_matches_keras(keras_model, windows):
+    model, path = keras_model
+    numpy_model = NumpyLSTMModel.load(path, use_cache=False)
+    assert numpy_model.window_shape == (20, 6)
+    assert numpy_model.count_params() == model.count_params()
+    np.testing.assert_allclose(numpy_model.predict(windows), model.predict(windows, verbose=0), atol=1e-5)
+
+
+def test_single_window(keras_model, windows):
+    model, path = keras_model
+    numpy_model = NumpyLSTMModel.load(path, use_cache=False)
+    np.testing.assert_allclose(numpy_model.predict(windows[0]), model.predict(windows[:1], verbose=0), atol=1e-5)
+
+
+def test_cache_gives_the_same_model(keras_model, windows):
+    _, path = keras_model
+    built = NumpyLSTMModel.load(path)
+    cached = NumpyLSTMModel.load(path)
+    assert cache_path_for(path) != path
+    np.testing.assert_array_equal(built.predict(windows), cached.predict(windows))
@@ -0,0 +1,32 @@
+import os
+import shutil
+
+import pytest
+
+from eeg import preprocessing
+
+BUNDLED_MODEL = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models', 'lstm_model.h5')
+
+
+@pytest.fixture
+def model_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(preprocessing, 'normalizer', None)
+    monkeypatch.setattr(preprocessing, 'normalizer_path', str(tmp_path / 'normalizer.json'))
+    monkeypatch.setattr(preprocessing, 'DEFAULT_MODEL_PATH', str(tmp_path / 'lstm_model.h5'))
+    return tmp_path
+
+
+def copy_bundled_model(model_dir):
+    return shutil.copy(BUNDLED_MODEL, model_dir / 'lstm_model.h5')
+
+
+def test_no_warning_for_a_model_trained_without_a_normalizer(model_dir, capsys):
+    copy_bundled_model(model_dir)
+    assert preprocessing.load_normalizer() is False
+    assert 'WARNING' not in capsys.readouterr().out
+
+
+def test_warning_when_the_models_normalizer_is_missing(model_dir, capsys):
+    preprocessing.mark_trained_with_normalizer(copy_bundled_model(model_dir))
+    assert preprocessing.load_normalizer() is False
+    assert 'WARNING' in capsys.readouterr().out
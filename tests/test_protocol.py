@@ -0,0 +1,98 @@
+import asyncio
+import socket
+
+import numpy as np
+import pytest
+
+from server import protocol
+
+
+def split_frame(data):
+    length, kind = protocol._FRAME.unpack_from(data)
+    assert length == len(data) - 4
+    return kind, data[protocol._FRAME.size:]
+
+
+@pytest.mark.parametrize('preprocessed', [False, True])
+def test_window_round_trip(preprocessed):
+    window = np.random.default_rng(0).normal(0, 30, (6, 100)).astype(np.float32)
+    kind, request_id, (decoded, flag) = protocol.decode(*split_frame(protocol.encode_window(7, window, preprocessed)))
+    assert (kind, request_id, flag) == (protocol.WINDOW, 7, preprocessed)
+    np.testing.assert_array_equal(decoded, window)
+
+
+def test_window_is_sent_in_c_order():
+    window = np.arange(12, dtype=np.float64).reshape(3, 4).T  # Fortran-ordered float64 view
+    _, _, (decoded, _) = protocol.decode(*split_frame(protocol.encode_window(1, window)))
+    assert decoded.dtype == np.float32
+    np.testing.assert_array_equal(decoded, window)
+
+
+def test_result_round_trip():
+    probabilities = np.array([[0.1, 0.2, 0.3, 0.4]])
+    kind, request_id, decoded = protocol.decode(*split_frame(protocol.encode_result(2 ** 32 - 1, probabilities)))
+    assert (kind, request_id) == (protocol.RESULT, 2 ** 32 - 1)
+    np.testing.assert_allclose(decoded, probabilities.ravel())
+
+
+def test_error_round_trip():
+    kind, request_id, message = protocol.decode(*split_frame(protocol.encode_error(3, 'Bad window shape: (5, 5) ✗')))
+    assert (kind, request_id, message) == (protocol.ERROR, 3, 'Bad window shape: (5, 5) ✗')
+
+
+def test_unknown_type():
+    with pytest.raises(ValueError):
+        protocol.decode(9, b'\0' * 8)
+
+
+def test_recv_message_over_a_socket():
+    window = np.ones((6, 100), dtype=np.float32)
+    a, b = socket.socketpair()
+    with a, b:
+        # Several frames in one send, read back one at a time
+        a.sendall(protocol.encode_window(1, window) + protocol.encode_result(1, [0.5, 0.5]) +
+                  protocol.encode_error(2, 'busy'))
+        assert protocol.recv_message(b)[:2] == (protocol.WINDOW, 1)
+        assert protocol.recv_message(b)[:2] == (protocol.RESULT, 1)
+        assert protocol.recv_message(b) == (protocol.ERROR, 2, 'busy')
+        a.close()
+        with pytest.raises(ConnectionError):
+            protocol.recv_message(b)
+
+
+def test_read_message_from_a_stream():
+    async def run():
+        reader = asyncio.StreamReader()
+        data = protocol.encode_result(5, [0.25, 0.75]) + protocol.encode_error(6, 'timeout')
+        # Frames split at arbitrary points arrive intact
+        for start in range(0, len(data), 3):
+            reader.feed_data(data[start:start + 3])
+        reader.feed_eof()
+        first = await protocol.read_message(reader)
+        second = await protocol.read_message(reader)
+        with pytest.raises(asyncio.IncompleteReadError):
+            await protocol.read_message(reader)
+        return first, second
+
+    (kind, request_id, probabilities), second = asyncio.run(run())
+    assert (kind, request_id) == (protocol.RESULT, 5)
+    np.testing.assert_allclose(probabilities, [0.25, 0.75])
+    assert second == (protocol.ERROR, 6, 'timeout')
+
+
+def test_oversized_frame_is_rejected():
+    a, b = socket.socketpair()
+    with a, b:
+        a.sendall(protocol._FRAME.pack(protocol.MAX_FRAME + 1, protocol.WINDOW))
+        with pytest.raises(ValueError):
+            protocol.recv_message(b)
+
+
+@pytest.mark.parametrize('address, expected', [
+    ('unix:/tmp/omegavr.sock', ('unix', '/tmp/omegavr.sock')),
+    ('tcp:0.0.0.0:8765', ('tcp', ('0.0.0.0', 8765))),
+    ('localhost:9000', ('tcp', ('localhost', 9000))),
+    (':9000', ('tcp', ('127.0.0.1', 9000))),
+])
+def test_parse_address(address, expected):
+    assert protocol.parse_address(address) == expected
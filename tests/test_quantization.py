@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from benchmarks.suite import random_lstm_model
+from eeg.quantization import compare_precisions, export_quantized, load_quantized
+
+
+@pytest.fixture(scope='module')
+def models(tmp_path_factory):
+    directory = tmp_path_factory.mktemp('exports')
+    model = random_lstm_model(units=32, dense=8)
+    exported = {'float32': model}
+    for precision in ('float16', 'int8'):
+        exported[precision] = load_quantized(export_quantized(model, str(directory / f'{precision}.npz'), precision))
+    return exported
+
+
+@pytest.fixture
+def windows():
+    return np.random.default_rng(1).normal(size=(32, 100, 6)).astype(np.float32)
+
+
+@pytest.mark.parametrize('precision, dtype', [('float16', np.float16), ('int8', np.int8)])
+def test_weights_stay_at_reduced_precision(models, precision, dtype):
+    model = models[precision]
+    assert model.stored['0/recurrent_kernel'].dtype == dtype
+    assert model.stored['0/bias'].dtype == np.float32
+    assert model.count_params() == models['float32'].count_params()
+    assert model.resident_bytes < 0.6 * models['float32'].resident_bytes
+
+
+@pytest.mark.parametrize('precision, tolerance', [('float16', 1e-3), ('int8', 2e-2)])
+def test_predictions_close_to_float32(models, windows, precision, tolerance):
+    np.testing.assert_allclose(models[precision].predict(windows), models['float32'].predict(windows), atol=tolerance)
+
+
+def test_report_shows_resident_memory(models, windows):
+    rows = {row['precision']: row for row in compare_precisions(models, windows, repeats=5)}
+    assert rows['float32']['agreement'] == 1.0
+    assert rows['int8']['resident_kb'] < rows['float16']['resident_kb'] < rows['float32']['resident_kb']
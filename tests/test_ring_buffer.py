@@ -0,0 +1,105 @@
+import threading
+
+import numpy as np
+import pytest
+
+from eeg.acquisition import RingBuffer
+
+
+def samples(start, n, channels=2):
+    # Sample i reads i on every channel, so views show exactly which samples they hold
+    return np.tile(np.arange(start, start + n, dtype=np.float32), (channels, 1))
+
+
+def test_wraparound_keeps_the_newest_samples_contiguous():
+    buffer = RingBuffer(2, 10)
+    for start in range(0, 27, 3):
+        buffer.write(samples(start, 3))
+    assert buffer.total_written == 27
+    view = buffer.latest(10)
+    np.testing.assert_array_equal(view, samples(17, 10))
+    assert view.base is not None  # A view, not a copy
+    np.testing.assert_array_equal(buffer.latest(4), samples(23, 4))
+
+
+def test_latest_before_the_buffer_has_filled():
+    buffer = RingBuffer(2, 10)
+    assert buffer.latest(5).shape == (2, 0)
+    buffer.write(samples(0, 3))
+    np.testing.assert_array_equal(buffer.latest(5), samples(0, 3))
+    np.testing.assert_array_equal(buffer.latest(50), samples(0, 3))
+    buffer.write(samples(3, 20))
+    np.testing.assert_array_equal(buffer.latest(50), samples(13, 10))
+
+
+def test_chunk_larger_than_capacity():
+    buffer = RingBuffer(2, 10)
+    buffer.write(samples(0, 4))
+    buffer.write(samples(4, 25))
+    assert buffer.total_written == 29
+    np.testing.assert_array_equal(buffer.latest(10), samples(19, 10))
+
+
+def test_read_since_reports_dropped_samples():
+    buffer = RingBuffer(2, 10)
+    buffer.write(samples(0, 6))
+    view, cursor, dropped = buffer.read_since(0)
+    np.testing.assert_array_equal(view, samples(0, 6))
+    assert (cursor, dropped) == (6, 0)
+    buffer.write(samples(6, 14))
+    view, cursor, dropped = buffer.read_since(cursor)
+    np.testing.assert_array_equal(view, samples(10, 10))
+    assert (cursor, dropped) == (20, 4)
+    assert buffer.read_since(cursor)[0].shape == (2, 0)
+
+
+def test_wrong_channel_count():
+    with pytest.raises(ValueError):
+        RingBuffer(2, 10).write(np.zeros((3, 5)))
+
+
+def test_concurrent_readers_see_consistent_windows():
+    buffer = RingBuffer(2, 2000)
+    total = 50000
+    errors = []
+    done = threading.Event()
+
+    def writer():
+        for start in range(0, total, 10):
+            buffer.write(samples(start, 10))
+        done.set()
+
+    def latest_reader():
+        while not done.is_set():
+            window = buffer.latest(100).copy()
+            if window.shape[1] and not (np.all(np.diff(window[0]) == 1) and np.array_equal(window[0], window[1])):
+                errors.append(window[0, [0, -1]])
+
+    def cursor_reader():
+        cursor = 0
+        seen = 0
+        while not done.is_set() or cursor < buffer.total_written:
+            view, new_cursor, dropped = buffer.read_since(cursor)
+            if view.shape[1] and view[0, 0] != cursor + dropped:
+                errors.append((cursor, dropped, view[0, 0]))
+            seen += view.shape[1] + dropped
+            cursor = new_cursor
+        if seen != total:
+            errors.append(('seen', seen))
+
+    threads = [threading.Thread(target=target) for target in (latest_reader, latest_reader, cursor_reader, writer)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+    assert not errors
+    assert buffer.total_written == total
+
+
+def test_wait_for_wakes_on_write():
+    buffer = RingBuffer(2, 10)
+    assert not buffer.wait_for(5, timeout=0.01)
+    timer = threading.Timer(0.05, buffer.write, args=(samples(0, 5),))
+    timer.start()
+    assert buffer.wait_for(5, timeout=5)
+    timer.join()
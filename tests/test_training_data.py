@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from eeg.filters import StreamingFilter
+from eeg.session import read_session, write_session
+from eeg.training_data import CSVSource, SessionSource
+
+SEGMENTS = [('Left Click', 1000), ('rest', 300), ('Right Click', 777), ('Scroll Up', 2500)]
+
+
+def make_session(path, continuous):
+    rng = np.random.default_rng(0)
+    segments = [(action, rng.normal(0, 10, (6, n)).astype(np.float32), float(i))
+                for i, (action, n) in enumerate(SEGMENTS)]
+    write_session(str(path), segments, sample_rate=250, continuous=continuous)
+    return str(path)
+
+
+def reference(session, stream_filter):
+    # What the filtered recording should look like: one stream, or every segment on its own
+    if session.continuous:
+        return stream_filter.apply(session.data)
+    return np.concatenate([stream_filter.apply(session.segment_data(segment)) for segment in session.segments],
+                          axis=1)
+
+
+@pytest.mark.parametrize('continuous', [True, False])
+@pytest.mark.parametrize('stride, chunk_windows, gap_samples', [(100, 3, 65536), (25, 7, 50), (60, 1000, 64)])
+def test_chunked_filtering_matches_filtering_in_one_go(tmp_path, continuous, stride, chunk_windows, gap_samples):
+    path = make_session(tmp_path / 'session.eegs', continuous)
+    stream_filter = StreamingFilter(250, 6)
+    source = SessionSource(path, 100, stride, chunk_windows, stream_filter)
+    source.gap_samples = gap_samples
+    filtered = reference(read_session(path), stream_filter)
+    count = 0
+    for windows, labels, offsets in source.chunks(rng=np.random.default_rng(1)):
+        for window, offset in zip(windows, offsets):
+            np.testing.assert_array_equal(window, filtered[:, offset:offset + 100].T)
+        count += len(windows)
+    assert count == sum(len(offsets) for _, _, offsets in SessionSource(path, 100, stride, 10).chunks())
+
+
+def test_snapshots_are_filtered_separately(tmp_path):
+    # A step between two snapshots rings through the next one when they are filtered as one stream
+    step = [('Left Click', np.zeros((6, 100), dtype=np.float32), 0.0),
+            ('Left Click', np.full((6, 100), 500.0, dtype=np.float32), 1.0)]
+    write_session(str(tmp_path / 'step.eegs'), step, sample_rate=250)
+    stream_filter = StreamingFilter(250, 6)
+    windows = np.concatenate([w for w, _, _ in SessionSource(str(tmp_path / 'step.eegs'), 100, 100, 10,
+                                                             stream_filter).chunks()])
+    assert np.abs(windows).max() < 1e-3
+    joined = stream_filter.apply(np.concatenate([data for _, data, _ in step], axis=1))
+    assert np.abs(joined[:, 100:]).max() > 100
+
+
+def test_csv_windows_are_filtered_separately(tmp_path):
+    rng = np.random.default_rng(2)
+    values = rng.normal(0, 10, (600, 6)).astype(np.float32)
+    frame = pd.DataFrame(values, columns=[f'c{i}' for i in range(6)])
+    frame['Class'] = np.repeat([1, 2, 2, 0, 3, 3], 100)
+    frame.to_csv(tmp_path / 'merged.csv', index=False)
+    stream_filter = StreamingFilter(250, 6)
+    windows, labels, offsets = zip(*CSVSource(str(tmp_path / 'merged.csv'), 100, 250, stream_filter).chunks())
+    windows, offsets = np.concatenate(windows), np.concatenate(offsets)
+    assert list(offsets) == [0, 100, 200, 400, 500]
+    for window, offset in zip(windows, offsets):
+        np.testing.assert_allclose(window, stream_filter.apply(values[offset:offset + 100].T).T, rtol=1e-5,
+                                   atol=1e-4)
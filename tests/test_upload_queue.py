@@ -0,0 +1,148 @@
+import json
+import threading
+
+import pytest
+
+from cloud.upload_queue import UploadQueue
+
+boto3 = pytest.importorskip('boto3')
+moto = pytest.importorskip('moto')
+
+BUCKET = 'omegavr-test'
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    for name, value in (('AWS_ACCESS_KEY_ID', 'testing'), ('AWS_SECRET_ACCESS_KEY', 'testing'),
+                        ('AWS_SESSION_TOKEN', 'testing'), ('AWS_DEFAULT_REGION', 'us-east-1')):
+        monkeypatch.setenv(name, value)
+    monkeypatch.delenv('OMEGAVR_S3_ENDPOINT', raising=False)
+    with moto.mock_aws():
+        client = boto3.client('s3', region_name='us-east-1')
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = tmp_path / 'session.csv'
+    path.write_text('Left Click\n"[1.0, 2.0, 3.0]"\n')
+    return path
+
+
+class FlakyClient:
+    """Fails the first `failures` uploads, then hands them to the real client."""
+
+    def __init__(self, client, failures):
+        self.client = client
+        self.failures = failures
+        self.calls = 0
+
+    def upload_file(self, *args, **kwargs):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError(f"injected failure {self.calls}")
+        return self.client.upload_file(*args, **kwargs)
+
+
+class RecordingEvent(threading.Event):
+    """Stop event that records backoff delays instead of sleeping through them."""
+
+    def __init__(self):
+        super().__init__()
+        self.waits = []
+
+    def wait(self, timeout=None):
+        self.waits.append(timeout)
+        return super().wait(0)
+
+
+def make_queue(tmp_path, **kwargs):
+    completed = []
+    upload_queue = UploadQueue(bucket=BUCKET, state_file=str(tmp_path / 'pending_uploads.json'),
+                               on_complete=lambda job, success, error: completed.append((job['key'], success)),
+                               **kwargs)
+    return upload_queue, completed
+
+
+def read_state(upload_queue):
+    with open(upload_queue.state_file) as f:
+        return json.load(f)
+
+
+def test_upload(s3, tmp_path, data_file):
+    progress = []
+    upload_queue, completed = make_queue(tmp_path, on_progress=lambda job, sent, total: progress.append((sent, total)))
+    upload_queue.start()
+    try:
+        upload_queue.enqueue(str(data_file), key='sessions/a.csv')
+        assert upload_queue.wait_idle(timeout=10)
+    finally:
+        upload_queue.stop(timeout=5)
+    assert completed == [('sessions/a.csv', True)]
+    assert s3.get_object(Bucket=BUCKET, Key='sessions/a.csv')['Body'].read() == data_file.read_bytes()
+    assert progress[-1] == (data_file.stat().st_size, data_file.stat().st_size)
+    assert read_state(upload_queue) == []
+
+
+def test_retries_with_backoff(s3, tmp_path, data_file):
+    client = FlakyClient(s3, failures=3)
+    upload_queue, completed = make_queue(tmp_path, client=client, backoff=0.5, max_backoff=1.5, max_retries=5)
+    upload_queue._stop_event = RecordingEvent()
+    upload_queue.start()
+    try:
+        upload_queue.enqueue(str(data_file))
+        assert upload_queue.wait_idle(timeout=10)
+    finally:
+        upload_queue.stop(timeout=5)
+    assert client.calls == 4
+    assert upload_queue._stop_event.waits[:3] == [0.5, 1.0, 1.5]  # Doubling, capped at max_backoff
+    assert completed == [('session.csv', True)]
+    assert s3.get_object(Bucket=BUCKET, Key='session.csv')['Body'].read() == data_file.read_bytes()
+
+
+def test_failed_after_max_retries(s3, tmp_path, data_file):
+    upload_queue, completed = make_queue(tmp_path, client=FlakyClient(s3, failures=100), max_retries=3)
+    upload_queue._stop_event = RecordingEvent()
+    upload_queue.start()
+    try:
+        job = upload_queue.enqueue(str(data_file))
+        assert upload_queue.wait_idle(timeout=10)
+    finally:
+        upload_queue.stop(timeout=5)
+    assert completed == [('session.csv', False)]
+    assert upload_queue.pending == []
+    assert [failed['id'] for failed in upload_queue.failed] == [job['id']]
+    [saved] = read_state(upload_queue)
+    assert saved['id'] == job['id'] and saved['failed'] and saved['attempts'] == 3
+
+
+def test_resumes_from_state_file(s3, tmp_path, data_file):
+    # A queue that never ran its worker (the app stopped before the upload), and one whose job had failed
+    stopped, _ = make_queue(tmp_path)
+    pending = stopped.enqueue(str(data_file), key='pending.csv')
+    failed = dict(stopped.enqueue(str(data_file), key='failed.csv'), attempts=5, failed=True)
+    with open(stopped.state_file, 'w') as f:
+        json.dump([pending, failed], f)
+
+    upload_queue, completed = make_queue(tmp_path)
+    upload_queue.start()
+    try:
+        assert upload_queue.wait_idle(timeout=10)
+    finally:
+        upload_queue.stop(timeout=5)
+    assert sorted(completed) == [('failed.csv', True), ('pending.csv', True)]
+    assert {obj['Key'] for obj in s3.list_objects_v2(Bucket=BUCKET)['Contents']} == {'pending.csv', 'failed.csv'}
+    assert read_state(upload_queue) == []
+
+
+def test_missing_file_is_dropped(s3, tmp_path):
+    upload_queue, completed = make_queue(tmp_path)
+    upload_queue.start()
+    try:
+        upload_queue.enqueue(str(tmp_path / 'gone.csv'))
+        assert upload_queue.wait_idle(timeout=10)
+    finally:
+        upload_queue.stop(timeout=5)
+    assert completed == [('gone.csv', False)]
+    assert upload_queue.failed == [] and read_state(upload_queue) == []